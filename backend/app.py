@@ -4,15 +4,21 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import LOG_FILE
+from config import DB_READY_ENV, LOG_FILE
 from backend.models.database import init_db
+from backend.models.writer import shutdown_writer
+from backend.services.maintenance_service import start_maintenance_scheduler, stop_maintenance_scheduler
+from backend.routes.admin import router as admin_router
 from backend.routes.jobs import router as jobs_router
 from backend.routes.cvs import router as cvs_router
+from backend.routes.metrics import router as metrics_router
+from backend.routes.usage import router as usage_router
+from backend.routes.uploads import TOO_LARGE_DETAIL, upload_too_large
 from utils import ensure_dirs
 
 # Setup logging
@@ -28,6 +34,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def shutdown_ocr_pool() -> None:
+    """
+    Stop the Tesseract workers if this process started them.
+
+    ocr pulls in PyMuPDF and Pillow, so it is not imported here: if no
+    request has loaded it, no pool was ever created.
+    """
+    ocr = sys.modules.get("ocr")
+    if ocr is not None:
+        ocr.shutdown_ocr_pool()
+
+
 def create_app() -> FastAPI:
     """Create and configure FastAPI application."""
     app = FastAPI(
@@ -45,12 +63,31 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Initialize database
-    init_db()
+    # Reject oversized uploads before the multipart body is read
+    @app.middleware("http")
+    async def limit_upload_size(request: Request, call_next):
+        if request.method == "POST" and upload_too_large(request):
+            return JSONResponse(status_code=413, content={"detail": TOO_LARGE_DETAIL})
+        return await call_next(request)
+    
+    # Initialize database (run.py already did it once when starting several workers)
+    if os.environ.get(DB_READY_ENV) != "1":
+        init_db()
+    
+    # Orphan cleanup, vacuum and ANALYZE every DB_MAINTENANCE_INTERVAL_HOURS
+    app.add_event_handler("startup", start_maintenance_scheduler)
+    app.add_event_handler("shutdown", stop_maintenance_scheduler)
+    
+    # Commit any queued writes and stop the Tesseract workers before the process exits
+    app.add_event_handler("shutdown", shutdown_writer)
+    app.add_event_handler("shutdown", shutdown_ocr_pool)
     
     # Include routers
     app.include_router(jobs_router, prefix="/api/jobs", tags=["jobs"])
     app.include_router(cvs_router, prefix="/api/cvs", tags=["cvs"])
+    app.include_router(metrics_router, prefix="/api/metrics", tags=["metrics"])
+    app.include_router(usage_router, prefix="/api/usage", tags=["usage"])
+    app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
     
     # Serve static files
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,11 @@
+"""SQLite connections to the application database."""
+import sqlite3
+
+from config import DB_PATH
+
+
+def get_db_connection() -> sqlite3.Connection:
+    """Get a database connection that enforces foreign keys (ON DELETE CASCADE)."""
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
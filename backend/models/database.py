@@ -3,23 +3,43 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
+import hashlib
+import json
 import logging
 import sqlite3
-from typing import Optional
+import zlib
+from datetime import datetime
+from typing import Dict, Optional, Union
 
-from config import DB_PATH
+from config import CV_DATA_COMPRESSION_LEVEL, DB_PATH, SCORING_CATEGORIES
+from backend.models.connection import get_db_connection
+from backend.models.maintenance import create_maintenance_table, remove_files, remove_orphans
+from backend.models.runs import create_runs_tables
+from backend.models.usage import create_usage_table
+from backend.models.versions import bump_job_version, create_versions_table, release_pending_versions
 
 logger = logging.getLogger(__name__)
 
+# Per-category score columns on analyses (score_education, ...), used for re-weighting
+CATEGORY_SCORE_COLUMNS = [f"score_{category.lower()}" for category in SCORING_CATEGORIES]
+
 
 def init_db() -> None:
     """Initialize database and create tables if they don't exist."""
     import os
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     
-    with sqlite3.connect(DB_PATH) as conn:
+    migrated = False
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         
+        # Deletes free pages that maintenance can return to the file system. Only takes
+        # effect on a new database; existing ones are converted by the VACUUM below.
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
+        # Readers in other server workers are not blocked while one of them writes
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Create jobs table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS jobs (
@@ -55,74 +75,467 @@ def init_db() -> None:
             CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses(score DESC)
         """)
         
+        # Lexical prescreening: per-job cutoff and per-analysis relevance/status
+        _ensure_columns(cursor, "jobs", {
+            "prescreen_mode": "TEXT DEFAULT 'off'",
+            "prescreen_threshold": "REAL DEFAULT 0",
+        })
+        _ensure_columns(cursor, "analyses", {
+            "relevance": "REAL",
+            "status": "TEXT DEFAULT 'scored'",
+        })
+        
+        # Tiered scoring: 'llm' scores every category by LLM, 'tiered' tries local scorers first
+        _ensure_columns(cursor, "jobs", {"scoring_mode": "TEXT DEFAULT 'llm'"})
+        
+        # Category weights: JSON {category: weight} per job (NULL = equal weights), and the
+        # per-category scores the weighted total is recomputed from
+        _ensure_columns(cursor, "jobs", {"category_weights": "TEXT"})
+        _ensure_columns(cursor, "analyses", {column: "INTEGER" for column in CATEGORY_SCORE_COLUMNS})
+        
+        # Duplicate detection: file hash, MinHash signature and link to the prior analysis
+        _ensure_columns(cursor, "analyses", {
+            "file_hash": "TEXT",
+            "minhash": "BLOB",
+            "duplicate_of": "INTEGER",
+        })
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analyses_file_hash ON analyses(file_hash)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analyses_duplicate_of ON analyses(duplicate_of)
+        """)
+        
+        # Lookup keys for near-duplicate detection (LSH bands, emails, phones)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dedup_keys (
+                key TEXT NOT NULL,
+                analysis_id INTEGER NOT NULL,
+                FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_dedup_keys_key ON dedup_keys(key)
+        """)
+        
+        # Versioned job descriptions referenced by analyses
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS job_descriptions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER NOT NULL,
+                description TEXT NOT NULL,
+                description_hash TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_job_descriptions_hash
+            ON job_descriptions(job_id, description_hash)
+        """)
+        _ensure_columns(cursor, "analyses", {"jd_id": "INTEGER REFERENCES job_descriptions(id)"})
+        
+        _init_search_index(cursor)
+        
+        # Data versions shared by all server workers (ETags, ranking cache)
+        create_versions_table(cursor)
+        
+        # Checkpoints of resumable CV processing runs
+        create_runs_tables(cursor)
+        
+        # Gemini/Vision usage per analysis and job
+        create_usage_table(cursor)
+        
+        # Last orphan cleanup / vacuum / ANALYZE run
+        create_maintenance_table(cursor)
+        
+        cursor.execute("PRAGMA user_version")
+        user_version = cursor.fetchone()[0]
+        orphan_files = []
+        if user_version < 3:
+            # Left by deletes made before foreign keys were enforced; the migrations
+            # below would now fail on their rows
+            _, orphan_files = remove_orphans(cursor)
+        if user_version < 1:
+            _migrate_compact_storage(cursor)
+            cursor.execute("PRAGMA user_version = 1")
+            migrated = True
+        if user_version < 2:
+            _backfill_category_scores(cursor)
+            cursor.execute("PRAGMA user_version = 2")
+        if user_version < 3:
+            cursor.execute("PRAGMA auto_vacuum")
+            if cursor.fetchone()[0] != 2:
+                migrated = True
+            cursor.execute("PRAGMA user_version = 3")
+        
         conn.commit()
+    release_pending_versions()
+    remove_files(orphan_files)
+    
+    if migrated:
+        # Reclaim the space freed by the rewrite, switching to incremental auto-vacuum
+        with get_db_connection() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
     
     logger.info("Database initialized successfully")
 
 
-def get_db_connection() -> sqlite3.Connection:
-    """Get a database connection."""
-    return sqlite3.connect(DB_PATH)
+def encode_cv_data(payload: Dict) -> bytes:
+    """Serialize an analysis payload to compressed JSON."""
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(data, CV_DATA_COMPRESSION_LEVEL)
+
+
+def decode_cv_data(value: Union[bytes, str, None]) -> Dict:
+    """Read an analysis payload, compressed or in the legacy plain JSON form."""
+    if not value:
+        return {}
+    if isinstance(value, bytes):
+        value = zlib.decompress(value).decode("utf-8")
+    return json.loads(value)
+
+
+def get_jd_version(cursor: sqlite3.Cursor, job_id: int, description: str) -> int:
+    """Return the ID of a job description version, creating it if needed."""
+    description_hash = hashlib.sha256(description.encode("utf-8")).hexdigest()
+    cursor.execute(
+        "SELECT id FROM job_descriptions WHERE job_id = ? AND description_hash = ?",
+        (job_id, description_hash),
+    )
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    cursor.execute(
+        """
+        INSERT INTO job_descriptions (job_id, description, description_hash, created_at)
+        VALUES (?, ?, ?, ?)
+        """,
+        (job_id, description, description_hash, datetime.utcnow().isoformat()),
+    )
+    return cursor.lastrowid
+
+
+def _migrate_compact_storage(cursor: sqlite3.Cursor, batch_size: int = 500) -> None:
+    """Move JD text to job_descriptions and compress cv_data for existing analyses."""
+    last_id = 0
+    total = 0
+    while True:
+        cursor.execute(
+            "SELECT id, job_id, jd_text, cv_data FROM analyses WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        updates = []
+        for analysis_id, job_id, jd_text, cv_data in rows:
+            payload = decode_cv_data(cv_data)
+            jd = payload.pop("jd", None) or jd_text
+            jd_id = get_jd_version(cursor, job_id, jd) if jd else None
+            updates.append((jd_id, encode_cv_data(payload), analysis_id))
+        cursor.executemany(
+            "UPDATE analyses SET jd_id = ?, jd_text = NULL, cv_data = ? WHERE id = ?",
+            updates,
+        )
+        last_id = rows[-1][0]
+        total += len(rows)
+    if total:
+        logger.info("Migrated %s analyses to compact storage", total)
+
+
+def _backfill_category_scores(cursor: sqlite3.Cursor, batch_size: int = 500) -> None:
+    """Copy the category scores of existing analyses from cv_data into their score columns."""
+    assignments = ", ".join(f"{column} = ?" for column in CATEGORY_SCORE_COLUMNS)
+    last_id = 0
+    total = 0
+    while True:
+        cursor.execute(
+            "SELECT id, cv_data FROM analyses WHERE id > ? AND score IS NOT NULL ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        updates = []
+        for analysis_id, cv_data in rows:
+            scores = decode_cv_data(cv_data).get("scores") or {}
+            if all(category in scores for category in SCORING_CATEGORIES):
+                updates.append([scores[category] for category in SCORING_CATEGORIES] + [analysis_id])
+        cursor.executemany(f"UPDATE analyses SET {assignments} WHERE id = ?", updates)
+        last_id = rows[-1][0]
+        total += len(updates)
+    if total:
+        logger.info("Backfilled category scores for %s analyses", total)
+
+
+def normalize_weights(weights: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Weight per category; no weights means equal weights, and categories left out weigh 0."""
+    if not weights:
+        return {category: 1.0 for category in SCORING_CATEGORIES}
+    return {category: float(weights.get(category, 0.0)) for category in SCORING_CATEGORIES}
+
+
+def weighted_total(scores: Dict[str, float], weights: Optional[Dict[str, float]]) -> float:
+    """Total score: the weighted average of the category scores."""
+    normalized = normalize_weights(weights)
+    return sum(normalized[category] * scores[category] for category in SCORING_CATEGORIES) / sum(normalized.values())
+
+
+def get_category_weights(cursor: sqlite3.Cursor, job_id: int) -> Optional[Dict[str, float]]:
+    """A job's category weights, or None for equal weights."""
+    cursor.execute("SELECT category_weights FROM jobs WHERE id = ?", (job_id,))
+    row = cursor.fetchone()
+    return json.loads(row[0]) if row and row[0] else None
+
+
+def reweight_job(cursor: sqlite3.Cursor, job_id: int, weights: Optional[Dict[str, float]]) -> int:
+    """
+    Recompute the total score of every scored analysis of a job in one UPDATE.
+    
+    Uses the stored per-category scores, so no LLM calls are made.
+    
+    Returns:
+        Number of analyses re-scored
+    """
+    normalized = normalize_weights(weights)
+    weighted_sum = " + ".join(f"? * {column}" for column in CATEGORY_SCORE_COLUMNS)
+    cursor.execute(
+        f"""
+        UPDATE analyses SET score = ({weighted_sum}) / ?
+        WHERE job_id = ? AND {CATEGORY_SCORE_COLUMNS[0]} IS NOT NULL
+        """,
+        [normalized[category] for category in SCORING_CATEGORIES] + [sum(normalized.values()), job_id],
+    )
+    return cursor.rowcount
+
+
+SEARCH_FIELDS = ["skills", "experience", "education", "languages"]
+
+
+def _info_text(value) -> Optional[str]:
+    """Leaf values of a parsed-info field, space separated (keys are not indexed)."""
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        parts = [text for text in (_info_text(item) for item in value) if text]
+        return " ".join(parts) if parts else None
+    return None if value is None else str(value)
+
+
+def index_analysis(cursor: sqlite3.Cursor, analysis_id: int, job_id: int, name: str, info: Dict) -> None:
+    """
+    Add an analysis to the candidate search index.
+    
+    Called by the code that inserts analyses, in the same transaction.
+    The FTS row is written here rather than by a trigger because cv_data
+    is compressed, and decoding it in SQL would need a function
+    registered on every connection that writes analyses.
+    """
+    columns = ", ".join(SEARCH_FIELDS)
+    cursor.execute(
+        f"INSERT INTO analyses_fts (rowid, job_id, name, {columns}) VALUES (?, ?, ?, {', '.join('?' * len(SEARCH_FIELDS))})",
+        [analysis_id, job_id, name] + [_info_text(info.get(field)) for field in SEARCH_FIELDS],
+    )
+
+
+def _init_search_index(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the FTS5 candidate index and its delete trigger.
+    
+    Inserts and updates are indexed explicitly by index_analysis(); only
+    deleted analyses are dropped from the index by a trigger.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analyses_fts'")
+    exists = cursor.fetchone() is not None
+    
+    columns = ", ".join(SEARCH_FIELDS)
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+            job_id UNINDEXED, name, {columns},
+            tokenize = "unicode61 remove_diacritics 2 tokenchars '+#'"
+        )
+    """)
+    # Recreated on every start so trigger bodies follow code changes. Rows are added by
+    # index_analysis(); only the delete is a trigger, since it needs no decoding.
+    for trigger in ("analyses_fts_insert", "analyses_fts_update", "analyses_fts_delete"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("""
+        CREATE TRIGGER analyses_fts_delete AFTER DELETE ON analyses BEGIN
+            DELETE FROM analyses_fts WHERE rowid = old.id;
+        END
+    """)
+    
+    if not exists:
+        cursor.execute("SELECT id, job_id, name, cv_data FROM analyses")
+        rows = cursor.fetchall()
+        for analysis_id, job_id, name, cv_data in rows:
+            index_analysis(cursor, analysis_id, job_id, name, decode_cv_data(cv_data).get("info") or {})
+        logger.info("Built candidate search index for %s analyses", len(rows))
+
+
+def _ensure_columns(cursor: sqlite3.Cursor, table: str, columns: dict) -> None:
+    """Add columns missing from an existing table."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, decl in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+            logger.info("Added column %s.%s", table, name)
 
 
 def get_job_by_id(job_id: int) -> Optional[dict]:
     """Get a job by ID."""
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_db_connection() as conn:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        return _job_from_row(row) if row else None
 
 
 def get_all_jobs() -> list:
     """Get all jobs."""
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_db_connection() as conn:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM jobs ORDER BY created_at DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        return [_job_from_row(row) for row in cursor.fetchall()]
+
 
+def _job_from_row(row: sqlite3.Row) -> dict:
+    """Job row as a dict, with its category weights decoded."""
+    job = dict(row)
+    job["category_weights"] = json.loads(job["category_weights"]) if job.get("category_weights") else None
+    return job
 
-def create_job(title: str, description: str) -> int:
+
+def create_job(
+    title: str,
+    description: str,
+    prescreen_mode: str = "off",
+    prescreen_threshold: float = 0.0,
+    scoring_mode: str = "llm",
+    category_weights: Optional[Dict[str, float]] = None,
+) -> int:
     """Create a new job and return its ID."""
     from datetime import datetime
     
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
-            INSERT INTO jobs (title, description, created_at, updated_at)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO jobs (title, description, prescreen_mode, prescreen_threshold, scoring_mode,
+                              category_weights, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (title, description, datetime.utcnow().isoformat(), datetime.utcnow().isoformat())
+            (
+                title,
+                description,
+                prescreen_mode,
+                prescreen_threshold,
+                scoring_mode,
+                json.dumps(category_weights) if category_weights else None,
+                datetime.utcnow().isoformat(),
+                datetime.utcnow().isoformat(),
+            )
         )
+        job_id = cursor.lastrowid
+        bump_job_version(job_id, jobs_changed=True, cursor=cursor)
         conn.commit()
-        return cursor.lastrowid
+    release_pending_versions()
+    return job_id
 
 
-def update_job(job_id: int, title: str, description: str) -> bool:
-    """Update an existing job."""
+def update_job(
+    job_id: int,
+    title: str,
+    description: str,
+    prescreen_mode: Optional[str] = None,
+    prescreen_threshold: Optional[float] = None,
+    scoring_mode: Optional[str] = None,
+    category_weights: Optional[Dict[str, float]] = None,
+) -> bool:
+    """
+    Update an existing job. Prescreen and scoring settings left as None are kept.
+    
+    New category weights (an empty dict restores equal weights) re-rank the
+    job's stored analyses in the same transaction.
+    """
     from datetime import datetime
     
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
             UPDATE jobs 
-            SET title = ?, description = ?, updated_at = ?
+            SET title = ?, description = ?,
+                prescreen_mode = COALESCE(?, prescreen_mode),
+                prescreen_threshold = COALESCE(?, prescreen_threshold),
+                scoring_mode = COALESCE(?, scoring_mode),
+                updated_at = ?
             WHERE id = ?
             """,
-            (title, description, datetime.utcnow().isoformat(), job_id)
+            (
+                title,
+                description,
+                prescreen_mode,
+                prescreen_threshold,
+                scoring_mode,
+                datetime.utcnow().isoformat(),
+                job_id,
+            )
         )
+        updated = cursor.rowcount > 0
+        if updated and category_weights is not None:
+            _set_category_weights(cursor, job_id, category_weights)
+        bump_job_version(job_id, jobs_changed=True, cursor=cursor)
+        conn.commit()
+    release_pending_versions()
+    return updated
+
+
+def set_job_weights(job_id: int, category_weights: Dict[str, float]) -> Optional[int]:
+    """
+    Set a job's category weights and re-rank its stored analyses.
+    
+    Args:
+        job_id: ID of the job
+        category_weights: {category: weight}; an empty dict restores equal weights
+        
+    Returns:
+        Number of analyses re-scored, or None if the job does not exist
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,))
+        if cursor.fetchone() is None:
+            return None
+        rescored = _set_category_weights(cursor, job_id, category_weights)
+        bump_job_version(job_id, jobs_changed=True, cursor=cursor)
         conn.commit()
-        return cursor.rowcount > 0
+    release_pending_versions()
+    return rescored
+
+
+def _set_category_weights(cursor: sqlite3.Cursor, job_id: int, category_weights: Dict[str, float]) -> int:
+    cursor.execute(
+        "UPDATE jobs SET category_weights = ?, updated_at = ? WHERE id = ?",
+        (json.dumps(category_weights) if category_weights else None, datetime.utcnow().isoformat(), job_id),
+    )
+    rescored = reweight_job(cursor, job_id, category_weights)
+    logger.info("Re-ranked %s analyses for job %s with new category weights", rescored, job_id)
+    return rescored
 
 
 def delete_job(job_id: int) -> bool:
     """Delete a job and all its associated analyses."""
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        deleted = cursor.rowcount > 0
+        bump_job_version(job_id, jobs_changed=True, cursor=cursor)
         conn.commit()
-        return cursor.rowcount > 0
+    release_pending_versions()
+    return deleted
@@ -0,0 +1,128 @@
+"""Orphan cleanup and the maintenance log.
+
+Connections from get_db_connection() enforce foreign keys, so deleting
+a job cascades to its analyses, their dedup keys and its JD versions.
+Databases written before that still hold orphans, and pipeline runs
+reference jobs without a foreign key. remove_orphans() deletes them.
+api_usage rows are kept: they are the billing history.
+"""
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.models.versions import bump_job_version
+
+logger = logging.getLogger(__name__)
+
+# Orphaned rows per table, in deletion order (children of a table come after it)
+ORPHANS = {
+    "analyses": "analyses WHERE job_id NOT IN (SELECT id FROM jobs)",
+    "dedup_keys": "dedup_keys WHERE analysis_id NOT IN (SELECT id FROM analyses)",
+    "job_descriptions": "job_descriptions WHERE job_id NOT IN (SELECT id FROM jobs)",
+    "pipeline_runs": "pipeline_runs WHERE job_id NOT IN (SELECT id FROM jobs)",
+    "pipeline_checkpoints": "pipeline_checkpoints WHERE run_id NOT IN (SELECT id FROM pipeline_runs)",
+}
+
+
+def create_maintenance_table(cursor: sqlite3.Cursor) -> None:
+    """Create the single-row maintenance log (called by init_db)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS db_maintenance (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            started_at TEXT,
+            finished_at TEXT,
+            result TEXT
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO db_maintenance (id) VALUES (1)")
+
+
+def count_orphans(cursor: sqlite3.Cursor) -> Dict[str, int]:
+    """Orphaned rows per table."""
+    counts = {}
+    for table, orphans in ORPHANS.items():
+        cursor.execute(f"SELECT COUNT(*) FROM {orphans}")
+        counts[table] = cursor.fetchone()[0]
+    return counts
+
+
+def remove_orphans(cursor: sqlite3.Cursor) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Delete orphaned rows and clear links to deleted duplicates.
+
+    Args:
+        cursor: Cursor of the writing transaction
+
+    Returns:
+        Rows deleted per table (not counting foreign key cascades), and
+        the PDF copies of deleted runs, to remove with remove_files()
+        once the transaction is committed
+    """
+    cursor.execute(f"SELECT DISTINCT job_id FROM {ORPHANS['analyses']}")
+    orphan_jobs = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"SELECT pdf_path FROM {ORPHANS['pipeline_runs']} AND pdf_path IS NOT NULL")
+    pdf_paths = [row[0] for row in cursor.fetchall()]
+
+    removed = {}
+    for table, orphans in ORPHANS.items():
+        cursor.execute(f"DELETE FROM {orphans}")
+        removed[table] = cursor.rowcount
+    cursor.execute("""
+        UPDATE analyses SET duplicate_of = NULL
+        WHERE duplicate_of IS NOT NULL AND duplicate_of NOT IN (SELECT id FROM analyses)
+    """)
+    removed["duplicate_links"] = cursor.rowcount
+
+    # Rankings over all jobs included the orphans
+    for job_id in orphan_jobs:
+        bump_job_version(job_id, cursor=cursor)
+    if any(removed.values()):
+        logger.info("Removed orphaned rows: %s", removed)
+    return removed, pdf_paths
+
+
+def remove_files(paths: Iterable[str]) -> None:
+    """Delete files left behind by removed rows."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError as exc:
+            logger.warning("Could not remove %s: %s", path, exc)
+
+
+def claim_maintenance(cursor: sqlite3.Cursor, not_since: Optional[str] = None) -> bool:
+    """
+    Record the start of a maintenance run.
+
+    With not_since, only claim it if no run started after that ISO time,
+    so that one of several server workers runs the scheduled maintenance.
+    """
+    now = datetime.utcnow().isoformat()
+    if not_since is None:
+        cursor.execute("UPDATE db_maintenance SET started_at = ? WHERE id = 1", (now,))
+    else:
+        cursor.execute(
+            "UPDATE db_maintenance SET started_at = ? WHERE id = 1 AND (started_at IS NULL OR started_at < ?)",
+            (now, not_since),
+        )
+    return cursor.rowcount == 1
+
+
+def finish_maintenance(cursor: sqlite3.Cursor, result: Dict) -> None:
+    """Record the outcome of a maintenance run."""
+    cursor.execute(
+        "UPDATE db_maintenance SET finished_at = ?, result = ? WHERE id = 1",
+        (datetime.utcnow().isoformat(), json.dumps(result)),
+    )
+
+
+def last_maintenance(cursor: sqlite3.Cursor) -> Optional[dict]:
+    """The last maintenance run, or None if there was none."""
+    cursor.execute("SELECT started_at, finished_at, result FROM db_maintenance WHERE id = 1")
+    row = cursor.fetchone()
+    if not row or not row[0]:
+        return None
+    return {"started_at": row[0], "finished_at": row[1], "result": json.loads(row[2]) if row[2] else None}
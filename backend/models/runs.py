@@ -0,0 +1,206 @@
+"""Checkpointed CV pipeline runs.
+
+Each upload processed by CVProcessor gets a run. The output of every
+stage (per-page OCR text, the parsed info, per-category scores) is saved
+as a checkpoint when it completes, and failures are recorded per item.
+A failed run keeps a copy of its PDF, so it can be retried without a
+re-upload: the retry reuses every completed checkpoint and only re-runs
+the failed pages or categories.
+"""
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from config import PIPELINE_RUN_DIR, PIPELINE_RUN_RETENTION_HOURS
+from backend.models.connection import get_db_connection
+from backend.models.usage import attach_run_usage
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages, in order
+STAGES = ("ocr", "parse", "score", "save")
+
+
+class PipelineError(Exception):
+    """A pipeline run failed; it can be resumed with its run_id."""
+
+    def __init__(self, message: str, run_id: str, stage: str):
+        super().__init__(message)
+        self.run_id = run_id
+        self.stage = stage
+
+
+def create_runs_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the pipeline run and checkpoint tables (called by init_db)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            id TEXT PRIMARY KEY,
+            job_id INTEGER NOT NULL,
+            jd_text TEXT NOT NULL,
+            pdf_path TEXT,
+            status TEXT NOT NULL DEFAULT 'running',
+            stage TEXT,
+            error TEXT,
+            analysis_id INTEGER,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+            run_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            item TEXT NOT NULL,
+            status TEXT NOT NULL,
+            data TEXT,
+            error TEXT,
+            PRIMARY KEY (run_id, stage, item),
+            FOREIGN KEY (run_id) REFERENCES pipeline_runs(id) ON DELETE CASCADE
+        )
+    """)
+
+
+class PipelineRun:
+    """Checkpoint store for one run; passed through the CVProcessor stages."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.stage = STAGES[0]
+
+    def completed(self, stage: str) -> Dict[str, Any]:
+        """Outputs of the stage's completed items, by item."""
+        with get_db_connection() as conn:
+            rows = conn.execute(
+                "SELECT item, data FROM pipeline_checkpoints WHERE run_id = ? AND stage = ? AND status = 'done'",
+                (self.run_id, stage),
+            ).fetchall()
+        return {item: json.loads(data) for item, data in rows}
+
+    def save(self, stage: str, item: str, data: Any) -> None:
+        """Checkpoint the output of one completed item."""
+        self._write(stage, item, "done", json.dumps(data, ensure_ascii=False), None)
+
+    def fail(self, stage: str, item: str, error: str) -> None:
+        """Record that one item of a stage failed."""
+        self._write(stage, item, "failed", None, error)
+
+    def _write(self, stage: str, item: str, status: str, data: Optional[str], error: Optional[str]) -> None:
+        with get_db_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO pipeline_checkpoints (run_id, stage, item, status, data, error)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(run_id, stage, item) DO UPDATE
+                SET status = excluded.status, data = excluded.data, error = excluded.error
+                """,
+                (self.run_id, stage, item, status, data, error),
+            )
+            conn.commit()
+
+
+def create_run(pdf_path: str, job_id: int, jd_text: str) -> PipelineRun:
+    """
+    Start a run for a CV, keeping a copy of the PDF for retries.
+
+    Runs older than PIPELINE_RUN_RETENTION_HOURS that never completed are
+    purged first.
+    """
+    purge_expired_runs()
+    run_id = uuid.uuid4().hex
+    os.makedirs(PIPELINE_RUN_DIR, exist_ok=True)
+    stored_path = os.path.join(PIPELINE_RUN_DIR, f"{run_id}.pdf")
+    shutil.copyfile(pdf_path, stored_path)
+    now = datetime.utcnow().isoformat()
+    with get_db_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO pipeline_runs (id, job_id, jd_text, pdf_path, stage, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (run_id, job_id, jd_text, stored_path, STAGES[0], now, now),
+        )
+        conn.commit()
+    return PipelineRun(run_id)
+
+
+def get_run(run_id: str) -> Optional[dict]:
+    """A run with its per-stage checkpoint counts and failed items, or None."""
+    with get_db_connection() as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM pipeline_runs WHERE id = ?", (run_id,)).fetchone()
+        if not row:
+            return None
+        checkpoints = conn.execute(
+            "SELECT stage, item, status, error FROM pipeline_checkpoints WHERE run_id = ? ORDER BY stage, item",
+            (run_id,),
+        ).fetchall()
+    run = dict(row)
+    stages = {}
+    for checkpoint in checkpoints:
+        stage = stages.setdefault(checkpoint["stage"], {"done": 0, "failed": {}})
+        if checkpoint["status"] == "done":
+            stage["done"] += 1
+        else:
+            stage["failed"][checkpoint["item"]] = checkpoint["error"]
+    run["stages"] = stages
+    return run
+
+
+def mark_run(run: PipelineRun, status: str, error: Optional[str] = None) -> None:
+    """Record a run's status ('running' or 'failed') and current stage."""
+    with get_db_connection() as conn:
+        conn.execute(
+            "UPDATE pipeline_runs SET status = ?, stage = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, run.stage, error, datetime.utcnow().isoformat(), run.run_id),
+        )
+        conn.commit()
+
+
+def complete_run(run: PipelineRun, analysis_id: int) -> None:
+    """Mark a run completed, link its usage to the analysis, and drop its checkpoints and PDF copy."""
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT pdf_path FROM pipeline_runs WHERE id = ?", (run.run_id,)).fetchone()
+        conn.execute("DELETE FROM pipeline_checkpoints WHERE run_id = ?", (run.run_id,))
+        attach_run_usage(conn.cursor(), run.run_id, analysis_id)
+        conn.execute(
+            """
+            UPDATE pipeline_runs
+            SET status = 'completed', stage = NULL, error = NULL, pdf_path = NULL, analysis_id = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (analysis_id, datetime.utcnow().isoformat(), run.run_id),
+        )
+        conn.commit()
+    if row and row[0]:
+        _remove_file(row[0])
+
+
+def purge_expired_runs() -> int:
+    """Delete runs (and their PDF copies) not updated within the retention period."""
+    cutoff = (datetime.utcnow() - timedelta(hours=PIPELINE_RUN_RETENTION_HOURS)).isoformat()
+    with get_db_connection() as conn:
+        expired = conn.execute(
+            "SELECT id, pdf_path FROM pipeline_runs WHERE updated_at < ?", (cutoff,)
+        ).fetchall()
+        if not expired:
+            return 0
+        # Their checkpoints are deleted by ON DELETE CASCADE
+        conn.executemany("DELETE FROM pipeline_runs WHERE id = ?", [(run_id,) for run_id, _ in expired])
+        conn.commit()
+    for _, pdf_path in expired:
+        if pdf_path:
+            _remove_file(pdf_path)
+    logger.info("Purged %s expired pipeline runs", len(expired))
+    return len(expired)
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError as exc:
+        logger.warning("Could not remove %s: %s", path, exc)
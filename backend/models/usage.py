@@ -0,0 +1,164 @@
+"""API usage records (Gemini tokens, Vision pages) per analysis and job."""
+import sqlite3
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from backend.models.connection import get_db_connection
+from metering import UsageRecord
+
+# Summed columns reported by the aggregates
+_TOTALS = """
+    SUM(calls) AS calls, SUM(input_tokens) AS input_tokens,
+    SUM(output_tokens) AS output_tokens, SUM(units) AS units
+"""
+
+
+def create_usage_table(cursor: sqlite3.Cursor) -> None:
+    """Create the api_usage table (called by init_db)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS api_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            job_id INTEGER,
+            analysis_id INTEGER,
+            run_id TEXT,
+            service TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            model TEXT,
+            calls INTEGER NOT NULL DEFAULT 0,
+            input_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            units INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_api_usage_job ON api_usage(job_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_api_usage_analysis ON api_usage(analysis_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_api_usage_run ON api_usage(run_id)")
+
+
+def save_usage(
+    records: Iterable[UsageRecord],
+    job_id: Optional[int] = None,
+    analysis_id: Optional[int] = None,
+    run_id: Optional[str] = None,
+) -> None:
+    """
+    Store usage records for one unit of work.
+
+    Records that name their own job keep it; the others are attributed
+    to job_id.
+    """
+    records = list(records)
+    if not records:
+        return
+    with get_db_connection() as conn:
+        insert_usage(conn.cursor(), records, job_id, analysis_id, run_id)
+        conn.commit()
+
+
+def insert_usage(
+    cursor: sqlite3.Cursor,
+    records: Iterable[UsageRecord],
+    job_id: Optional[int] = None,
+    analysis_id: Optional[int] = None,
+    run_id: Optional[str] = None,
+) -> None:
+    """Like save_usage(), inside the caller's transaction."""
+    now = datetime.utcnow().isoformat()
+    cursor.executemany(
+        """
+        INSERT INTO api_usage (created_at, job_id, analysis_id, run_id, service, operation, model,
+                               calls, input_tokens, output_tokens, units)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                now, record.job_id if record.job_id is not None else job_id, analysis_id, run_id,
+                record.service, record.operation, record.model,
+                record.calls, record.input_tokens, record.output_tokens, record.units,
+            )
+            for record in records
+        ],
+    )
+
+
+def attach_run_usage(cursor: sqlite3.Cursor, run_id: str, analysis_id: int) -> None:
+    """Attribute the usage of every attempt of a run to the analysis it produced."""
+    cursor.execute("UPDATE api_usage SET analysis_id = ? WHERE run_id = ?", (analysis_id, run_id))
+
+
+def _period(since: Optional[str], until: Optional[str]) -> tuple:
+    """WHERE clause and params for an optional [since, until] range of ISO dates."""
+    clauses, params = [], []
+    if since:
+        clauses.append("u.created_at >= ?")
+        params.append(since)
+    if until:
+        # A bare date includes the whole day
+        clauses.append("u.created_at < ?" if len(until) > 10 else "substr(u.created_at, 1, 10) <= ?")
+        params.append(until)
+    return clauses, params
+
+
+def usage_by_job(since: Optional[str] = None, until: Optional[str] = None) -> List[dict]:
+    """Usage totals per job and service, with the number of analyses they cover."""
+    clauses, params = _period(since, until)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_db_connection() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"""
+            SELECT u.job_id, j.title AS job_title, u.service, {_TOTALS},
+                   COUNT(DISTINCT u.analysis_id) AS analyses
+            FROM api_usage u
+            LEFT JOIN jobs j ON j.id = u.job_id
+            {where}
+            GROUP BY u.job_id, u.service
+            ORDER BY u.job_id, u.service
+            """,
+            params,
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def usage_by_day(
+    job_id: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> List[dict]:
+    """Usage totals per day (UTC), service and operation, optionally for one job."""
+    clauses, params = _period(since, until)
+    if job_id is not None:
+        clauses.append("u.job_id = ?")
+        params.append(job_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_db_connection() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"""
+            SELECT substr(u.created_at, 1, 10) AS day, u.service, u.operation, {_TOTALS}
+            FROM api_usage u
+            {where}
+            GROUP BY day, u.service, u.operation
+            ORDER BY day, u.service, u.operation
+            """,
+            params,
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def usage_for_analysis(analysis_id: int) -> List[dict]:
+    """Usage of one analysis (CV) per service and operation."""
+    with get_db_connection() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"""
+            SELECT u.service, u.operation, u.model, {_TOTALS}
+            FROM api_usage u
+            WHERE u.analysis_id = ?
+            GROUP BY u.service, u.operation, u.model
+            ORDER BY u.service, u.operation
+            """,
+            (analysis_id,),
+        ).fetchall()
+    return [dict(row) for row in rows]
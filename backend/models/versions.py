@@ -0,0 +1,118 @@
+"""Data version counters used for ETags and cache invalidation.
+
+Versions live in the data_versions table so that every server worker
+sees writes made by the others. Each worker also caches the versions it
+has read, so conditional GETs are answered from memory: its own writes
+invalidate the cache when they commit, and entries older than
+VERSION_CACHE_TTL are read again to pick up other workers' writes.
+"""
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from config import VERSION_CACHE_TTL
+from backend.models.connection import get_db_connection
+
+_epoch: Optional[int] = None
+
+# scope -> (version, monotonic time it was read)
+_cache: Dict[str, Tuple[int, float]] = {}
+# Scopes bumped by a transaction that has not committed yet: never cached
+_pending: Set[str] = set()
+# Incremented on every invalidation, so a read that raced one is not cached
+_generation = 0
+_cache_lock = threading.Lock()
+
+
+def create_versions_table(cursor: sqlite3.Cursor) -> None:
+    """Create the data_versions table and its random epoch (called by init_db)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    # Differs per database file, so ETags for a recreated database never match old ones
+    cursor.execute(
+        "INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('epoch', ?)",
+        (random.getrandbits(31),),
+    )
+
+
+def bump_job_version(job_id: int, jobs_changed: bool = False, cursor: Optional[sqlite3.Cursor] = None) -> None:
+    """
+    Record a write affecting a job's analyses (and optionally the job list).
+
+    Pass the cursor of the writing transaction to bump atomically with
+    the write; without one, call after the write has been committed.
+    Bumps made with a cursor stay uncached until the transaction ends
+    and release_pending_versions() is called (the database writer does).
+    """
+    scopes = [f"job:{job_id}", "analyses"] + (["jobs"] if jobs_changed else [])
+    sql = """
+        INSERT INTO data_versions (scope, version) VALUES (?, 1)
+        ON CONFLICT(scope) DO UPDATE SET version = version + 1
+    """
+    if cursor is not None:
+        with _cache_lock:
+            _pending.update(scopes)
+            _invalidate(scopes)
+        cursor.executemany(sql, [(scope,) for scope in scopes])
+        return
+    with get_db_connection() as conn:
+        conn.executemany(sql, [(scope,) for scope in scopes])
+        conn.commit()
+    with _cache_lock:
+        _invalidate(scopes)
+
+
+def release_pending_versions() -> None:
+    """Let versions bumped by the transaction just committed (or rolled back) be cached again."""
+    with _cache_lock:
+        if _pending:
+            _invalidate(_pending)
+            _pending.clear()
+
+
+def _invalidate(scopes) -> None:
+    """Drop cached versions (call with _cache_lock held)."""
+    global _generation
+    _generation += 1
+    for scope in scopes:
+        _cache.pop(scope, None)
+
+
+def _read_version(scope: str) -> int:
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(scope)
+        if cached is not None and now - cached[1] < VERSION_CACHE_TTL:
+            return cached[0]
+        generation = _generation
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT version FROM data_versions WHERE scope = ?", (scope,)).fetchone()
+    version = row[0] if row else 0
+    with _cache_lock:
+        if generation == _generation and scope not in _pending:
+            _cache[scope] = (version, now)
+    return version
+
+
+def get_ranking_version(job_id: Optional[int] = None) -> int:
+    """Version of the ranking for one job, or of all analyses if job_id is None."""
+    return _read_version(f"job:{job_id}" if job_id else "analyses")
+
+
+def get_jobs_version() -> int:
+    """Version of the job list."""
+    return _read_version("jobs")
+
+
+def make_etag(scope: str, version: int) -> str:
+    """Weak ETag for a versioned resource."""
+    global _epoch
+    if _epoch is None:
+        _epoch = _read_version("epoch")
+    return f'W/"{_epoch:x}.{scope}.{version}"'
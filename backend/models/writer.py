@@ -0,0 +1,157 @@
+"""Single-writer queue that commits database writes in small batches."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from config import WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+from backend.models.database import get_db_connection
+from backend.models.versions import release_pending_versions
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    Write-behind queue served by one dedicated writer thread.
+
+    Callers submit a write function and get a Future for its return
+    value. The writer thread groups the writes queued within
+    max_delay seconds (up to max_batch of them) into one transaction, so
+    concurrent requests share a single commit and never contend for
+    SQLite's write lock. Each write runs under its own savepoint: one
+    that raises fails only its own future.
+    """
+
+    def __init__(self, max_batch: int = WRITE_BATCH_SIZE, max_delay: float = WRITE_FLUSH_INTERVAL):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, write: Callable[[sqlite3.Cursor], Any]) -> Future:
+        """
+        Queue a write.
+
+        Args:
+            write: Function run on the writer thread with a cursor; it
+                must not commit or roll back
+
+        Returns:
+            Future resolved with the function's return value once the
+            batch containing it has been committed
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Database writer is shut down")
+            self._queue.put((write, future))
+        return future
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Commit every queued write, then stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        conn = get_db_connection()
+        try:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._collect(self._queue.get())
+                if batch:
+                    self._commit(conn, batch)
+        finally:
+            conn.close()
+
+    def _collect(self, first) -> Tuple[List[tuple], bool]:
+        """Gather writes until the batch is full or its flush deadline passes."""
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[tuple]) -> None:
+        outcomes = []
+        cursor = conn.cursor()
+        try:
+            # Explicit BEGIN so releasing a savepoint never commits on its own
+            cursor.execute("BEGIN")
+            for write, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((future, write(cursor), None))
+                    cursor.execute("RELEASE write")
+                except Exception as exc:
+                    cursor.execute("ROLLBACK TO write")
+                    cursor.execute("RELEASE write")
+                    outcomes.append((future, None, exc))
+            conn.commit()
+        except Exception as exc:
+            logger.error("Batched write of %s items failed: %s", len(batch), exc)
+            conn.rollback()
+            release_pending_versions()
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        release_pending_versions()
+        metrics.increment("db_write_batches")
+        metrics.increment("db_writes", len(outcomes))
+        for future, result, exc in outcomes:
+            if exc is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exc)
+
+
+_writer: Optional[BatchWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> BatchWriter:
+    """Process-wide database writer, started on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BatchWriter()
+        return _writer
+
+
+def shutdown_writer() -> None:
+    """Flush and stop the process-wide writer; a later get_writer() starts a new one."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
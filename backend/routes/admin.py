@@ -0,0 +1,47 @@
+"""Admin routes for database maintenance."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import logging
+from typing import Any, Dict
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from backend.services.maintenance_service import MaintenanceService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class AdminResponse(BaseModel):
+    success: bool
+    data: Dict[str, Any]
+
+
+@router.get("/db", response_model=AdminResponse)
+async def get_db_stats():
+    """Get database size, fragmentation, table and index stats, and orphaned rows."""
+    try:
+        return {"success": True, "data": await run_in_threadpool(MaintenanceService.stats)}
+    except Exception as e:
+        logger.error("Error getting database stats: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/db/maintenance", response_model=AdminResponse)
+async def run_db_maintenance():
+    """Remove orphans, release free pages and refresh planner statistics now."""
+    try:
+        return {"success": True, "data": await run_in_threadpool(MaintenanceService.run)}
+    except Exception as e:
+        logger.error("Error running database maintenance: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
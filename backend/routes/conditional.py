@@ -0,0 +1,19 @@
+"""Helpers for conditional GET (ETag / If-None-Match)."""
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def conditional_json(request: Request, etag: str, build: Callable[[], dict]) -> Response:
+    """
+    Return 304 if the client already has this ETag, else the JSON built by `build`.
+    
+    `build` is only called on a miss, so unchanged polls skip all data work.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=jsonable_encoder(build()), headers=headers)
@@ -5,12 +5,21 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, status
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Form, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from backend.services.cv_processor import CVProcessor
 from backend.services.ranking_service import RankingService
-from backend.models.database import get_job_by_id
+from backend.services.export_service import EXPORT_FORMATS, ExportService
+from backend.services.search_service import SearchService
+from backend.models.database import get_all_jobs, get_job_by_id
+from backend.models.runs import PipelineError, get_run
+from backend.models.versions import get_ranking_version, make_etag
+from backend.routes.conditional import conditional_json
+from backend.routes.uploads import spooled_pdf
+from scheduler import INTERACTIVE, PRIORITY_CLASSES, workload
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +35,8 @@ class RankingItem(BaseModel):
     email: Optional[str] = None
     phone: Optional[str] = None
     score: Optional[float] = None
+    relevance: Optional[float] = None
+    status: Optional[str] = None
     created_at: Optional[str] = None
 
 
@@ -34,24 +45,119 @@ class RankingResponse(BaseModel):
     data: List[RankingItem]
 
 
+class SearchItem(BaseModel):
+    id: int
+    job_id: int
+    job_title: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    score: Optional[float] = None
+    rank: float
+    snippet: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    success: bool
+    data: List[SearchItem]
+
+
 class CVProcessResponse(BaseModel):
     success: bool
     data: dict
 
 
+class RunResponse(BaseModel):
+    success: bool
+    data: dict
+
+
+def _process_response(result: dict) -> dict:
+    """Response body for a processed CV."""
+    return {
+        "success": True,
+        "data": {
+            "analysis_id": result["analysis_id"],
+            "run_id": result["run_id"],
+            "duplicate_of": result["duplicate_of"],
+            "status": result["status"],
+            "relevance": result["relevance"],
+            "candidate_info": result["info"],
+            "scores": result["score_dict"],
+            "reasons": result["reason_dict"],
+            "total_score": result["total_score"]
+        }
+    }
+
+
+def _validate_priority(priority: str) -> None:
+    """Validate a scheduling priority class, raising 400 on bad values."""
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"priority must be one of: {', '.join(PRIORITY_CLASSES)}"
+        )
+
+
+def _pipeline_error(e: PipelineError) -> HTTPException:
+    """HTTP error for a failed run, telling the client which run to retry."""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST if isinstance(e.__cause__, ValueError)
+        else status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail={"message": str(e), "run_id": e.run_id, "stage": e.stage}
+    )
+
+
+def _resolve_jobs(job_ids: str) -> List[dict]:
+    """Resolve a comma-separated list of job IDs (or "all") to job rows."""
+    if job_ids.strip().lower() == "all":
+        jobs = get_all_jobs()
+        if not jobs:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No jobs found"
+            )
+        return jobs
+    
+    try:
+        ids = [int(part) for part in job_ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="job_ids must be a comma-separated list of integers or 'all'"
+        )
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one job ID is required"
+        )
+    
+    jobs = []
+    for job_id in dict.fromkeys(ids):
+        job = get_job_by_id(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job {job_id} not found"
+            )
+        jobs.append(job)
+    return jobs
+
+
 @router.post("/process", response_model=CVProcessResponse)
 async def process_cv(
     file: UploadFile = File(...),
-    job_id: int = Form(...)
+    job_id: int = Form(...),
+    priority: str = Form(INTERACTIVE)
 ):
-    """Process a CV file and score it against a job."""
+    """
+    Process a CV file and score it against a job.
+    
+    Bulk clients should send priority=bulk so that interactive uploads
+    are served first.
+    """
     try:
-        # Validate file type
-        if not file.filename.endswith('.pdf'):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only PDF files are allowed"
-            )
+        _validate_priority(priority)
         
         # Verify job exists
         job = get_job_by_id(job_id)
@@ -63,16 +169,155 @@ async def process_cv(
         
         jd_text = job['description']
         
-        # Read file bytes
-        file_bytes = await file.read()
+        # Spool the upload to disk and process it from there, off the event loop
+        # so concurrent uploads overlap (and identical ones are coalesced)
+        async with spooled_pdf(file) as pdf_path:
+            processor = CVProcessor()
+            with workload(priority, job_id):
+                result = await run_in_threadpool(processor.process_cv, pdf_path, job_id, jd_text)
+        
+        return _process_response(result)
+        
+    except HTTPException:
+        raise
+    except PipelineError as e:
+        logger.error("Error processing CV (run %s, stage %s): %s", e.run_id, e.stage, e)
+        raise _pipeline_error(e)
+    except ValueError as e:
+        logger.error("Validation error processing CV: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Error processing CV: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/process-multi", response_model=CVProcessResponse)
+async def process_cv_multi(
+    file: UploadFile = File(...),
+    job_ids: str = Form("all"),
+    priority: str = Form(INTERACTIVE)
+):
+    """Process a CV once and score it against several jobs."""
+    try:
+        _validate_priority(priority)
+        jobs = _resolve_jobs(job_ids)
+        
+        # Spool the upload to disk and process it from there, off the event loop
+        async with spooled_pdf(file) as pdf_path:
+            processor = CVProcessor()
+            with workload(priority):
+                result = await run_in_threadpool(processor.process_cv_multi, pdf_path, jobs)
+        
+        return {
+            "success": True,
+            "data": {
+                "candidate_info": result["info"],
+                "results": [
+                    {
+                        "analysis_id": item["analysis_id"],
+                        "duplicate_of": item["duplicate_of"],
+                        "status": item["status"],
+                        "relevance": item["relevance"],
+                        "job_id": item["job_id"],
+                        "job_title": item["job_title"],
+                        "scores": item["score_dict"],
+                        "reasons": item["reason_dict"],
+                        "total_score": item["total_score"]
+                    }
+                    for item in result["results"]
+                ]
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error("Validation error processing CV: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Error processing CV for multiple jobs: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/runs/{run_id}", response_model=RunResponse)
+async def get_run_status(run_id: str):
+    """Status of a processing run, with completed and failed items per stage."""
+    run = get_run(run_id)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Run not found"
+        )
+    run.pop("pdf_path", None)
+    run.pop("jd_text", None)
+    return {"success": True, "data": run}
+
+
+@router.post("/runs/{run_id}/retry", response_model=CVProcessResponse)
+async def retry_run(run_id: str):
+    """Resume a failed run, re-running only its failed pages or categories."""
+    try:
+        run = get_run(run_id)
+        if not run:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Run not found"
+            )
+        if run["status"] == "completed":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Run already completed (analysis {run['analysis_id']})"
+            )
         
-        # Process CV
         processor = CVProcessor()
-        result = processor.process_cv(file_bytes, job_id, jd_text)
+        with workload(INTERACTIVE, run["job_id"]):
+            result = await run_in_threadpool(processor.resume_run, run_id)
+        return _process_response(result)
+    except HTTPException:
+        raise
+    except PipelineError as e:
+        logger.error("Retry of run %s failed at stage %s: %s", e.run_id, e.stage, e)
+        raise _pipeline_error(e)
+    except ValueError as e:
+        logger.error("Validation error retrying run %s: %s", run_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Error retrying run %s: %s", run_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/{analysis_id}/score", response_model=CVProcessResponse)
+async def score_analysis(analysis_id: int):
+    """Run LLM scoring for an analysis that prescreening deferred or skipped."""
+    try:
+        processor = CVProcessor()
+        result = await run_in_threadpool(processor.score_analysis, analysis_id)
         
         return {
             "success": True,
             "data": {
+                "analysis_id": result["analysis_id"],
+                "duplicate_of": result["duplicate_of"],
+                "status": result["status"],
+                "relevance": result["relevance"],
                 "candidate_info": result["info"],
                 "scores": result["score_dict"],
                 "reasons": result["reason_dict"],
@@ -80,16 +325,19 @@ async def process_cv(
             }
         }
         
-    except HTTPException:
-        raise
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
     except ValueError as e:
-        logger.error("Validation error processing CV: %s", e)
+        logger.error("Validation error scoring analysis %s: %s", analysis_id, e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
-        logger.error("Error processing CV: %s", e, exc_info=True)
+        logger.error("Error scoring analysis %s: %s", analysis_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -97,14 +345,66 @@ async def process_cv(
 
 
 @router.get("/ranking", response_model=RankingResponse)
-async def get_ranking(job_id: Optional[int] = Query(None)):
-    """Get CV ranking."""
+async def get_ranking(request: Request, job_id: Optional[int] = Query(None)):
+    """Get CV ranking. Supports conditional requests via ETag / If-None-Match."""
     try:
-        ranking = RankingService.get_ranking_dict(job_id)
-        return {"success": True, "data": ranking}
+        etag = make_etag(f"ranking-{job_id or 'all'}", get_ranking_version(job_id))
+        return conditional_json(
+            request,
+            etag,
+            lambda: {"success": True, "data": RankingService.get_ranking_dict(job_id)}
+        )
     except Exception as e:
         logger.error("Error getting ranking: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_cvs(
+    q: str = Query(..., min_length=1),
+    job_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Full-text search over candidate name, skills, experience, education and languages."""
+    try:
+        results = SearchService.search(q, job_id, limit)
+        return {"success": True, "data": results}
+    except Exception as e:
+        logger.error("Error searching CVs: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/export")
+async def export_cvs(
+    format: str = Query("csv"),
+    job_id: Optional[int] = Query(None)
+):
+    """Stream the ranking with parsed candidate info as CSV, NDJSON or Parquet."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if format == "parquet" and not ExportService.parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export requires pyarrow to be installed"
+        )
+    if job_id and not get_job_by_id(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    filename = f"ranking_job_{job_id}.{format}" if job_id else f"ranking.{format}"
+    return StreamingResponse(
+        ExportService.stream(format, job_id),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
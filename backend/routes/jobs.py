@@ -4,17 +4,24 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 import logging
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status
+import math
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
 from pydantic import BaseModel
 
+from config import SCORING_CATEGORIES
 from backend.models.database import (
     create_job,
     delete_job,
     get_all_jobs,
     get_job_by_id,
+    set_job_weights,
     update_job,
 )
+from backend.models.versions import get_jobs_version, make_etag
+from backend.routes.conditional import conditional_json
+from backend.services.local_scoring_service import SCORING_MODES
+from backend.services.prescreen_service import PRESCREEN_MODES, PrescreenService, get_lexical_index
 
 logger = logging.getLogger(__name__)
 
@@ -25,17 +32,33 @@ router = APIRouter()
 class JobCreate(BaseModel):
     title: str
     description: str
+    prescreen_mode: str = "off"
+    prescreen_threshold: float = 0.0
+    scoring_mode: str = "llm"
+    category_weights: Optional[Dict[str, float]] = None
 
 
 class JobUpdate(BaseModel):
     title: str
     description: str
+    prescreen_mode: Optional[str] = None
+    prescreen_threshold: Optional[float] = None
+    scoring_mode: Optional[str] = None
+    category_weights: Optional[Dict[str, float]] = None
+
+
+class WeightsUpdate(BaseModel):
+    category_weights: Dict[str, float]
 
 
 class JobResponse(BaseModel):
     id: int
     title: str
     description: str
+    prescreen_mode: Optional[str] = "off"
+    prescreen_threshold: Optional[float] = 0.0
+    scoring_mode: Optional[str] = "llm"
+    category_weights: Optional[Dict[str, float]] = None
     created_at: str
     updated_at: str
 
@@ -52,12 +75,73 @@ class JobsListResponse(BaseModel):
     data: List[JobResponse]
 
 
+class WeightsResult(BaseModel):
+    job: JobResponse
+    rescored: int
+
+
+class WeightsResponse(BaseModel):
+    success: bool
+    data: WeightsResult
+
+
+class PrescreenItem(BaseModel):
+    analysis_id: int
+    relevance: float
+
+
+class PrescreenResponse(BaseModel):
+    success: bool
+    data: List[PrescreenItem]
+
+
+def _validate_prescreen(mode: Optional[str], threshold: Optional[float]) -> None:
+    """Validate prescreen settings, raising 400 on bad values."""
+    if mode is not None and mode not in PRESCREEN_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"prescreen_mode must be one of: {', '.join(PRESCREEN_MODES)}"
+        )
+    if threshold is not None and not 0.0 <= threshold <= 1.0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="prescreen_threshold must be between 0 and 1"
+        )
+
+
+def _validate_scoring_mode(mode: Optional[str]) -> None:
+    """Validate a job's scoring mode, raising 400 on bad values."""
+    if mode is not None and mode not in SCORING_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"scoring_mode must be one of: {', '.join(SCORING_MODES)}"
+        )
+
+
+def _validate_weights(weights: Optional[Dict[str, float]]) -> None:
+    """Validate category weights, raising 400 on bad values. An empty dict means equal weights."""
+    if not weights:
+        return
+    unknown = set(weights) - set(SCORING_CATEGORIES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown categories in category_weights: {', '.join(sorted(unknown))}; "
+                   f"expected: {', '.join(SCORING_CATEGORIES)}"
+        )
+    if any(not math.isfinite(w) or w < 0 for w in weights.values()) or sum(weights.values()) <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="category_weights must be non-negative with a positive sum"
+        )
+
+
 @router.get("", response_model=JobsListResponse)
-async def list_jobs():
-    """Get all jobs."""
+async def list_jobs(request: Request):
+    """Get all jobs. Supports conditional requests via ETag / If-None-Match."""
     try:
-        jobs = get_all_jobs()
-        return {"success": True, "data": jobs}
+        etag = make_etag("jobs", get_jobs_version())
+        return conditional_json(request, etag, lambda: {"success": True, "data": get_all_jobs()})
     except Exception as e:
         logger.error("Error listing jobs: %s", e, exc_info=True)
         raise HTTPException(
@@ -104,8 +188,18 @@ async def create_job_route(job: JobCreate):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Description is required"
             )
+        _validate_prescreen(job.prescreen_mode, job.prescreen_threshold)
+        _validate_scoring_mode(job.scoring_mode)
+        _validate_weights(job.category_weights)
         
-        job_id = create_job(title, description)
+        job_id = create_job(
+            title,
+            description,
+            job.prescreen_mode,
+            job.prescreen_threshold,
+            job.scoring_mode,
+            job.category_weights,
+        )
         created_job = get_job_by_id(job_id)
         return {"success": True, "data": created_job}
     except HTTPException:
@@ -142,8 +236,19 @@ async def update_job_route(job_id: int, job: JobUpdate):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Description is required"
             )
+        _validate_prescreen(job.prescreen_mode, job.prescreen_threshold)
+        _validate_scoring_mode(job.scoring_mode)
+        _validate_weights(job.category_weights)
         
-        success = update_job(job_id, title, description)
+        success = update_job(
+            job_id,
+            title,
+            description,
+            job.prescreen_mode,
+            job.prescreen_threshold,
+            job.scoring_mode,
+            job.category_weights,
+        )
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -162,6 +267,32 @@ async def update_job_route(job_id: int, job: JobUpdate):
         )
 
 
+@router.put("/{job_id}/weights", response_model=WeightsResponse)
+async def update_weights_route(job_id: int, body: WeightsUpdate):
+    """
+    Set a job's category weights and re-rank its stored CVs from their category scores.
+    
+    No LLM calls are made; an empty object restores equal weights.
+    """
+    try:
+        _validate_weights(body.category_weights)
+        rescored = set_job_weights(job_id, body.category_weights)
+        if rescored is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        return {"success": True, "data": {"job": get_job_by_id(job_id), "rescored": rescored}}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error updating weights for job %s: %s", job_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.delete("/{job_id}", response_model=SuccessResponse)
 async def delete_job_route(job_id: int):
     """Delete a job."""
@@ -179,6 +310,7 @@ async def delete_job_route(job_id: int):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to delete job"
             )
+        get_lexical_index().remove_job(job_id)
         
         return {"success": True, "message": "Job deleted successfully"}
     except HTTPException:
@@ -189,3 +321,28 @@ async def delete_job_route(job_id: int):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+
+@router.get("/{job_id}/prescreen", response_model=PrescreenResponse)
+async def prescreen_job(
+    job_id: int,
+    limit: int = Query(50, ge=1, le=1000),
+    job_only: bool = Query(False)
+):
+    """Shortlist stored CVs by local lexical relevance to a job, without LLM calls."""
+    try:
+        job = get_job_by_id(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        return {"success": True, "data": PrescreenService.shortlist(job, limit, job_only)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error prescreening job %s: %s", job_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
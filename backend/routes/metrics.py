@@ -0,0 +1,26 @@
+"""Routes for operational metrics."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import logging
+from typing import Dict
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class MetricsResponse(BaseModel):
+    success: bool
+    data: Dict[str, float]
+
+
+@router.get("", response_model=MetricsResponse)
+async def get_metrics():
+    """Get in-process counters (OCR pages sent/skipped, ...)."""
+    return {"success": True, "data": metrics.snapshot()}
@@ -0,0 +1,89 @@
+"""Helpers for receiving PDF uploads with bounded memory."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import logging
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, UploadFile, status
+
+from config import MAX_PDF_PAGES, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+TOO_LARGE_DETAIL = f"File is too large (maximum {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)"
+
+
+def upload_too_large(request: Request) -> bool:
+    """Whether a request's Content-Length already exceeds the upload limit."""
+    content_length = request.headers.get("content-length", "")
+    # Allow some room for the multipart envelope and the other form fields
+    return content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES + 64 * 1024
+
+
+@asynccontextmanager
+async def spooled_pdf(file: UploadFile) -> AsyncIterator[str]:
+    """
+    Copy an uploaded PDF to a temporary file in fixed-size chunks and yield its path.
+    
+    Enforces MAX_UPLOAD_BYTES while copying and MAX_PDF_PAGES once the file
+    is on disk; the temporary file is removed on exit.
+    """
+    if not file.filename or not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are allowed"
+        )
+    
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(b"%PDF"):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="File is not a valid PDF"
+                    )
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=TOO_LARGE_DETAIL
+                    )
+                out.write(chunk)
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty"
+            )
+        
+        import ocr  # Deferred: PyMuPDF is only needed once an upload arrives
+        
+        try:
+            pages = ocr.count_pdf_pages(path)
+        except Exception as exc:
+            logger.warning("Could not open uploaded PDF: %s", exc)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is not a valid PDF"
+            )
+        if pages > MAX_PDF_PAGES:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"PDF has {pages} pages (maximum {MAX_PDF_PAGES})"
+            )
+        
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
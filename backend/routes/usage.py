@@ -0,0 +1,84 @@
+"""Routes for API usage (Gemini tokens, Vision pages) per job, day and analysis."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel
+
+from backend.models.usage import usage_by_day, usage_by_job, usage_for_analysis
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class UsageResponse(BaseModel):
+    success: bool
+    data: List[Dict[str, Any]]
+
+
+def _validate_period(since: Optional[str], until: Optional[str]) -> None:
+    """Reject bounds that are not ISO dates or datetimes (UTC)."""
+    for name, value in (("since", since), ("until", until)):
+        if value is None:
+            continue
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{name} must be an ISO date or datetime, e.g. 2024-05-01"
+            )
+
+
+@router.get("/jobs", response_model=UsageResponse)
+async def get_usage_by_job(since: Optional[str] = Query(None), until: Optional[str] = Query(None)):
+    """Get usage totals per job and service over an optional date range."""
+    try:
+        _validate_period(since, until)
+        return {"success": True, "data": usage_by_job(since, until)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error getting usage by job: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/daily", response_model=UsageResponse)
+async def get_usage_by_day(
+    job_id: Optional[int] = Query(None),
+    since: Optional[str] = Query(None),
+    until: Optional[str] = Query(None)
+):
+    """Get usage totals per day, service and operation, optionally for one job."""
+    try:
+        _validate_period(since, until)
+        return {"success": True, "data": usage_by_day(job_id, since, until)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error getting daily usage: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/analyses/{analysis_id}", response_model=UsageResponse)
+async def get_analysis_usage(analysis_id: int):
+    """Get the usage of one analysis (CV) per service and operation."""
+    try:
+        return {"success": True, "data": usage_for_analysis(analysis_id)}
+    except Exception as e:
+        logger.error("Error getting usage for analysis %s: %s", analysis_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
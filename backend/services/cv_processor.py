@@ -1,23 +1,59 @@
 """CV processing service - handles OCR, parsing, and scoring."""
-import json
+import functools
 import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
-
-import google.generativeai as genai
+from typing import Callable, Dict, List, Optional
 
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
-from config import GOOGLE_GENAI_API_KEY, GOOGLE_VISION_API_KEY, LLM_MODEL_NAME
-from backend.models.database import get_db_connection
-import ocr
+from config import (
+    DEDUP_ENABLED,
+    GOOGLE_GENAI_API_KEY,
+    GOOGLE_VISION_API_KEY,
+    LLM_MODEL_NAME,
+    OCR_BACKEND,
+    SCORING_CATEGORIES as CATEGORIES,
+    SCORING_MAX_WORKERS,
+    TIERED_MIN_CONFIDENCE,
+)
+from backend.models.database import (
+    CATEGORY_SCORE_COLUMNS,
+    decode_cv_data,
+    encode_cv_data,
+    get_category_weights,
+    get_db_connection,
+    get_jd_version,
+    get_job_by_id,
+    index_analysis,
+    weighted_total,
+)
+from backend.models.runs import PipelineError, PipelineRun, complete_run, create_run, get_run, mark_run
+from backend.models.usage import save_usage
+from backend.models.versions import bump_job_version, release_pending_versions
+from backend.models.writer import get_writer
+from backend.services.dedup_service import DedupService
+from backend.services.local_scoring_service import LOCAL_CATEGORIES, LocalScoringService
+from backend.services.prescreen_service import PrescreenService
+from metering import MeteredModel, metering, operation
+from prompt import prompt_extract_candidate_info
+from scheduler import bind, llm_scheduler
+from utils import SingleFlight, content_key
 import llm_processor
 import marker
+import metrics
 
 logger = logging.getLogger(__name__)
 
+# Concurrent identical OCR/LLM calls (e.g. the same CV uploaded twice at once) run once
+_process_flight = SingleFlight("cv_process")
+_ocr_flight = SingleFlight("ocr")
+_parse_flight = SingleFlight("llm_parse")
+_score_flight = SingleFlight("llm_score")
+
 
 class CVProcessor:
     """Service for processing CVs: OCR, parsing, and scoring."""
@@ -27,111 +63,608 @@ class CVProcessor:
         if not GOOGLE_GENAI_API_KEY:
             raise ValueError("GOOGLE_GENAI_API_KEY is not configured")
         
+        # Deferred so the web server starts without loading the Gemini SDK
+        import google.generativeai as genai
+        
         genai.configure(api_key=GOOGLE_GENAI_API_KEY)
-        self.model = genai.GenerativeModel(LLM_MODEL_NAME)
+        self.model = MeteredModel(genai.GenerativeModel(LLM_MODEL_NAME), LLM_MODEL_NAME)
+        self.dedup = DedupService() if DEDUP_ENABLED else None
     
-    def process_cv(self, file_bytes: bytes, job_id: int, jd_text: str) -> Dict:
+    def process_cv(self, pdf_path: str, job_id: int, jd_text: str) -> Dict:
         """
         Process a CV: OCR, parse, and score against JD.
         
         Args:
-            file_bytes: PDF file bytes
+            pdf_path: Path to the PDF file
             job_id: ID of the job position
             jd_text: Job description text
             
         Returns:
-            Dictionary containing candidate info, scores, and reasons
+            Dictionary containing candidate info, scores, reasons and the 'run_id'
+            
+        Raises:
+            PipelineError: A stage failed; resume_run(run_id) retries from there
+        """
+        # The same file submitted twice at once (a double click) yields one analysis
+        key = content_key(DedupService.file_hash(pdf_path), str(job_id), jd_text)
+        return _process_flight.do(key, self._process_cv, pdf_path, job_id, jd_text)
+    
+    def _process_cv(self, pdf_path: str, job_id: int, jd_text: str) -> Dict:
+        run = create_run(pdf_path, job_id, jd_text)
+        return self._run_pipeline(run, pdf_path, job_id, jd_text)
+    
+    def resume_run(self, run_id: str) -> Dict:
+        """
+        Retry a failed run from its checkpoints, without a re-upload.
+        
+        Completed OCR pages, the parse and completed category scores are
+        reused; only the failed pages or categories are run again.
+        
+        Raises:
+            LookupError: Unknown (or expired) run
+            ValueError: The run has already completed
+            PipelineError: A stage failed again
+        """
+        run = get_run(run_id)
+        if not run:
+            raise LookupError(f"Run {run_id} not found")
+        if run["status"] == "completed":
+            raise ValueError(f"Run {run_id} already completed (analysis {run['analysis_id']})")
+        return _process_flight.do(
+            content_key("run", run_id),
+            self._run_pipeline, PipelineRun(run_id), run["pdf_path"], run["job_id"], run["jd_text"],
+        )
+    
+    def _run_pipeline(self, run: PipelineRun, pdf_path: str, job_id: int, jd_text: str) -> Dict:
+        """Run (or resume) every stage of a run, checkpointing as it goes."""
+        mark_run(run, "running")
+        with metering() as meter:
+            try:
+                prepared = self.prepare_cv(pdf_path, run=run)
+                job = dict(get_job_by_id(job_id) or {"id": job_id}, description=jd_text)
+                run.stage = "score"
+                result = self.evaluate(prepared, job, run)
+                
+                # Save to database
+                run.stage = "save"
+                if result["analysis_id"] is None:
+                    result["analysis_id"] = self._save_analysis(prepared, job_id, jd_text, result)
+            except Exception as exc:
+                logger.warning("Run %s failed at stage %s: %s", run.run_id, run.stage, exc)
+                mark_run(run, "failed", str(exc))
+                raise PipelineError(str(exc), run.run_id, run.stage) from exc
+            finally:
+                # Failed attempts are billed too; complete_run links them to the analysis
+                save_usage(meter.records(), job_id, run_id=run.run_id)
+        
+        complete_run(run, result["analysis_id"])
+        return {"info": prepared["info"], **result, "run_id": run.run_id}
+    
+    def evaluate(self, prepared: Dict, job: Dict, run: Optional[PipelineRun] = None) -> Dict:
+        """
+        Prescreen and score a prepared CV against a job, without saving.
+        
+        Returns the stored result (with its 'analysis_id') when this
+        candidate was already scored for the job; otherwise a new result
+        whose 'analysis_id' is None. With a run, category scores are
+        checkpointed.
+        """
+        reused = self._reuse_for_job(prepared, job["id"])
+        if reused:
+            return reused
+        
+        screen = PrescreenService.evaluate(prepared["info"], job)
+        if screen["status"] == "scored":
+            result = self.score_info(
+                prepared["info"], job["description"], job.get("scoring_mode"), job.get("category_weights"), run
+            )
+        else:
+            result = self._unscored()
+        result.update(screen)
+        result.update({"analysis_id": None, "duplicate_of": self._duplicate_of(prepared)})
+        return result
+    
+    def process_cv_multi(self, pdf_path: str, jobs: List[Dict]) -> Dict:
+        """
+        Process a CV once and score it against several jobs.
+        
+        OCR and parsing run a single time; only the scoring calls are
+        repeated per job, and they run concurrently. All analyses are
+        written in one transaction. The usage of the shared OCR and parse
+        is billed to the first job and its analysis.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            jobs: Job rows (each with 'id', 'title' and 'description')
+            
+        Returns:
+            Dictionary with candidate info and one result per job
+        """
+        result = None
+        with metering() as meter:
+            try:
+                result = self._process_cv_multi(pdf_path, jobs)
+            finally:
+                # Scoring usage goes to each job's analysis; the shared OCR and parse to the first job's
+                analysis_ids = {item["job_id"]: item["analysis_id"] for item in result["results"]} if result else {}
+                by_job = {}
+                for record in meter.records():
+                    job_id = record.job_id if record.job_id is not None else jobs[0]["id"]
+                    by_job.setdefault(job_id, []).append(record)
+                for job_id, records in by_job.items():
+                    save_usage(records, job_id, analysis_ids.get(job_id))
+        return result
+    
+    def _process_cv_multi(self, pdf_path: str, jobs: List[Dict]) -> Dict:
+        prepared = self.prepare_cv(pdf_path)
+        info = prepared["info"]
+        texts = self._build_category_texts(info)
+        
+        reused = {job["id"]: self._reuse_for_job(prepared, job["id"]) for job in jobs}
+        to_save = [job for job in jobs if not reused[job["id"]]]
+        screens = {job["id"]: PrescreenService.evaluate(info, job) for job in to_save}
+        to_score = [job for job in to_save if screens[job["id"]]["status"] == "scored"]
+        
+        raw = {
+            (job["id"], category): local
+            for job in to_score
+            for category, local in self._local_scores(info, job["description"], job.get("scoring_mode")).items()
+        }
+        with ThreadPoolExecutor(max_workers=SCORING_MAX_WORKERS) as executor:
+            futures = {
+                (job["id"], category): executor.submit(
+                    bind(self._compute_score, job_id=job["id"]), job["description"], texts[category], category
+                )
+                for job in to_score
+                for category in CATEGORIES
+                if (job["id"], category) not in raw
+            }
+            raw.update({key: future.result() for key, future in futures.items()})
+        
+        scored = {}
+        for job in to_save:
+            if screens[job["id"]]["status"] == "scored":
+                scored[job["id"]] = self._summarize_scores(
+                    {category: raw[(job["id"], category)] for category in CATEGORIES},
+                    job.get("category_weights"),
+                )
+            else:
+                scored[job["id"]] = self._unscored()
+            scored[job["id"]].update(screens[job["id"]])
+        analysis_ids = self.save_analyses([
+            (prepared, job["id"], job["description"], scored[job["id"]])
+            for job in to_save
+        ])
+        for job, analysis_id in zip(to_save, analysis_ids):
+            scored[job["id"]].update({
+                "analysis_id": analysis_id,
+                "duplicate_of": self._duplicate_of(prepared),
+            })
+        
+        results = []
+        for job in jobs:
+            result = dict(reused[job["id"]] or scored[job["id"]])
+            result.pop("info", None)
+            result.update({"job_id": job["id"], "job_title": job["title"]})
+            results.append(result)
+        
+        return {"info": info, "results": results}
+    
+    def prepare_cv(
+        self,
+        pdf_path: str,
+        ocr_fn: Optional[Callable[[], str]] = None,
+        run: Optional[PipelineRun] = None,
+    ) -> Dict:
+        """
+        Fingerprint, OCR and parse a CV.
+        
+        An exact file match skips OCR; an exact or confident near-duplicate
+        match reuses the stored parse instead of calling the LLM.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            ocr_fn: Optional callable returning the OCR text, used instead of
+                OCRing the file here (only called when OCR is needed)
+            run: Optional pipeline run; OCR pages and the parse are
+                checkpointed in it and reused from it
+            
+        Returns:
+            Dictionary with 'info', 'fingerprint' and 'match'
+        """
+        fingerprint = {
+            "file_hash": DedupService.file_hash(pdf_path),
+            "signature": None,
+            "contacts": [],
+        }
+        match = self.dedup.find_exact(fingerprint["file_hash"]) if self.dedup else None
+        if run and ocr_fn is None:
+            ocr_fn = functools.partial(self._ocr_pages, pdf_path, run)
+        
+        cv_text = None
+        if match is None:
+            cv_text = self.extract_text(pdf_path, ocr_fn, fingerprint["file_hash"])
+            fingerprint["signature"] = DedupService.minhash(cv_text)
+            fingerprint["contacts"] = DedupService.extract_contacts(cv_text)
+            if self.dedup:
+                match = self.dedup.find_near(fingerprint["signature"], fingerprint["contacts"])
+        else:
+            fingerprint["signature"] = match["signature"]
+        
+        if match and match["confident"] and match["payload"].get("info"):
+            info = match["payload"]["info"]
+        else:
+            if cv_text is None:
+                cv_text = self.extract_text(pdf_path, ocr_fn, fingerprint["file_hash"])
+            if run:
+                run.stage = "parse"
+                info = run.completed("parse").get("info") or self.parse_text(cv_text)
+                run.save("parse", "info", info)
+            else:
+                info = self.parse_text(cv_text)
+        
+        return {"info": info, "fingerprint": fingerprint, "match": match}
+    
+    def extract_text(
+        self,
+        pdf_path: str,
+        ocr_fn: Optional[Callable[[], str]] = None,
+        file_hash: Optional[str] = None,
+    ) -> str:
+        """
+        OCR a CV PDF to text.
+        
+        When the file's hash is given, concurrent OCR of identical files
+        runs once and its text is shared.
         """
-        # OCR PDF
-        if not GOOGLE_VISION_API_KEY:
-            raise ValueError("GOOGLE_VISION_API_KEY is not configured")
+        import ocr  # Deferred: pulls in PyMuPDF and Pillow
         
-        cv_text = ocr.ocr_pdf(file_bytes, GOOGLE_VISION_API_KEY)
+        if not ocr.ocr_available(GOOGLE_VISION_API_KEY):
+            raise ValueError(
+                f"No OCR backend available for OCR_BACKEND={OCR_BACKEND!r}: "
+                "configure GOOGLE_VISION_API_KEY or install Tesseract"
+            )
+        
+        def run_ocr() -> str:
+            return ocr_fn() if ocr_fn else ocr.ocr_pdf(pdf_path, GOOGLE_VISION_API_KEY)
+        
+        cv_text = _ocr_flight.do(content_key(file_hash, OCR_BACKEND), run_ocr) if file_hash else run_ocr()
         if not cv_text:
             raise ValueError("Could not extract text from CV. Please try a different file.")
+        return cv_text
+    
+    @staticmethod
+    def _ocr_pages(pdf_path: str, run: PipelineRun) -> str:
+        """OCR a CV page by page, checkpointing each page and reusing pages read before."""
+        import ocr
         
-        # Parse CV with LLM
-        info = llm_processor.parse_with_llm(cv_text, self.model)
+        run.stage = "ocr"
+        pages = {int(idx): text for idx, text in run.completed("ocr").items()}
+        failed = []
+        for idx, text, error in ocr.ocr_pdf_pages(pdf_path, GOOGLE_VISION_API_KEY, skip=pages):
+            if error is None:
+                pages[idx] = text
+                run.save("ocr", str(idx), text)
+            else:
+                failed.append(idx + 1)
+                run.fail("ocr", str(idx), str(error))
+        if failed:
+            raise RuntimeError(f"OCR failed for page(s) {', '.join(map(str, failed))}")
+        return "\n".join(pages[idx] for idx in sorted(pages))
+    
+    def parse_text(self, cv_text: str) -> Dict:
+        """Parse OCR text into structured candidate info."""
+        key = content_key(LLM_MODEL_NAME, prompt_extract_candidate_info(cv_text))
+        info = _parse_flight.do(key, self._call_llm, "parse", llm_processor.parse_with_llm, cv_text, self.model)
         if not info:
             raise ValueError("Could not parse CV. Please try again.")
+        return info
+    
+    def _reuse_for_job(self, prepared: Dict, job_id: int) -> Optional[Dict]:
+        """Return the stored result if this candidate was already scored for the job."""
+        match = prepared["match"]
+        if not self.dedup or not match or not match["confident"]:
+            return None
+        
+        prior = self.dedup.find_for_job(match, job_id)
+        if not prior or "scores" not in prior["payload"]:
+            return None
         
-        # Prepare text for scoring
-        education = info.get("education", "")
-        experience = info.get("experience", "")
-        skills = info.get("skills", "")
-        projects = info.get("projects", "")
-        awards = info.get("awards", "")
-        publications = info.get("publications", "")
-        languages = info.get("languages", "")
-        
-        education_text = "Education: " + str(education)
-        experience_text = "Experience: " + str(experience)
-        skills_text = "Skills: " + str(skills) + "Projects: " + str(projects)
-        awards_text = "Awards: " + str(awards) + "Publications: " + str(publications)
-        languages_text = "Languages: " + str(languages)
-        
-        # Compute scores for each category
-        score_education = int(marker.compute_score(jd_text, education_text, self.model, "Education")["score"])
-        score_experience = int(marker.compute_score(jd_text, experience_text, self.model, "Experience")["score"])
-        score_skills = int(marker.compute_score(jd_text, skills_text, self.model, "Skills")["score"])
-        score_awards = int(marker.compute_score(jd_text, awards_text, self.model, "Awards")["score"])
-        score_languages = int(marker.compute_score(jd_text, languages_text, self.model, "Languages")["score"])
-        
-        # Calculate total score (average of all categories)
-        total_score = (score_education + score_experience + score_skills + score_awards + score_languages) / 5
-        
-        score_dict = {
-            "Education": score_education,
-            "Experience": score_experience,
-            "Skills": score_skills,
-            "Awards": score_awards,
-            "Languages": score_languages
+        payload = prior["payload"]
+        logger.info("Reusing analysis %s for job %s", prior["analysis_id"], job_id)
+        return {
+            "info": payload["info"],
+            "score_dict": payload["scores"],
+            "reason_dict": payload["reasons"],
+            "scored_by": payload.get("scored_by", {}),
+            "total_score": prior["score"],
+            "relevance": prior["relevance"],
+            "status": prior["status"],
+            "analysis_id": prior["analysis_id"],
+            "duplicate_of": prior["analysis_id"],
+        }
+    
+    def score_analysis(self, analysis_id: int) -> Dict:
+        """
+        Run LLM scoring for a stored analysis that prescreening deferred or skipped.
+        
+        The stored parse is scored against the job's current description and
+        the analysis row is updated in place.
+        """
+        with get_db_connection() as conn:
+            row = conn.execute(
+                "SELECT job_id, cv_data, relevance, duplicate_of FROM analyses WHERE id = ?",
+                (analysis_id,),
+            ).fetchone()
+        if not row:
+            raise LookupError(f"Analysis {analysis_id} not found")
+        job_id, cv_data, relevance, duplicate_of = row
+        job = get_job_by_id(job_id)
+        if not job:
+            raise LookupError(f"Job {job_id} not found")
+        
+        payload = decode_cv_data(cv_data)
+        with metering() as meter:
+            try:
+                result = self.score_info(
+                    payload["info"], job["description"], job.get("scoring_mode"), job.get("category_weights")
+                )
+            finally:
+                save_usage(meter.records(), job_id, analysis_id)
+        payload.update({
+            "scores": result["score_dict"],
+            "reasons": result["reason_dict"],
+            "scored_by": result["scored_by"],
+        })
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            jd_id = get_jd_version(cursor, job_id, job["description"])
+            # Weights as of this transaction, in case they changed while scoring
+            result["total_score"] = weighted_total(result["score_dict"], get_category_weights(cursor, job_id))
+            category_scores = ", ".join(f"{column} = ?" for column in CATEGORY_SCORE_COLUMNS)
+            cursor.execute(
+                f"""
+                UPDATE analyses SET score = ?, status = 'scored', jd_id = ?, cv_data = ?, {category_scores}
+                WHERE id = ?
+                """,
+                (
+                    result["total_score"],
+                    jd_id,
+                    encode_cv_data(payload),
+                    *(result["score_dict"][category] for category in CATEGORIES),
+                    analysis_id,
+                ),
+            )
+            bump_job_version(job_id, cursor=cursor)
+            conn.commit()
+        release_pending_versions()
+        
+        return {
+            "info": payload["info"],
+            **result,
+            "relevance": relevance,
+            "status": "scored",
+            "analysis_id": analysis_id,
+            "duplicate_of": duplicate_of,
         }
+    
+    @staticmethod
+    def _unscored() -> Dict:
+        """Result placeholder for a CV that was not sent to LLM scoring."""
+        return {"score_dict": {}, "reason_dict": {}, "scored_by": {}, "total_score": None}
+    
+    @staticmethod
+    def _duplicate_of(prepared: Dict) -> Optional[int]:
+        match = prepared["match"]
+        return match["root_id"] if match else None
+    
+    def score_info(
+        self,
+        info: Dict,
+        jd_text: str,
+        scoring_mode: Optional[str] = "llm",
+        weights: Optional[Dict[str, float]] = None,
+        run: Optional[PipelineRun] = None,
+    ) -> Dict:
+        """
+        Score parsed candidate info against a JD.
+        
+        Args:
+            info: Parsed candidate info
+            jd_text: Job description text
+            scoring_mode: 'llm', or 'tiered' to score cheap categories locally when confident
+            weights: The job's category weights for the total (None = equal weights)
+            run: Optional pipeline run; LLM category scores are checkpointed in
+                it, and categories it already scored are not called again
+            
+        Returns:
+            Dictionary with 'score_dict', 'reason_dict', 'scored_by' and 'total_score'
+        """
+        texts = self._build_category_texts(info)
+        raw = self._local_scores(info, jd_text, scoring_mode)
+        if run:
+            raw = dict(run.completed("score"), **raw)
+        with ThreadPoolExecutor(max_workers=SCORING_MAX_WORKERS) as executor:
+            futures = {
+                category: executor.submit(bind(self._compute_score), jd_text, texts[category], category)
+                for category in CATEGORIES
+                if category not in raw
+            }
+            new = {category: future.result() for category, future in futures.items()}
+        if run:
+            for category, result in new.items():
+                if self._valid_score(result):
+                    run.save("score", category, result)
+                else:
+                    run.fail("score", category, "LLM returned no score")
+        raw.update(new)
+        return self._summarize_scores(raw, weights)
+    
+    @staticmethod
+    def _local_scores(info: Dict, jd_text: str, scoring_mode: Optional[str]) -> Dict[str, Dict]:
+        """
+        Local scores for a tiered job's cheap categories that are confident enough to keep.
         
-        # Get reasons for each score
-        reason_dict = {
-            "Education": marker.compute_score(jd_text, education_text, self.model, "Education")["reason"],
-            "Experience": marker.compute_score(jd_text, experience_text, self.model, "Experience")["reason"],
-            "Skills": marker.compute_score(jd_text, skills_text, self.model, "Skills")["reason"],
-            "Awards": marker.compute_score(jd_text, awards_text, self.model, "Awards")["reason"],
-            "Languages": marker.compute_score(jd_text, languages_text, self.model, "Languages")["reason"]
+        Categories missing from the result go to the LLM as usual.
+        """
+        if scoring_mode != "tiered":
+            return {}
+        kept = {}
+        for category in LOCAL_CATEGORIES:
+            local = LocalScoringService.score(category, jd_text, info)
+            if local["confidence"] >= TIERED_MIN_CONFIDENCE:
+                kept[category] = dict(local, scored_by="local")
+                metrics.increment("tiered_local_scores")
+            else:
+                metrics.increment("tiered_llm_fallbacks")
+        return kept
+    
+    def _compute_score(self, jd_text: str, text: str, category: str) -> Dict:
+        """Score one category, sharing the result with identical in-flight calls."""
+        key = content_key(LLM_MODEL_NAME, category, jd_text, text)
+        return _score_flight.do(
+            key, self._call_llm, f"score:{category}", marker.compute_score, jd_text, text, self.model, category
+        )
+    
+    @staticmethod
+    def _call_llm(operation_name: str, fn: Callable, *args):
+        """Make an LLM call through the fair scheduler, labelling its usage."""
+        with operation(operation_name):
+            return llm_scheduler.call(fn, *args)
+    
+    @staticmethod
+    def _build_category_texts(info: Dict) -> Dict[str, str]:
+        """Prepare the per-category candidate text sent to the scorer."""
+        return {
+            "Education": "Education: " + str(info.get("education", "")),
+            "Experience": "Experience: " + str(info.get("experience", "")),
+            "Skills": "Skills: " + str(info.get("skills", "")) + "Projects: " + str(info.get("projects", "")),
+            "Awards": "Awards: " + str(info.get("awards", "")) + "Publications: " + str(info.get("publications", "")),
+            "Languages": "Languages: " + str(info.get("languages", "")),
         }
+    
+    @staticmethod
+    def _summarize_scores(raw: Dict[str, Dict], weights: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Turn raw compute_score results into score/reason dicts and a weighted total.
+        
+        Raises:
+            RuntimeError: Some category has no score (a failed LLM call returns {})
+        """
+        failed = [category for category in CATEGORIES if not CVProcessor._valid_score(raw.get(category))]
+        if failed:
+            raise RuntimeError(f"Scoring failed for: {', '.join(failed)}")
+        score_dict = {category: int(raw[category]["score"]) for category in CATEGORIES}
+        reason_dict = {category: raw[category]["reason"] for category in CATEGORIES}
+        scored_by = {category: raw[category].get("scored_by", "llm") for category in CATEGORIES}
         
-        # Save to database
-        self._save_analysis(info, job_id, jd_text, total_score)
+        total_score = weighted_total(score_dict, weights)
         
         return {
-            "info": info,
             "score_dict": score_dict,
             "reason_dict": reason_dict,
+            "scored_by": scored_by,
             "total_score": total_score
         }
     
-    def _save_analysis(self, info: Dict, job_id: int, jd_text: str, score: float) -> None:
-        """Save analysis result to database."""
-        payload = {
-            "info": info,
-            "jd": jd_text,
-        }
+    @staticmethod
+    def _valid_score(result: Optional[Dict]) -> bool:
+        """Whether a compute_score result has a usable score."""
+        try:
+            int(result["score"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+    
+    def _save_analysis(self, prepared: Dict, job_id: int, jd_text: str, result: Dict) -> int:
+        """Save analysis result to database and return its ID."""
+        return self.save_analyses([(prepared, job_id, jd_text, result)])[0]
+    
+    def save_analyses(
+        self,
+        rows: List[tuple],
+        after_insert: Optional[Callable[[sqlite3.Cursor, List[int]], None]] = None,
+    ) -> List[int]:
+        """
+        Save several analysis results in a single transaction.
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+        The rows go through the process-wide database writer, which
+        commits them together with any other queued writes; this call
+        blocks until that commit is done.
+        
+        Args:
+            rows: (prepared, job_id, jd_text, result) tuples
+            after_insert: Optional write made in the same transaction once the
+                rows are inserted, called with the cursor and the new IDs
+            
+        Returns:
+            The new analysis IDs, in order
+        """
+        def write(cursor: sqlite3.Cursor) -> List[int]:
+            analysis_ids = self._insert_analyses(cursor, rows)
+            if after_insert:
+                after_insert(cursor, analysis_ids)
+            return analysis_ids
+        
+        analysis_ids = get_writer().submit(write).result()
+        
+        PrescreenService.index_analyses(
+            (analysis_id, job_id, prepared["info"])
+            for analysis_id, (prepared, job_id, _, _) in zip(analysis_ids, rows)
+        )
+        for prepared, job_id, _, _ in rows:
+            logger.info("Saved analysis result for candidate: %s (job %s)", prepared["info"].get("name", "Unknown"), job_id)
+        return analysis_ids
+    
+    def _insert_analyses(self, cursor, rows: List[tuple]) -> List[int]:
+        """Insert analysis rows and their dedup keys (runs on the writer thread)."""
+        analysis_ids = []
+        for prepared, job_id, jd_text, result in rows:
+            info = prepared["info"]
+            fingerprint = prepared["fingerprint"]
+            payload = {
+                "info": info,
+                "scores": result["score_dict"],
+                "reasons": result["reason_dict"],
+                "scored_by": result.get("scored_by", {}),
+            }
+            scores = result["score_dict"]
+            total_score = result["total_score"]
+            if scores:
+                # Weights as of this transaction, so a concurrent re-weighting is not undone
+                total_score = weighted_total(scores, get_category_weights(cursor, job_id))
             cursor.execute(
-                """
-                INSERT INTO analyses (job_id, name, email, phone, score, jd_text, cv_data, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                f"""
+                INSERT INTO analyses (job_id, name, email, phone, score, jd_id, cv_data, created_at,
+                                      file_hash, minhash, duplicate_of, relevance, status,
+                                      {", ".join(CATEGORY_SCORE_COLUMNS)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" * len(CATEGORY_SCORE_COLUMNS))})
                 """,
                 (
                     job_id,
                     info.get("name", ""),
                     info.get("email", ""),
                     info.get("phone", ""),
-                    score,
-                    jd_text,
-                    json.dumps(payload, ensure_ascii=False),
+                    total_score,
+                    get_jd_version(cursor, job_id, jd_text),
+                    encode_cv_data(payload),
                     datetime.utcnow().isoformat(),
+                    fingerprint["file_hash"],
+                    DedupService.pack_signature(fingerprint["signature"]),
+                    self._duplicate_of(prepared),
+                    result.get("relevance"),
+                    result.get("status", "scored"),
+                    *(scores.get(category) for category in CATEGORIES),
                 ),
             )
-            conn.commit()
-        
-        logger.info("Saved analysis result for candidate: %s", info.get("name", "Unknown"))
+            analysis_id = cursor.lastrowid
+            index_analysis(cursor, analysis_id, job_id, info.get("name", ""), info)
+            contacts = set(fingerprint["contacts"]) | set(DedupService.contacts_from_info(info))
+            cursor.executemany(
+                "INSERT INTO dedup_keys (key, analysis_id) VALUES (?, ?)",
+                [(key, analysis_id) for key in DedupService.index_keys(fingerprint["signature"], sorted(contacts))],
+            )
+            analysis_ids.append(analysis_id)
+        for job_id in {row[1] for row in rows}:
+            bump_job_version(job_id, cursor=cursor)
+        return analysis_ids
@@ -0,0 +1,224 @@
+"""Duplicate and near-duplicate CV detection."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import hashlib
+import logging
+import random
+import re
+import struct
+import unicodedata
+from array import array
+from typing import Dict, List, Optional
+
+from config import (
+    DEDUP_CONTACT_THRESHOLD,
+    DEDUP_LSH_BANDS,
+    DEDUP_NEAR_THRESHOLD,
+    DEDUP_NUM_PERM,
+)
+from backend.models.database import decode_cv_data, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(DEDUP_NUM_PERM)
+]
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+
+
+class DedupService:
+    """Detect CVs that were already processed, exactly or approximately."""
+
+    @staticmethod
+    def file_hash(pdf_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of the uploaded file, read in chunks."""
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Lowercase, strip punctuation and collapse whitespace."""
+        text = unicodedata.normalize("NFKC", text).lower()
+        return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+    @staticmethod
+    def minhash(text: str, shingle_size: int = 3) -> List[int]:
+        """MinHash signature of the word shingles of normalized text."""
+        words = DedupService.normalize_text(text).split()
+        if len(words) < shingle_size:
+            shingles = {" ".join(words)}
+        else:
+            shingles = {
+                " ".join(words[i:i + shingle_size])
+                for i in range(len(words) - shingle_size + 1)
+            }
+
+        hashes = [
+            struct.unpack("<I", hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest())[0]
+            for s in shingles
+        ]
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in _PERMUTATIONS
+        ]
+
+    @staticmethod
+    def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+        """Estimated Jaccard similarity of two MinHash signatures."""
+        if not sig_a or len(sig_a) != len(sig_b):
+            return 0.0
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+    @staticmethod
+    def pack_signature(signature: Optional[List[int]]) -> Optional[bytes]:
+        return array("I", signature).tobytes() if signature else None
+
+    @staticmethod
+    def unpack_signature(blob: Optional[bytes]) -> Optional[List[int]]:
+        if not blob:
+            return None
+        signature = array("I")
+        signature.frombytes(blob)
+        return signature.tolist()
+
+    @staticmethod
+    def extract_contacts(text: str) -> List[str]:
+        """Email and phone lookup keys found in raw CV text."""
+        keys = {"email:" + m.lower() for m in _EMAIL_RE.findall(text or "")}
+        for m in _PHONE_RE.findall(text or ""):
+            digits = re.sub(r"\D", "", m)
+            if 9 <= len(digits) <= 15:
+                keys.add("phone:" + digits[-9:])
+        return sorted(keys)
+
+    @staticmethod
+    def contacts_from_info(info: Dict) -> List[str]:
+        """Email and phone lookup keys from parsed candidate info."""
+        return DedupService.extract_contacts(
+            " ".join([str(info.get("email", "")), str(info.get("phone", ""))])
+        )
+
+    @staticmethod
+    def index_keys(signature: Optional[List[int]], contacts: List[str]) -> List[str]:
+        """LSH band keys plus contact keys stored for an analysis."""
+        keys = list(contacts)
+        if signature:
+            rows = len(signature) // DEDUP_LSH_BANDS
+            for band in range(DEDUP_LSH_BANDS):
+                chunk = array("I", signature[band * rows:(band + 1) * rows]).tobytes()
+                keys.append(f"lsh:{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+        return keys
+
+    def find_exact(self, file_hash: str) -> Optional[Dict]:
+        """Find an earlier analysis of the very same file."""
+        with get_db_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, job_id, minhash, duplicate_of, cv_data, score, status, relevance FROM analyses
+                WHERE file_hash = ?
+                ORDER BY id DESC LIMIT 1
+                """,
+                (file_hash,),
+            ).fetchone()
+        if not row:
+            return None
+        return self._match(row, "exact", 1.0, True)
+
+    def find_near(self, signature: List[int], contacts: List[str]) -> Optional[Dict]:
+        """
+        Find the most similar earlier analysis via LSH and contact keys.
+
+        A candidate is a confident match when its similarity reaches
+        DEDUP_NEAR_THRESHOLD, or DEDUP_CONTACT_THRESHOLD if its email or
+        phone also matches. Contact-only matches are returned unconfident
+        so the caller can link, but not reuse, the prior analysis.
+        """
+        lsh_keys = self.index_keys(signature, [])
+        with get_db_connection() as conn:
+            contact_ids = set()
+            if contacts:
+                placeholders = ",".join("?" * len(contacts))
+                contact_ids = {
+                    r[0] for r in conn.execute(
+                        f"SELECT analysis_id FROM dedup_keys WHERE key IN ({placeholders})",
+                        contacts,
+                    )
+                }
+            placeholders = ",".join("?" * len(lsh_keys))
+            candidate_ids = {
+                r[0] for r in conn.execute(
+                    f"SELECT analysis_id FROM dedup_keys WHERE key IN ({placeholders})",
+                    lsh_keys,
+                )
+            } | contact_ids
+            if not candidate_ids:
+                return None
+            placeholders = ",".join("?" * len(candidate_ids))
+            rows = conn.execute(
+                f"""
+                SELECT id, job_id, minhash, duplicate_of, cv_data, score, status, relevance FROM analyses
+                WHERE id IN ({placeholders})
+                """,
+                list(candidate_ids),
+            ).fetchall()
+
+        best = None
+        for row in rows:
+            sim = self.similarity(signature, self.unpack_signature(row[2]))
+            contact = row[0] in contact_ids
+            confident = sim >= DEDUP_NEAR_THRESHOLD or (contact and sim >= DEDUP_CONTACT_THRESHOLD)
+            if not confident and not contact:
+                continue
+            rank = (confident, sim, row[0])
+            if best is None or rank > best[0]:
+                best = (rank, row, sim, confident)
+        if best is None:
+            return None
+        _, row, sim, confident = best
+        return self._match(row, "near" if confident else "contact", sim, confident)
+
+    def find_for_job(self, match: Dict, job_id: int) -> Optional[Dict]:
+        """Find an analysis of the matched candidate already stored for a job."""
+        with get_db_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, job_id, minhash, duplicate_of, cv_data, score, status, relevance FROM analyses
+                WHERE job_id = ? AND (id = ? OR duplicate_of = ?)
+                ORDER BY id DESC LIMIT 1
+                """,
+                (job_id, match["root_id"], match["root_id"]),
+            ).fetchone()
+        if not row:
+            return None
+        return self._match(row, match["kind"], match["similarity"], match["confident"])
+
+    def _match(self, row: tuple, kind: str, similarity: float, confident: bool) -> Dict:
+        analysis_id, job_id, minhash, duplicate_of, cv_data, score, status, relevance = row
+        payload = decode_cv_data(cv_data)
+        logger.info("Duplicate candidate (%s, %.2f) of analysis %s", kind, similarity, analysis_id)
+        return {
+            "analysis_id": analysis_id,
+            "root_id": duplicate_of or analysis_id,
+            "job_id": job_id,
+            "kind": kind,
+            "similarity": similarity,
+            "confident": confident,
+            "signature": self.unpack_signature(minhash),
+            "payload": payload,
+            "score": score,
+            "status": status or "scored",
+            "relevance": relevance,
+        }
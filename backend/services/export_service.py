@@ -0,0 +1,159 @@
+"""Streaming export of rankings and analyses."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import csv
+import io
+import json
+import logging
+import sqlite3
+from typing import Dict, Iterator, List, Optional
+
+from config import DB_PATH, EXPORT_CHUNK_SIZE, SCORING_CATEGORIES
+from backend.models.database import decode_cv_data
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_BASE_COLUMNS = ["id", "job_id", "job_title", "name", "email", "phone", "score", "relevance", "status", "created_at"]
+_INFO_COLUMNS = ["address", "education", "experience", "skills", "projects", "awards", "publications", "languages"]
+COLUMNS = _BASE_COLUMNS + _INFO_COLUMNS + [f"score_{c.lower()}" for c in SCORING_CATEGORIES]
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file whose buffered bytes can be drained while tell() keeps counting."""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class ExportService:
+    """Export rankings in fixed-size chunks so memory use does not grow with row count."""
+
+    @staticmethod
+    def iter_rows(job_id: Optional[int] = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        """
+        Yield ranked analyses as flat dictionaries, one chunk at a time.
+
+        Args:
+            job_id: Optional job ID to filter by
+            chunk_size: Rows fetched from SQLite per chunk
+        """
+        sql = """
+            SELECT a.id, a.job_id, j.title AS job_title, a.name, a.email, a.phone,
+                   a.score, a.relevance, a.status, a.created_at, a.cv_data
+            FROM analyses a
+            JOIN jobs j ON a.job_id = j.id
+        """
+        params = ()
+        if job_id:
+            sql += " WHERE a.job_id = ?"
+            params = (job_id,)
+        sql += " ORDER BY a.score DESC, a.id DESC"
+
+        # Streaming responses advance the generator from worker threads
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [ExportService._flatten(row) for row in rows]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _flatten(row: tuple) -> Dict:
+        record = dict(zip(_BASE_COLUMNS, row[:-1]))
+        payload = decode_cv_data(row[-1])
+        info = payload.get("info", {})
+        for column in _INFO_COLUMNS:
+            value = info.get(column, "")
+            record[column] = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+        scores = payload.get("scores", {})
+        for category in SCORING_CATEGORIES:
+            record[f"score_{category.lower()}"] = scores.get(category)
+        return record
+
+    @staticmethod
+    def stream(fmt: str, job_id: Optional[int] = None) -> Iterator[bytes]:
+        """Encode the export as a stream of byte chunks in the given format."""
+        chunks = ExportService.iter_rows(job_id)
+        if fmt == "csv":
+            return ExportService._stream_csv(chunks)
+        if fmt == "ndjson":
+            return ExportService._stream_ndjson(chunks)
+        if fmt == "parquet":
+            return ExportService._stream_parquet(chunks)
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    @staticmethod
+    def _stream_csv(chunks: Iterator[List[Dict]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+        writer.writeheader()
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _stream_ndjson(chunks: Iterator[List[Dict]]) -> Iterator[bytes]:
+        for rows in chunks:
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+    @staticmethod
+    def _stream_parquet(chunks: Iterator[List[Dict]]) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema(
+            [(c, pa.int64()) for c in ("id", "job_id")]
+            + [(c, pa.string()) for c in ("job_title", "name", "email", "phone")]
+            + [(c, pa.float64()) for c in ("score", "relevance")]
+            + [(c, pa.string()) for c in ["status", "created_at"] + _INFO_COLUMNS]
+            + [(f"score_{c.lower()}", pa.int64()) for c in SCORING_CATEGORIES]
+        )
+        sink = _DrainableSink()
+        # One row group per chunk; bytes are handed off as soon as each is written
+        with pq.ParquetWriter(sink, schema) as writer:
+            for rows in chunks:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    @staticmethod
+    def parquet_available() -> bool:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            return False
+        return True
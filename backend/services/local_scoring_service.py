@@ -0,0 +1,227 @@
+"""Deterministic local scorers for the categories that do not need an LLM."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from backend.services.prescreen_service import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Scoring modes a job can use: every category by LLM, or cheap categories locally first
+SCORING_MODES = ("llm", "tiered")
+
+# Categories with a local scorer
+LOCAL_CATEGORIES = ("Languages", "Awards")
+
+# Canonical language -> lowercase names and aliases that identify it
+LANGUAGES = {
+    "English": ("english",),
+    "French": ("french", "français", "francais"),
+    "German": ("german", "deutsch"),
+    "Spanish": ("spanish", "español", "espanol", "castilian"),
+    "Italian": ("italian",),
+    "Portuguese": ("portuguese",),
+    "Dutch": ("dutch",),
+    "Polish": ("polish",),
+    "Russian": ("russian",),
+    "Ukrainian": ("ukrainian",),
+    "Swedish": ("swedish",),
+    "Norwegian": ("norwegian",),
+    "Danish": ("danish",),
+    "Finnish": ("finnish",),
+    "Greek": ("greek",),
+    "Turkish": ("turkish",),
+    "Arabic": ("arabic",),
+    "Hebrew": ("hebrew",),
+    "Hindi": ("hindi",),
+    "Chinese": ("chinese", "mandarin", "cantonese"),
+    "Japanese": ("japanese",),
+    "Korean": ("korean",),
+    "Vietnamese": ("vietnamese", "tiếng việt", "tieng viet"),
+    "Thai": ("thai",),
+    "Indonesian": ("indonesian", "bahasa"),
+    "Malay": ("malay",),
+}
+_LANGUAGE_RE = re.compile(
+    r"\b(" + "|".join(sorted((re.escape(a) for names in LANGUAGES.values() for a in names), key=len, reverse=True)) + r")\b"
+)
+_ALIASES = {alias: name for name, aliases in LANGUAGES.items() for alias in aliases}
+
+# Proficiency wording -> level on a 0-1 scale (native = 1)
+_LEVEL_PATTERNS = [
+    (re.compile(r"\b(native|mother tongue|first language|bilingual)\b"), 1.0),
+    (re.compile(r"\b(c2|fluent|fluency|proficient|proficiency|advanced|excellent|c1)\b"), 0.9),
+    (re.compile(r"\b(upper[- ]intermediate|b2|good|professional working)\b"), 0.75),
+    (re.compile(r"\b(intermediate|b1|conversational|working)\b"), 0.6),
+    (re.compile(r"\b(basic|elementary|beginner|a1|a2|limited)\b"), 0.35),
+]
+
+
+def _band(value: float, bands: List[Tuple[float, float]]) -> float:
+    """Level for a test score, given (minimum score, level) bands from highest."""
+    return next(level for minimum, level in bands if value >= minimum)
+
+
+# Language test results -> level
+_TEST_PATTERNS = [
+    (re.compile(r"\bielts\D{0,10}(\d(?:\.\d)?)"), lambda v: _band(v, [(7.0, 0.9), (6.0, 0.75), (0.0, 0.6)])),
+    (re.compile(r"\btoeic\D{0,10}(\d{3})"), lambda v: _band(v, [(850, 0.9), (700, 0.75), (0, 0.6)])),
+    (re.compile(r"\btoefl\D{0,10}(\d{2,3})"), lambda v: _band(v, [(100, 0.9), (80, 0.75), (0, 0.6)])),
+    (re.compile(r"\bjlpt\D{0,10}n([1-5])"), lambda v: {1: 0.9, 2: 0.75}.get(int(v), 0.6)),
+]
+# Language names that are also common lowercase words; in a JD only the capitalized form counts
+_CAPITALIZED_ONLY = {"polish"}
+# Clause boundaries in a JD; a decimal point (IELTS 6.5) is not one
+_CLAUSE_END_RE = re.compile(r"[;\n]|\.(?!\d)")
+_DEFAULT_REQUIRED_LEVEL = 0.6  # A JD naming a language without a level asks for working proficiency
+_DEFAULT_CANDIDATE_LEVEL = 0.75  # A language listed without a level
+
+
+def _level(text: str) -> Optional[float]:
+    """Proficiency level stated in a snippet, if any."""
+    text = text.lower()
+    for pattern, to_level in _TEST_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return to_level(float(match.group(1)))
+    for pattern, level in _LEVEL_PATTERNS:
+        if pattern.search(text):
+            return level
+    return None
+
+
+def _as_items(value) -> List[str]:
+    """Parsed CV field (list, dict or text) as a list of item strings."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [part for part in re.split(r"[\n;,]+", value) if part.strip()]
+    if isinstance(value, dict):
+        value = [value]
+    return [item if isinstance(item, str) else json.dumps(item, ensure_ascii=False) for item in value if item]
+
+
+def required_languages(jd_text: str) -> Dict[str, float]:
+    """Languages a JD mentions, with the level asked for in the same clause."""
+    text = jd_text.lower()
+    bounds = [m.start() for m in _CLAUSE_END_RE.finditer(text)]
+    required: Dict[str, float] = {}
+    for match in _LANGUAGE_RE.finditer(text):
+        if match.group(1) in _CAPITALIZED_ONLY and jd_text[match.start()].islower():
+            continue
+        start = max((i for i in bounds if i < match.start()), default=-1) + 1
+        end = next((i for i in bounds if i >= match.end()), len(text))
+        clause = text[start:end]
+        level = _level(clause) or _DEFAULT_REQUIRED_LEVEL
+        name = _ALIASES[match.group(1)]
+        required[name] = max(required.get(name, 0.0), level)
+    return required
+
+
+def candidate_languages(languages) -> Tuple[Dict[str, float], List[str]]:
+    """Candidate's languages with their levels, plus entries naming no known language."""
+    known: Dict[str, float] = {}
+    unknown = []
+    for item in _as_items(languages):
+        names = {_ALIASES[m.group(1)] for m in _LANGUAGE_RE.finditer(item.lower())}
+        if not names:
+            unknown.append(item)
+        level = _level(item) or _DEFAULT_CANDIDATE_LEVEL
+        for name in names:
+            known[name] = max(known.get(name, 0.0), level)
+    return known, unknown
+
+
+class LocalScoringService:
+    """
+    Score Languages and Awards without an LLM.
+
+    Each scorer returns the same {'score', 'reason'} shape as
+    marker.compute_score, plus a 'confidence' in [0, 1]; tiered scoring
+    falls back to the LLM when the confidence is low.
+    """
+
+    @staticmethod
+    def score(category: str, jd_text: str, info: Dict) -> Dict:
+        """Score one local category of parsed candidate info against a JD."""
+        if category == "Languages":
+            return LocalScoringService.score_languages(jd_text, info.get("languages", ""))
+        if category == "Awards":
+            return LocalScoringService.score_awards(jd_text, info.get("awards", ""), info.get("publications", ""))
+        raise ValueError(f"No local scorer for category: {category}")
+
+    @staticmethod
+    def score_languages(jd_text: str, languages) -> Dict:
+        """
+        Match the languages a JD requires against the candidate's languages and levels.
+
+        Each required language is covered in proportion to the candidate's
+        level relative to the required one; extra languages add a small
+        bonus. Without requirements in the JD, or with entries naming no
+        known language, the result is low-confidence.
+        """
+        required = required_languages(jd_text)
+        known, unknown = candidate_languages(languages)
+
+        if not required:
+            score = min(100, 40 + 15 * len(known)) if known else 0
+            listed = ", ".join(known) or "none"
+            return {
+                "score": score,
+                "reason": f"The JD states no language requirement; candidate languages: {listed}.",
+                "confidence": 0.4,
+            }
+
+        coverage = []
+        notes = []
+        for name, level in required.items():
+            have = known.get(name, 0.0)
+            coverage.append(min(1.0, have / level))
+            notes.append(f"**{name}**: " + ("meets the requirement" if have >= level else "below the required level" if have else "missing"))
+        extras = len(set(known) - set(required))
+        score = min(100, round(100 * sum(coverage) / len(coverage)) + 5 * extras)
+        if extras:
+            notes.append(f"{extras} additional language(s)")
+
+        confidence = 0.9
+        if unknown:
+            confidence = 0.5  # Entries we could not read may be a required language
+        elif not known:
+            confidence = 0.75  # Nothing listed: likely a miss, but the parse may have dropped it
+        return {"score": score, "reason": "- " + "\n- ".join(notes), "confidence": confidence}
+
+    @staticmethod
+    def score_awards(jd_text: str, awards, publications="") -> Dict:
+        """
+        Count the awards and publications that share terms with the JD, favouring recent ones.
+
+        Items sharing two or more JD terms count as relevant, none as
+        irrelevant; items sharing exactly one term are ambiguous, and any
+        ambiguity makes the result low-confidence.
+        """
+        items = _as_items(awards) + _as_items(publications)
+        if not items:
+            return {"score": 0, "reason": "No awards or publications listed.", "confidence": 0.9}
+
+        jd_terms = set(tokenize(jd_text))
+        this_year = datetime.utcnow().year
+        relevant = recent = ambiguous = 0
+        for item in items:
+            overlap = len(jd_terms & set(tokenize(item)))
+            if overlap >= 2:
+                relevant += 1
+            elif overlap == 1:
+                ambiguous += 1
+            years = [int(y) for y in re.findall(r"\b(?:19|20)\d{2}\b", item)]
+            if years and this_year - max(years) <= 5:
+                recent += 1
+
+        score = min(100, 30 * relevant + 10 * (len(items) - relevant) + 5 * recent)
+        reason = f"{relevant} of {len(items)} awards/publications relevant to the JD, {recent} from the last 5 years."
+        return {"score": score, "reason": reason, "confidence": 0.5 if ambiguous else 0.8}
@@ -0,0 +1,218 @@
+"""Database maintenance: orphan cleanup, incremental vacuum, planner statistics and size report."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from config import DB_MAINTENANCE_INTERVAL_HOURS, DB_PATH, DB_VACUUM_MAX_PAGES
+from backend.models.database import get_db_connection
+from backend.models.maintenance import (
+    claim_maintenance,
+    count_orphans,
+    finish_maintenance,
+    last_maintenance,
+    remove_files,
+    remove_orphans,
+)
+from backend.models.writer import get_writer
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Rows sampled per index by ANALYZE, so it stays fast on large tables
+ANALYSIS_LIMIT = 1000
+
+
+class MaintenanceService:
+    """Service keeping the database compact and its query plans current."""
+
+    # One maintenance run at a time per process
+    _lock = threading.Lock()
+
+    @staticmethod
+    def run(scheduled: bool = False) -> Optional[Dict]:
+        """
+        Remove orphans, release free pages and refresh the planner statistics.
+
+        The cleanup and ANALYZE go through the database writer, so they
+        are serialized with the other writes of this process. Releasing
+        pages uses its own short transaction.
+
+        Args:
+            scheduled: Skip the run if any worker started one within
+                DB_MAINTENANCE_INTERVAL_HOURS
+
+        Returns:
+            Orphans removed per table, pages released and file size, or
+            None if a scheduled run was skipped
+        """
+        writer = get_writer()
+        with MaintenanceService._lock:
+            not_since = None
+            if scheduled:
+                not_since = (datetime.utcnow() - timedelta(hours=DB_MAINTENANCE_INTERVAL_HOURS)).isoformat()
+            if not writer.submit(lambda cursor: claim_maintenance(cursor, not_since)).result():
+                return None
+
+            started = time.monotonic()
+            removed, pdf_paths = writer.submit(remove_orphans).result()
+            remove_files(pdf_paths)
+            released = MaintenanceService._release_pages()
+            writer.submit(MaintenanceService._analyze).result()
+            MaintenanceService._checkpoint_wal()
+
+            result = {
+                "orphans_removed": removed,
+                "pages_released": released,
+                "file_bytes": MaintenanceService._file_size(DB_PATH),
+                "seconds": round(time.monotonic() - started, 3),
+            }
+            writer.submit(lambda cursor: finish_maintenance(cursor, result)).result()
+
+        metrics.increment("db_maintenance_runs")
+        metrics.increment("db_pages_released", released)
+        logger.info("Database maintenance done: %s", result)
+        return result
+
+    @staticmethod
+    def stats() -> Dict:
+        """
+        Report file size, fragmentation, per-table and per-index sizes, and orphans.
+
+        Object sizes come from the dbstat virtual table, which reads every
+        page; they are None if SQLite was built without it.
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            pragmas = {}
+            for name in ("page_size", "page_count", "freelist_count", "auto_vacuum", "foreign_keys"):
+                cursor.execute(f"PRAGMA {name}")
+                pragmas[name] = cursor.fetchone()[0]
+            objects = MaintenanceService._objects(cursor)
+            orphans = count_orphans(cursor)
+            last = last_maintenance(cursor)
+
+        page_count = pragmas["page_count"]
+        return {
+            "file_bytes": MaintenanceService._file_size(DB_PATH),
+            "wal_bytes": MaintenanceService._file_size(f"{DB_PATH}-wal"),
+            "page_size": pragmas["page_size"],
+            "page_count": page_count,
+            "free_pages": pragmas["freelist_count"],
+            "fragmentation": round(pragmas["freelist_count"] / page_count, 4) if page_count else 0.0,
+            "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(pragmas["auto_vacuum"]),
+            "foreign_keys": bool(pragmas["foreign_keys"]),
+            "objects": objects,
+            "orphans": orphans,
+            "last_maintenance": last,
+        }
+
+    @staticmethod
+    def _release_pages() -> int:
+        """Return up to DB_VACUUM_MAX_PAGES free pages to the file system."""
+        conn = get_db_connection()
+        try:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            pages = min(free, DB_VACUUM_MAX_PAGES) if DB_VACUUM_MAX_PAGES > 0 else free
+            if pages:
+                # executescript() steps the pragma to completion in its own transaction
+                conn.executescript(f"PRAGMA incremental_vacuum({pages});")
+            return free - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _analyze(cursor: sqlite3.Cursor) -> None:
+        """Refresh sqlite_stat1 from a bounded sample of each index."""
+        cursor.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        cursor.execute("ANALYZE")
+        cursor.execute("PRAGMA optimize")
+
+    @staticmethod
+    def _checkpoint_wal() -> None:
+        """Copy the WAL into the database file and truncate it (skipped while readers hold it)."""
+        conn = get_db_connection()
+        try:
+            busy = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+            if busy:
+                logger.info("WAL checkpoint deferred: database busy")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _objects(cursor: sqlite3.Cursor) -> Optional[List[Dict]]:
+        """Tables and indexes with their size and, once analyzed, row estimates."""
+        index_stats, table_rows = {}, {}
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone():
+            # stat: estimated rows, then rows per distinct value of each leading column prefix
+            cursor.execute("SELECT tbl, idx, stat FROM sqlite_stat1")
+            for table, index, stat in cursor.fetchall():
+                values = [int(value) for value in stat.split() if value.isdigit()]
+                table_rows[table] = values[0]
+                if index:
+                    index_stats[index] = values
+        try:
+            cursor.execute("""
+                SELECT m.name, m.type, m.tbl_name, SUM(s.pgsize), SUM(s.unused)
+                FROM dbstat s
+                JOIN sqlite_master m ON m.name = s.name
+                GROUP BY m.name
+                ORDER BY SUM(s.pgsize) DESC
+            """)
+        except sqlite3.OperationalError:
+            return None
+        objects = []
+        for name, kind, table, size, unused in cursor.fetchall():
+            stat = index_stats.get(name)
+            objects.append({
+                "name": name,
+                "type": kind,
+                "table": table,
+                "bytes": size,
+                "unused_bytes": unused,
+                "rows": table_rows.get(table),
+                # Rows per distinct value of the leading column: low means selective
+                "rows_per_key": stat[1] if stat and len(stat) > 1 else None,
+            })
+        return objects
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+_stop: Optional[threading.Event] = None
+
+
+def start_maintenance_scheduler() -> None:
+    """Run maintenance every DB_MAINTENANCE_INTERVAL_HOURS in a background thread."""
+    global _stop
+    if DB_MAINTENANCE_INTERVAL_HOURS <= 0 or _stop is not None:
+        return
+    stop = _stop = threading.Event()
+    # Every worker polls; the claim in the database lets only one of them run it
+    poll = min(DB_MAINTENANCE_INTERVAL_HOURS * 3600, 600)
+
+    def loop() -> None:
+        while not stop.wait(poll):
+            try:
+                MaintenanceService.run(scheduled=True)
+            except Exception as exc:
+                logger.error("Scheduled database maintenance failed: %s", exc, exc_info=True)
+
+    threading.Thread(target=loop, name="db-maintenance", daemon=True).start()
+
+
+def stop_maintenance_scheduler() -> None:
+    """Stop the maintenance thread (a run in progress finishes in the background)."""
+    global _stop
+    if _stop is not None:
+        _stop.set()
+        _stop = None
@@ -0,0 +1,290 @@
+"""Local lexical pre-screening of CVs against job descriptions (BM25)."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import json
+import logging
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from backend.models.database import decode_cv_data, get_db_connection
+from backend.models.versions import get_jobs_version, get_ranking_version
+
+logger = logging.getLogger(__name__)
+
+# Parsed CV fields that carry matchable content
+INDEXED_FIELDS = ["education", "experience", "skills", "projects", "awards", "publications", "languages"]
+
+# Prescreen modes a job can use
+PRESCREEN_MODES = ("off", "skip", "defer")
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or our that the this to was
+    were will with we you your they their able experience work working years year team
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping terms like c++, c# and node.js intact."""
+    return [
+        t for t in _TOKEN_RE.findall(text.lower())
+        if t not in _STOPWORDS and (len(t) > 1 or t in ("c", "r"))
+    ]
+
+
+def info_text(info: Dict) -> str:
+    """Flatten the indexed sections of parsed candidate info into text."""
+    parts = []
+    for field in INDEXED_FIELDS:
+        value = info.get(field, "")
+        parts.append(value if isinstance(value, str) else json.dumps(value, ensure_ascii=False))
+    return " ".join(parts)
+
+
+class LexicalIndex:
+    """
+    In-process BM25 inverted index over parsed CVs.
+
+    Postings are kept as growable typed arrays so new analyses are appended
+    in place; scoring views them as NumPy arrays and accumulates each query
+    term's contribution over its whole posting list at once. Analyses
+    saved and jobs deleted by other server workers are picked up when the
+    shared data versions change.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._vocab: Dict[str, int] = {}
+        self._postings: List[tuple] = []  # term id -> (doc rows, term frequencies)
+        self._doc_ids = array("q")
+        self._doc_jobs = array("q")
+        self._doc_len = array("f")
+        self._alive = array("b")
+        self._rows: Dict[int, int] = {}
+        self._total_len = 0.0
+        self._live_docs = 0
+        self._loaded = False
+        self._last_id = 0  # Highest analysis ID read from the database
+        self._versions = (-1, -1)  # (analyses, jobs) versions at the last sync
+
+    def ensure_loaded(self) -> None:
+        """Build the index on first use, then catch up with writes made by other processes."""
+        versions = (get_ranking_version(), get_jobs_version())
+        if self._loaded and versions == self._versions:
+            return
+        with self._lock:
+            if self._loaded and versions == self._versions:
+                return
+            with get_db_connection() as conn:
+                rows = conn.execute(
+                    "SELECT id, job_id, cv_data FROM analyses WHERE id > ? ORDER BY id", (self._last_id,)
+                ).fetchall()
+                job_ids = {row[0] for row in conn.execute("SELECT id FROM jobs")}
+            for analysis_id, job_id, cv_data in rows:
+                if analysis_id not in self._rows:  # Not already added by this process
+                    payload = decode_cv_data(cv_data)
+                    self._add(analysis_id, job_id, payload.get("info", {}))
+                self._last_id = analysis_id
+            if self._loaded and versions[1] != self._versions[1]:
+                for row, doc_job in enumerate(self._doc_jobs):
+                    if doc_job not in job_ids and self._alive[row]:
+                        self._remove_row(row)
+            if not self._loaded:
+                logger.info("Lexical index built over %s analyses", len(rows))
+            self._loaded = True
+            self._versions = versions
+
+    def add(self, analysis_id: int, job_id: int, info: Dict) -> None:
+        """Index a newly inserted analysis."""
+        if not self._loaded:
+            return  # Picked up by the initial build
+        with self._lock:
+            self._add(analysis_id, job_id, info)
+
+    def remove_job(self, job_id: int) -> None:
+        """Drop every analysis of a deleted job."""
+        with self._lock:
+            for row, doc_job in enumerate(self._doc_jobs):
+                if doc_job == job_id and self._alive[row]:
+                    self._remove_row(row)
+
+    def _add(self, analysis_id: int, job_id: int, info: Dict) -> None:
+        if analysis_id in self._rows:
+            self._remove_row(self._rows[analysis_id])
+        row = len(self._doc_ids)
+        counts = Counter(tokenize(info_text(info)))
+        for term, tf in counts.items():
+            term_id = self._vocab.get(term)
+            if term_id is None:
+                term_id = self._vocab[term] = len(self._postings)
+                self._postings.append((array("i"), array("f")))
+            rows, tfs = self._postings[term_id]
+            rows.append(row)
+            tfs.append(tf)
+        length = float(sum(counts.values()))
+        self._rows[analysis_id] = row
+        self._doc_ids.append(analysis_id)
+        self._doc_jobs.append(job_id)
+        self._doc_len.append(length)
+        self._alive.append(1)
+        self._total_len += length
+        self._live_docs += 1
+
+    def _remove_row(self, row: int) -> None:
+        self._alive[row] = 0
+        self._total_len -= self._doc_len[row]
+        self._live_docs -= 1
+        self._rows.pop(self._doc_ids[row], None)
+
+    def _query_terms(self, jd_text: str) -> Dict[str, tuple]:
+        """
+        Map every JD term to (term_id, query frequency, idf).
+
+        Terms missing from the index are kept with a term_id of None (and
+        the idf of a term no document contains).
+        """
+        import numpy as np  # Deferred: numpy is slow to import and only needed for scoring
+
+        n = max(self._live_docs, 1)
+        terms = {}
+        for term, qtf in Counter(tokenize(jd_text)).items():
+            term_id = self._vocab.get(term)
+            df = 0
+            if term_id is not None:
+                df = int(np.frombuffer(self._alive, dtype=np.int8)[
+                    np.frombuffer(self._postings[term_id][0], dtype=np.int32)
+                ].sum())
+            idf = float(np.log1p((n - df + 0.5) / (df + 0.5)))
+            terms[term] = (term_id, qtf, idf)
+        return terms
+
+    def _raw_scores(self, terms: Dict):
+        """BM25 score of every indexed row for the query terms (call with the lock held)."""
+        import numpy as np
+
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)
+        avgdl = self._total_len / max(self._live_docs, 1) or 1.0
+        norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+        scores = np.zeros(len(self._doc_ids), dtype=np.float64)
+        for term_id, qtf, idf in terms.values():
+            if term_id is None:
+                continue
+            rows = np.frombuffer(self._postings[term_id][0], dtype=np.int32)
+            tfs = np.frombuffer(self._postings[term_id][1], dtype=np.float32)
+            scores[rows] += qtf * idf * tfs * (self.k1 + 1) / (tfs + norm[rows])
+        return scores
+
+    def _best_score(self, scores) -> float:
+        """Highest score among live rows (call with the lock held)."""
+        import numpy as np
+
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        return float(scores[alive].max()) if alive.any() else 0.0
+
+    def score_all(self, jd_text: str, job_id: Optional[int] = None) -> Dict[int, float]:
+        """
+        Relevance in [0, 1] of every indexed CV to a JD.
+
+        Scores are relative to the best-matching indexed CV, which gets 1.0.
+
+        Args:
+            jd_text: Job description text (the query)
+            job_id: If given, only score analyses of that job
+        """
+        import numpy as np
+
+        self.ensure_loaded()
+        with self._lock:
+            if not len(self._doc_ids):
+                return {}
+            scores = self._raw_scores(self._query_terms(jd_text))
+            best = self._best_score(scores)
+            if best > 0:
+                scores /= best
+
+            mask = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+            if job_id is not None:
+                mask &= np.frombuffer(self._doc_jobs, dtype=np.int64) == job_id
+            doc_ids = np.frombuffer(self._doc_ids, dtype=np.int64)[mask]
+            return dict(zip(doc_ids.tolist(), scores[mask].tolist()))
+
+    def score_info(self, info: Dict, jd_text: str) -> float:
+        """
+        Relevance in [0, 1] of a (possibly unindexed) parsed CV to a JD.
+
+        The score is relative to the best match among the indexed CVs and
+        this one, on the same scale as score_all().
+        """
+        import numpy as np
+
+        self.ensure_loaded()
+        counts = Counter(tokenize(info_text(info)))
+        if not counts:
+            return 0.0
+        length = float(sum(counts.values()))
+        with self._lock:
+            terms = self._query_terms(jd_text)
+            avgdl = self._total_len / max(self._live_docs, 1) or length
+            best = self._best_score(self._raw_scores(terms)) if len(self._doc_ids) else 0.0
+        norm = self.k1 * (1 - self.b + self.b * length / avgdl)
+        qtf = np.array([t[1] * t[2] for t in terms.values()], dtype=np.float64)
+        tfs = np.array([counts.get(term, 0) for term in terms], dtype=np.float64)
+        score = float((qtf * tfs * (self.k1 + 1) / (tfs + norm)).sum())
+        return score / max(best, score) if score > 0 else 0.0
+
+
+_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """Process-wide lexical index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LexicalIndex()
+    return _index
+
+
+class PrescreenService:
+    """Decide whether a CV is relevant enough to a job to spend LLM calls on."""
+
+    @staticmethod
+    def evaluate(info: Dict, job: Dict) -> Dict:
+        """
+        Compute a CV's relevance to a job and apply the job's prescreen mode.
+
+        Returns:
+            Dictionary with 'relevance' and 'status' ('scored' when the CV
+            should go on to LLM scoring, otherwise 'skipped' or 'deferred')
+        """
+        relevance = get_lexical_index().score_info(info, job["description"])
+        mode = job.get("prescreen_mode") or "off"
+        threshold = job.get("prescreen_threshold") or 0.0
+        status = "scored"
+        if mode != "off" and relevance < threshold:
+            status = "skipped" if mode == "skip" else "deferred"
+            logger.info("Prescreen %s CV for job %s (relevance %.3f < %.3f)", status, job["id"], relevance, threshold)
+        return {"relevance": relevance, "status": status}
+
+    @staticmethod
+    def shortlist(job: Dict, limit: int = 50, job_only: bool = False) -> List[Dict]:
+        """Most relevant stored CVs for a job, by lexical relevance."""
+        scores = get_lexical_index().score_all(job["description"], job["id"] if job_only else None)
+        top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{"analysis_id": analysis_id, "relevance": relevance} for analysis_id, relevance in top]
+
+    @staticmethod
+    def index_analyses(rows: Iterable[tuple]) -> None:
+        """Add (analysis_id, job_id, info) rows to the lexical index."""
+        index = get_lexical_index()
+        for analysis_id, job_id, info in rows:
+            index.add(analysis_id, job_id, info)
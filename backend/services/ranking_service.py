@@ -4,12 +4,16 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 import logging
-from typing import List, Optional
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-import pandas as pd
 import sqlite3
 
 from config import DB_PATH
+from backend.models.versions import get_ranking_version
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +21,12 @@ logger = logging.getLogger(__name__)
 class RankingService:
     """Service for retrieving and managing CV rankings."""
     
+    # job_id (None for all jobs) -> (version, ranking); stale entries are replaced on read
+    _cache: Dict[Optional[int], Tuple[int, List[dict]]] = {}
+    _cache_lock = threading.Lock()
+    
     @staticmethod
-    def get_ranking(job_id: Optional[int] = None) -> pd.DataFrame:
+    def get_ranking(job_id: Optional[int] = None) -> "pd.DataFrame":
         """
         Get ranking of candidates.
         
@@ -28,12 +36,14 @@ class RankingService:
         Returns:
             DataFrame with candidate rankings
         """
+        import pandas as pd  # Deferred: pandas is slow to import and only needed here
+        
         with sqlite3.connect(DB_PATH) as conn:
             if job_id:
                 df = pd.read_sql_query(
                     """
                     SELECT a.id, a.job_id, j.title as job_title, a.name, a.email, a.phone, 
-                           a.score, a.created_at
+                           a.score, a.relevance, a.status, a.created_at
                     FROM analyses a
                     JOIN jobs j ON a.job_id = j.id
                     WHERE a.job_id = ?
@@ -46,7 +56,7 @@ class RankingService:
                 df = pd.read_sql_query(
                     """
                     SELECT a.id, a.job_id, j.title as job_title, a.name, a.email, a.phone, 
-                           a.score, a.created_at
+                           a.score, a.relevance, a.status, a.created_at
                     FROM analyses a
                     JOIN jobs j ON a.job_id = j.id
                     ORDER BY a.score DESC, a.id DESC
@@ -60,11 +70,30 @@ class RankingService:
         """
         Get ranking as a list of dictionaries.
         
+        Results are cached in-process per job and reused until a write
+        bumps the job's version.
+        
         Args:
             job_id: Optional job ID to filter by.
             
         Returns:
             List of dictionaries with candidate information
         """
+        key = job_id or None
+        # Read the version before querying so a concurrent write is never masked
+        version = get_ranking_version(key)
+        with RankingService._cache_lock:
+            cached = RankingService._cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        
+        import pandas as pd
+        
         df = RankingService.get_ranking(job_id)
-        return df.to_dict('records')
+        # Unscored (prescreened) rows have NULL scores; NaN is not valid JSON
+        df = df.astype(object).where(pd.notnull(df), None)
+        ranking = df.to_dict('records')
+        
+        with RankingService._cache_lock:
+            RankingService._cache[key] = (version, ranking)
+        return ranking
@@ -0,0 +1,69 @@
+"""Full-text candidate search over the FTS5 index."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+import logging
+import re
+import sqlite3
+from typing import List, Optional
+
+from config import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# BM25 column weights: job_id (unindexed), name, skills, experience, education, languages
+_BM25_WEIGHTS = "0.0, 10.0, 5.0, 2.0, 1.0, 1.0"
+
+
+class SearchService:
+    """Service for searching candidates by name and parsed CV content."""
+
+    @staticmethod
+    def build_query(text: str) -> str:
+        """
+        Turn free text into an FTS5 query matching all of its terms.
+
+        Each term is quoted so user input can never be read as FTS5
+        syntax; terms are implicitly ANDed. Terms with no letters or
+        digits (such as a lone "+") are dropped.
+        """
+        terms = [t for t in text.split() if re.search(r"\w", t)]
+        return " ".join('"{}"'.format(t.replace('"', '""')) for t in terms)
+
+    @staticmethod
+    def search(text: str, job_id: Optional[int] = None, limit: int = 20) -> List[dict]:
+        """
+        Search candidates, best BM25 match first.
+
+        Args:
+            text: Free-text query, e.g. "Kubernetes Go"
+            job_id: Optional job ID to restrict results to
+            limit: Maximum number of results
+
+        Returns:
+            List of dictionaries with candidate fields, rank and snippet
+        """
+        query = SearchService.build_query(text)
+        if not query:
+            return []
+
+        sql = f"""
+            SELECT a.id, a.job_id, j.title AS job_title, a.name, a.email, a.phone, a.score,
+                   bm25(analyses_fts, {_BM25_WEIGHTS}) AS rank,
+                   snippet(analyses_fts, -1, '<mark>', '</mark>', '...', 12) AS snippet
+            FROM analyses_fts
+            JOIN analyses a ON a.id = analyses_fts.rowid
+            JOIN jobs j ON a.job_id = j.id
+            WHERE analyses_fts MATCH ?
+        """
+        params: list = [query]
+        if job_id:
+            sql += " AND analyses_fts.job_id = ?"
+            params.append(job_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with sqlite3.connect(DB_PATH) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
@@ -0,0 +1,94 @@
+"""Benchmark: database file size and ranking query time as jobs churn.
+
+Each round creates a few jobs with N analyses each, then deletes the
+oldest jobs, so the live data stays about the same size. After every
+round, maintenance (orphan cleanup, incremental vacuum, ANALYZE) runs in
+one scratch database and not in the other. The report shows both file
+sizes, the free pages left, and the time of a ranking query.
+
+Usage:
+    python benchmarks/db_maintenance.py [--rounds 8] [--jobs 3] [--candidates 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def fill(job_id: int, candidates: int, rng: random.Random) -> None:
+    """Insert scored analyses with ~1 KB cv_data payloads."""
+    from backend.models import database
+
+    rows = [
+        (job_id, f"Candidate {i}", rng.randint(0, 100),
+         database.encode_cv_data({"info": {"name": f"Candidate {i}"}, "notes": os.urandom(400).hex()}))
+        for i in range(candidates)
+    ]
+    with database.get_db_connection() as conn:
+        conn.executemany("INSERT INTO analyses (job_id, name, score, cv_data) VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+
+
+def ranking_ms(job_id: int, runs: int = 20) -> float:
+    from backend.models import database
+
+    with database.get_db_connection() as conn:
+        started = time.perf_counter()
+        for _ in range(runs):
+            conn.execute(
+                "SELECT id, name, score FROM analyses WHERE job_id = ? ORDER BY score DESC LIMIT 50", (job_id,)
+            ).fetchall()
+        return (time.perf_counter() - started) / runs * 1000
+
+
+def churn(directory: str, args: argparse.Namespace, maintain: bool) -> list:
+    """Run the churn rounds in a scratch database; returns one report line per round."""
+    os.chdir(directory)  # DB_PATH is relative: use a scratch data/ directory
+    from backend.models import database
+    from backend.services.maintenance_service import MaintenanceService
+
+    database.init_db()
+    rng = random.Random(0)
+    live = []
+    lines = []
+    for round_no in range(1, args.rounds + 1):
+        for _ in range(args.jobs):
+            job_id = database.create_job(f"Job {round_no}", "Python developer")
+            fill(job_id, args.candidates, rng)
+            live.append(job_id)
+        while len(live) > args.jobs * 2:
+            database.delete_job(live.pop(0))
+        if maintain:
+            MaintenanceService.run()
+        stats = MaintenanceService.stats()
+        lines.append(
+            f"{stats['file_bytes'] / 1e6:7.1f} MB  free {stats['free_pages']:6d} pages"
+            f"  ranking {ranking_ms(live[-1]):5.2f} ms"
+        )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=3, help="Jobs created (and later deleted) per round")
+    parser.add_argument("--candidates", type=int, default=2000, help="Analyses per job")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as plain, tempfile.TemporaryDirectory() as maintained:
+        without = churn(plain, args, maintain=False)
+        with_maintenance = churn(maintained, args, maintain=True)
+        os.chdir(ROOT)
+
+    print(f"{'round':<6} {'no maintenance':<44} with maintenance")
+    for round_no, (before, after) in enumerate(zip(without, with_maintenance), 1):
+        print(f"{round_no:<6} {before:<44} {after}")
+
+
+if __name__ == "__main__":
+    main()
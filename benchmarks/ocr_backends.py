@@ -0,0 +1,129 @@
+"""Benchmark: latency and accuracy of each OCR backend and routing policy.
+
+Pages are rendered exactly as ocr_pdf renders them and read by every
+available engine: Tesseract if pytesseract and the tesseract binary are
+installed, Vision if GOOGLE_VISION_API_KEY is set, and the 'local-first'
+policy when both are. Accuracy is the character similarity (difflib
+ratio, whitespace-normalized) to each page's own text layer, so inputs
+must be born-digital PDFs; by default synthetic CV pages are generated,
+including degraded (blurred, noisy) copies that stand in for scans.
+
+Usage:
+    python benchmarks/ocr_backends.py [--pages 6] [--pdf FILE ...]
+"""
+import argparse
+import difflib
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import GOOGLE_VISION_API_KEY  # noqa: E402
+import ocr  # noqa: E402
+
+WORDS = (
+    "python go kubernetes postgresql aws terraform django react engineer led team built "
+    "migrated pipeline latency service university bachelor master award english french "
+    "german fluent certified scrum agile docker kafka spark analytics platform"
+).split()
+
+
+def make_pdf(path: str, pages: int, seed: int = 0) -> None:
+    """Write a PDF of CV-like pages with random text."""
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page(width=595, height=842)
+        lines = [" ".join(rng.choice(WORDS) for _ in range(10)) for _ in range(40)]
+        page.insert_textbox(fitz.Rect(40, 40, 555, 802), "\n".join(lines), fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def degrade(img_b64: str, seed: int) -> str:
+    """Blur the page and add noise, roughly like a poor scan."""
+    import base64
+    from io import BytesIO
+
+    from PIL import Image, ImageFilter
+
+    rng = random.Random(seed)
+    image = Image.open(BytesIO(base64.b64decode(img_b64))).convert("L").filter(ImageFilter.GaussianBlur(1.2))
+    pixels = image.load()
+    for _ in range(image.width * image.height // 50):
+        pixels[rng.randrange(image.width), rng.randrange(image.height)] = rng.choice((0, 255))
+    return ocr.encode_image_to_base64(image.convert("RGB"))
+
+
+def load_pages(paths, degraded: bool):
+    """(label, reference text, base64 image) for every page with a text layer."""
+    pages = []
+    for path in paths:
+        with ocr.open_pdf(path) as doc:
+            for idx in range(len(doc)):
+                page = doc.load_page(idx)
+                reference = page.get_text("text")
+                if not reference.strip():
+                    continue
+                img_b64 = ocr.encode_image_to_base64(ocr.render_page(page))
+                pages.append((f"{os.path.basename(path)}:{idx + 1}", reference, img_b64))
+                if degraded:
+                    pages.append((f"{os.path.basename(path)}:{idx + 1}~", reference, degrade(img_b64, idx)))
+    return pages
+
+
+def similarity(reference: str, text: str) -> float:
+    return difflib.SequenceMatcher(None, " ".join(reference.split()), " ".join(text.split())).ratio()
+
+
+def run(name: str, recognize, pages) -> None:
+    latencies, scores, engines = [], [], []
+    for _, reference, img_b64 in pages:
+        started = time.perf_counter()
+        result = recognize(img_b64)
+        latencies.append(time.perf_counter() - started)
+        scores.append(similarity(reference, result.text))
+        engines.append(result.backend)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    vision_share = engines.count("vision") / len(engines)
+    print(
+        f"{name:<12} pages {len(pages):3d}  latency median {statistics.median(latencies) * 1000:7.1f} ms"
+        f"  p95 {p95 * 1000:7.1f} ms  accuracy mean {statistics.mean(scores):.3f}"
+        f"  min {min(scores):.3f}  sent to Vision {vision_share:.0%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=6, help="Synthetic pages to generate")
+    parser.add_argument("--pdf", nargs="*", help="Born-digital PDFs to use instead of synthetic pages")
+    parser.add_argument("--no-degraded", action="store_true", help="Skip the degraded page copies")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.pdf
+        if not paths:
+            paths = [os.path.join(tmp, "synthetic.pdf")]
+            make_pdf(paths[0], args.pages)
+        pages = load_pages(paths, degraded=not args.no_degraded)
+
+    policies = [policy for policy in ocr.OCR_POLICIES if ocr.ocr_available(GOOGLE_VISION_API_KEY, policy)]
+    if not policies:
+        print("No OCR backend available: install pytesseract and tesseract, or set GOOGLE_VISION_API_KEY")
+        return
+    for policy in policies:
+        router = ocr.PageRouter(GOOGLE_VISION_API_KEY, policy)
+        router.recognize(pages[0][2])  # Warm up (process pool start, connection setup)
+        run(policy, router.recognize, pages)
+
+
+if __name__ == "__main__":
+    main()
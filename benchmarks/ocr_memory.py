@@ -0,0 +1,73 @@
+"""Benchmark: peak memory of ocr_pdf as page count grows.
+
+Each page count runs in a fresh subprocess and reports its peak RSS. The
+Vision API call is replaced by a no-op so only local rendering and
+encoding are measured (no API key or network needed).
+
+Usage:
+    python benchmarks/ocr_memory.py [--pages 1 5 20]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def make_pdf(path: str, pages: int) -> None:
+    """Write a text-heavy A4 PDF with the given number of pages."""
+    import fitz
+
+    doc = fitz.open()
+    line = "Senior backend engineer - Python, Go, Kubernetes, PostgreSQL, AWS. " * 2
+    for i in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(40, 40, 555, 802), f"Page {i + 1}\n" + (line + "\n") * 60, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def run_child(pdf_path: str) -> None:
+    """Run ocr_pdf on a file and print peak RSS in MB."""
+    import ocr
+
+    ocr.vision_annotate = lambda img_b64, api_key: {}
+    ocr.ocr_pdf(pdf_path, "benchmark")
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(peak_kb / 1024 if sys.platform != "darwin" else peak_kb / 1024 / 1024)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return 0
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"cv_{pages}.pdf")
+            make_pdf(path, pages)
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", path],
+                check=True, capture_output=True, text=True,
+            )
+            results[pages] = float(out.stdout.strip().splitlines()[-1])
+            print(f"{pages:>4} pages  peak RSS {results[pages]:8.1f} MB")
+
+    base = results[min(results)]
+    growth = results[max(results)] / base
+    print(f"peak RSS growth {min(results)} -> {max(results)} pages: {growth:.2f}x")
+    return 0 if growth < 1.25 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Benchmark: re-ranking a job's stored CVs after its category weights change.
+
+Fills a scratch database with one job and N scored analyses (random
+category scores, small cv_data payloads), then times set_job_weights(),
+which recomputes every total in a single SQL UPDATE, and reads the new
+ranking back.
+
+Usage:
+    python benchmarks/reweight.py [--candidates 10000] [--runs 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config  # noqa: E402
+
+
+def fill(job_id: int, candidates: int, seed: int = 0) -> None:
+    """Insert scored analyses with random category scores."""
+    from backend.models import database
+
+    rng = random.Random(seed)
+    columns = ", ".join(database.CATEGORY_SCORE_COLUMNS)
+    placeholders = ", ".join("?" * len(database.CATEGORY_SCORE_COLUMNS))
+    rows = []
+    for i in range(candidates):
+        scores = {category: rng.randint(0, 100) for category in config.SCORING_CATEGORIES}
+        payload = database.encode_cv_data({"info": {"name": f"Candidate {i}"}, "scores": scores, "reasons": {}})
+        rows.append([job_id, f"Candidate {i}", database.weighted_total(scores, None), payload]
+                    + [scores[category] for category in config.SCORING_CATEGORIES])
+    with database.get_db_connection() as conn:
+        conn.executemany(
+            f"INSERT INTO analyses (job_id, name, score, cv_data, {columns}) VALUES (?, ?, ?, ?, {placeholders})",
+            rows,
+        )
+        conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # DB_PATH is relative: use a scratch data/ directory
+        from backend.models import database
+        from backend.services.ranking_service import RankingService
+
+        database.init_db()
+        job_id = database.create_job("Senior backend engineer", "Python, PostgreSQL, AWS")
+        fill(job_id, args.candidates)
+
+        rng = random.Random(1)
+        reweight, rank = [], []
+        for _ in range(args.runs):
+            weights = {category: rng.uniform(0.1, 5) for category in config.SCORING_CATEGORIES}
+            started = time.perf_counter()
+            rescored = database.set_job_weights(job_id, weights)
+            reweight.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            RankingService.get_ranking_dict(job_id)
+            rank.append(time.perf_counter() - started)
+
+        os.chdir(ROOT)
+        print(f"{rescored} candidates re-weighted: median {statistics.median(reweight) * 1000:.1f} ms "
+              f"(max {max(reweight) * 1000:.1f} ms); ranking read back: median {statistics.median(rank) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
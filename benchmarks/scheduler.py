@@ -0,0 +1,114 @@
+"""Benchmark: interactive latency and job fairness under a bulk backlog.
+
+Simulates the shared LLM capacity with calls that sleep for a fixed
+latency. Two bulk jobs are queued at once: a large backlog for job 1 and
+a small batch for job 2. While they run, single interactive uploads
+arrive at a steady rate. Each upload makes one parse call, then five
+score calls. The same load runs through the FairScheduler and through a
+plain FIFO semaphore of the same capacity. The report covers interactive
+upload latency, queue wait per class, and when the small bulk job
+finishes.
+
+Usage:
+    python benchmarks/scheduler.py [--capacity 4] [--bulk 400] [--latency 0.02]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import metrics  # noqa: E402
+from scheduler import BULK, INTERACTIVE, FairScheduler, bind, workload  # noqa: E402
+
+
+class FifoScheduler:
+    """Baseline: first come, first served, same capacity."""
+
+    def __init__(self, capacity: int):
+        self._semaphore = threading.Semaphore(capacity)
+
+    def call(self, fn, *args):
+        with self._semaphore:
+            return fn(*args)
+
+
+def p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def simulate(scheduler, args) -> dict:
+    """Run the mixed load; returns interactive latencies and each bulk job's finish time."""
+    started = time.monotonic()
+    finished = {}
+    interactive = []
+
+    def llm_call():
+        time.sleep(args.latency)
+
+    def bulk_job(job_id: int, calls: int, pool: ThreadPoolExecutor):
+        with workload(BULK, job_id):
+            futures = [pool.submit(bind(scheduler.call), llm_call) for _ in range(calls)]
+        for future in futures:
+            future.result()
+        finished[job_id] = time.monotonic() - started
+
+    def upload(job_id: int):
+        t0 = time.monotonic()
+        with workload(INTERACTIVE, job_id):
+            scheduler.call(llm_call)  # Parse
+            with ThreadPoolExecutor(max_workers=5) as pool:
+                for future in [pool.submit(bind(scheduler.call), llm_call) for _ in range(5)]:
+                    future.result()
+        interactive.append(time.monotonic() - t0)
+
+    with ThreadPoolExecutor(max_workers=64) as bulk_pool:
+        bulk = [
+            threading.Thread(target=bulk_job, args=(1, args.bulk, bulk_pool)),
+            threading.Thread(target=bulk_job, args=(2, args.bulk // 10, bulk_pool)),
+        ]
+        for thread in bulk:
+            thread.start()
+        uploads = []
+        for i in range(args.uploads):
+            time.sleep(args.interval)
+            thread = threading.Thread(target=upload, args=(100 + i,))
+            thread.start()
+            uploads.append(thread)
+        for thread in uploads + bulk:
+            thread.join()
+    return {"interactive": interactive, "finished": finished}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=4, help="Concurrent calls allowed")
+    parser.add_argument("--bulk", type=int, default=400, help="Calls queued by the large bulk job")
+    parser.add_argument("--uploads", type=int, default=10, help="Interactive uploads during the backlog")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between interactive uploads")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per simulated call")
+    args = parser.parse_args()
+
+    for name, scheduler in (("fifo", FifoScheduler(args.capacity)), ("fair", FairScheduler("bench", args.capacity))):
+        result = simulate(scheduler, args)
+        latencies = result["interactive"]
+        print(
+            f"{name:<5} interactive upload median {statistics.median(latencies) * 1000:7.1f} ms"
+            f"  p95 {p95(latencies) * 1000:7.1f} ms   small bulk job done at {result['finished'][2]:5.2f} s"
+            f"  large at {result['finished'][1]:5.2f} s"
+        )
+    waits = metrics.snapshot()
+    print(
+        f"fair queue wait p95: interactive {waits['bench_wait_interactive_p95'] * 1000:.1f} ms,"
+        f" bulk {waits['bench_wait_bulk_p95'] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
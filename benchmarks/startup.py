@@ -0,0 +1,117 @@
+"""Benchmark: server cold start and worker start-up time.
+
+A production worker (and a restarted one) pays for importing the app and
+running create_app() in a fresh interpreter; this measures both in
+subprocesses and lists which heavy libraries were loaded at start-up.
+With --serve it also times `run.py --production` from launch until it
+answers its first request.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--serve] [--workers 2]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import DB_READY_ENV  # noqa: E402
+
+HEAVY_MODULES = ["pandas", "numpy", "fitz", "PIL", "google.generativeai", "pyarrow"]
+
+CHILD = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import backend.app
+imported = time.perf_counter()
+backend.app.create_app()
+created = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "create_app": created - imported,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def time_worker_start(workdir: str, db_ready: bool) -> dict:
+    """Import the app and create it in a fresh interpreter."""
+    env = dict(os.environ)
+    if db_ready:
+        env[DB_READY_ENV] = "1"
+    else:
+        env.pop(DB_READY_ENV, None)
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=ROOT, heavy=HEAVY_MODULES)],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["total"] = time.perf_counter() - started
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_serve(workdir: str, workers: int, timeout: float = 60.0) -> float:
+    """Seconds from launching production mode until the first request succeeds."""
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "run.py"), "--production",
+         "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/api/jobs", timeout=1).read()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError("Server did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--serve", action="store_true", help="Also time production mode to first response")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    # A scratch working directory, so data/ and logs/ are created outside the repo
+    with tempfile.TemporaryDirectory() as workdir:
+        time_worker_start(workdir, db_ready=False)  # Create the schema and warm the OS file cache
+        for db_ready in (False, True):
+            runs = [time_worker_start(workdir, db_ready) for _ in range(args.runs)]
+            label = "worker start (DB ready)" if db_ready else "worker start (init_db)"
+            print(
+                f"{label:<26} total {statistics.median(r['total'] for r in runs) * 1000:7.1f} ms  "
+                f"import {statistics.median(r['import'] for r in runs) * 1000:7.1f} ms  "
+                f"create_app {statistics.median(r['create_app'] for r in runs) * 1000:6.1f} ms"
+            )
+        print(f"heavy modules loaded at start-up: {', '.join(runs[-1]['loaded']) or 'none'}")
+
+        if args.serve:
+            print(f"production cold start ({args.workers} workers) to first response: "
+                  f"{time_serve(workdir, args.workers):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Evaluation: agreement of the local Languages/Awards scorers with LLM scores.
+
+Reads stored analyses whose categories were scored by the LLM, reruns the
+local heuristics on the same parsed CV against the JD version it was
+scored with, and reports per category how far the local scores are from
+the LLM's (mean absolute error, share within the tolerance, correlation),
+how often the heuristics are confident enough to be used in 'tiered'
+mode (coverage), and the error on just those confident cases. Run it
+before switching a job to tiered scoring or changing
+TIERED_MIN_CONFIDENCE.
+
+Usage:
+    python benchmarks/tiered_scoring.py [--job-id N] [--limit 2000] [--tolerance 15]
+"""
+import argparse
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import TIERED_MIN_CONFIDENCE  # noqa: E402
+from backend.models.database import decode_cv_data, get_db_connection  # noqa: E402
+from backend.services.local_scoring_service import LOCAL_CATEGORIES, LocalScoringService  # noqa: E402
+
+
+def load_pairs(job_id, limit: int):
+    """(category, LLM score, local result) for every LLM-scored local category."""
+    query = """
+        SELECT a.cv_data, d.description FROM analyses a
+        JOIN job_descriptions d ON d.id = a.jd_id
+        WHERE a.status = 'scored'
+    """
+    params = []
+    if job_id is not None:
+        query += " AND a.job_id = ?"
+        params.append(job_id)
+    query += " ORDER BY a.id DESC LIMIT ?"
+    params.append(limit)
+
+    with get_db_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    pairs = []
+    for cv_data, jd_text in rows:
+        payload = decode_cv_data(cv_data)
+        scores = payload.get("scores") or {}
+        scored_by = payload.get("scored_by", {})
+        for category in LOCAL_CATEGORIES:
+            if category not in scores or scored_by.get(category, "llm") != "llm":
+                continue
+            local = LocalScoringService.score(category, jd_text, payload["info"])
+            pairs.append((category, scores[category], local))
+    return pairs
+
+
+def summarize(label: str, llm, local, tolerance: float) -> str:
+    if not llm:
+        return f"  {label:<10} n    0"
+    errors = [abs(a - b) for a, b in zip(llm, local)]
+    within = sum(error <= tolerance for error in errors) / len(errors)
+    try:
+        correlation = f"{statistics.correlation(llm, local):5.2f}"
+    except (statistics.StatisticsError, AttributeError):  # Constant input, or Python < 3.10
+        correlation = "  n/a"
+    return (
+        f"  {label:<10} n {len(llm):4d}  MAE {statistics.mean(errors):5.1f}"
+        f"  within ±{tolerance:g} {within:5.1%}  r {correlation}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--job-id", type=int, help="Only analyses for this job")
+    parser.add_argument("--limit", type=int, default=2000, help="Most recent analyses to read")
+    parser.add_argument("--tolerance", type=float, default=15, help="Points counted as agreement")
+    parser.add_argument("--min-confidence", type=float, default=TIERED_MIN_CONFIDENCE)
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.job_id, args.limit)
+    if not pairs:
+        print("No LLM-scored analyses found")
+        return
+
+    for category in LOCAL_CATEGORIES:
+        rows = [(llm, local) for name, llm, local in pairs if name == category]
+        confident = [(llm, local) for llm, local in rows if local["confidence"] >= args.min_confidence]
+        coverage = len(confident) / len(rows) if rows else 0.0
+        print(f"{category}: coverage {coverage:.1%} at confidence >= {args.min_confidence:g}")
+        print(summarize("all", [llm for llm, _ in rows], [local["score"] for _, local in rows], args.tolerance))
+        print(summarize("confident", [llm for llm, _ in confident], [local["score"] for _, local in confident],
+                        args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,18 @@ import os
 
 # Database
 DB_PATH = "data/app.db"
+CV_DATA_COMPRESSION_LEVEL = 6  # zlib level for stored analysis payloads
+WRITE_BATCH_SIZE = 50  # Most queued analysis writes committed in one transaction
+WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", "0.02"))  # Seconds a write may wait for others to join its batch
+DB_MAINTENANCE_INTERVAL_HOURS = float(os.getenv("DB_MAINTENANCE_INTERVAL_HOURS", "24"))  # Orphan cleanup, vacuum and ANALYZE (0 = only via the admin API)
+DB_VACUUM_MAX_PAGES = int(os.getenv("DB_VACUUM_MAX_PAGES", "20000"))  # Free pages released per maintenance run (0 = all)
+VERSION_CACHE_TTL = float(os.getenv("VERSION_CACHE_TTL", "1.0"))  # Seconds a worker trusts cached data versions (other workers' writes)
+
+# Server (production mode: python run.py --production)
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+DB_READY_ENV = "SMART_CV_DB_READY"  # Set by run.py after init_db() so workers skip it
 
 # Logging
 LOG_DIR = "logs"
@@ -14,3 +26,53 @@ GOOGLE_GENAI_API_KEY = os.getenv("GOOGLE_GENAI_API_KEY")
 
 # LLM Model
 LLM_MODEL_NAME = "gemini-2.5-flash"
+
+# Scoring
+SCORING_CATEGORIES = ["Education", "Experience", "Skills", "Awards", "Languages"]  # In report order
+SCORING_MAX_WORKERS = int(os.getenv("SCORING_MAX_WORKERS", "8"))
+TIERED_MIN_CONFIDENCE = float(os.getenv("TIERED_MIN_CONFIDENCE", "0.7"))  # Local scores below this go to the LLM
+
+# Fair scheduling of external API calls (interactive before bulk, fair across jobs)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # Gemini calls in flight per process
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", "8"))  # Vision requests in flight per process
+
+# Duplicate detection
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_NUM_PERM = 128  # MinHash permutations
+DEDUP_LSH_BANDS = 32  # LSH bands (DEDUP_NUM_PERM must be divisible by this)
+DEDUP_NEAR_THRESHOLD = 0.9  # Similarity at which a CV is a near-duplicate on its own
+DEDUP_CONTACT_THRESHOLD = 0.6  # Similarity required when email/phone also match
+
+# Checkpointed pipeline runs (resumable CV processing)
+PIPELINE_RUN_DIR = "data/runs"  # PDF copies kept until a run completes
+PIPELINE_RUN_RETENTION_HOURS = int(os.getenv("PIPELINE_RUN_RETENTION_HOURS", "72"))  # Unfinished runs are purged after this
+
+# Export
+EXPORT_CHUNK_SIZE = 500  # Rows fetched from SQLite per streamed chunk
+
+# Uploads
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "20"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# OCR page prescreening (skip blank and picture-only pages before calling Vision)
+OCR_SKIP_LOW_CONTENT_PAGES = os.getenv("OCR_SKIP_LOW_CONTENT_PAGES", "1") == "1"
+OCR_PRESCREEN_DPI = 36  # Resolution of the cheap grayscale render used for page statistics
+OCR_MIN_TEXT_CHARS = 20  # Pages whose own text layer has this many characters are always OCR'd
+OCR_BLANK_INK_RATIO = 0.001  # Below this share of non-white pixels a page is blank
+OCR_SPARSE_INK_RATIO = 0.01  # Image-only pages below this share are logos/decorations
+OCR_GRAPHIC_MIDTONE_RATIO = 0.6  # Image-only pages above this share of mid-tones are photos
+
+# OCR backends: 'vision' (Google Vision API), 'tesseract' (local), or 'local-first'
+# (Tesseract, with Vision re-reading pages it reads with low confidence)
+OCR_BACKEND = os.getenv("OCR_BACKEND", "vision")
+OCR_LOCAL_MIN_CONFIDENCE = float(os.getenv("OCR_LOCAL_MIN_CONFIDENCE", "0.8"))  # Mean word confidence, 0-1
+OCR_TESSERACT_LANG = os.getenv("OCR_TESSERACT_LANG", "eng")
+OCR_TESSERACT_WORKERS = int(os.getenv("OCR_TESSERACT_WORKERS", str(os.cpu_count() or 2)))
+
+# Bulk ingestion (ingest.py)
+INGEST_WORKERS = os.cpu_count() or 2  # Processes rasterizing PDFs
+INGEST_CONCURRENCY = 8  # Files in OCR/LLM calls at once
+INGEST_BATCH_SIZE = 25  # Analyses written per transaction
+INGEST_OCR_RATE = 10.0  # Vision calls per second (0 = unlimited)
+INGEST_LLM_RATE = 5.0  # Gemini calls per second (0 = unlimited)
@@ -354,7 +354,7 @@ function renderCVResult(data) {
         </div>
         
         <div class="total-score">
-            <div class="total-score-value">${data.total_score.toFixed(1)}</div>
+            <div class="total-score-value">${data.total_score !== null ? data.total_score.toFixed(1) : escapeHtml(data.status)}</div>
             <div>Total Score</div>
         </div>
     `;
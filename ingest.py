@@ -0,0 +1,338 @@
+"""Bulk CV ingestion: score a directory tree of PDFs against a job.
+
+Usage:
+    python ingest.py DIR --job-id ID [--workers N] [--concurrency N]
+                     [--batch-size N] [--ocr-rate R] [--llm-rate R]
+                     [--checkpoint FILE]
+
+PDFs are rasterized in a process pool, OCR/LLM calls run concurrently
+under rate limits, and analyses are written in batched transactions.
+Finished files are appended to a checkpoint file, so re-running the same
+command after an interruption resumes where it stopped.
+"""
+import sys
+import os
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    GOOGLE_VISION_API_KEY,
+    INGEST_BATCH_SIZE,
+    INGEST_CONCURRENCY,
+    INGEST_LLM_RATE,
+    INGEST_OCR_RATE,
+    INGEST_WORKERS,
+    LOG_FILE,
+    MAX_PDF_PAGES,
+)
+from metering import UsageRecord, metering
+import metrics
+import ocr
+from scheduler import BULK, workload
+from utils import RateLimiter, ensure_dirs
+
+logger = logging.getLogger("ingest")
+
+
+def rasterize(path: str) -> Tuple[List[Tuple[int, str]], Dict[str, int]]:
+    """
+    Render the OCR-worthy pages of a PDF to base64 JPEGs (runs in a worker process).
+
+    Returns:
+        The (page index, image) pairs, and the pages skipped per kind for
+        the parent to record in its metrics
+    """
+    skipped: Dict[str, int] = {}
+    with ocr.open_pdf(path) as doc:
+        if len(doc) > MAX_PDF_PAGES:
+            raise ValueError(f"PDF has {len(doc)} pages (maximum {MAX_PDF_PAGES})")
+        return list(ocr.iter_page_images(doc, skipped=skipped)), skipped
+
+
+def record_skipped(skipped: Dict[str, int]) -> None:
+    """Count pages skipped by rasterize() in this process's metrics."""
+    for kind, count in skipped.items():
+        metrics.increment(f"ocr_pages_skipped_{kind}", count)
+
+
+class RateLimitedModel:
+    """Wrap an LLM model so every generate_content call waits for the rate limiter."""
+
+    def __init__(self, model, limiter: RateLimiter):
+        self._model = model
+        self._limiter = limiter
+
+    def generate_content(self, *args, **kwargs):
+        self._limiter.acquire()
+        return self._model.generate_content(*args, **kwargs)
+
+
+class Checkpoint:
+    """Append-only JSON-lines record of the files an ingestion run has finished."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from an interrupted write
+                    if "error" not in entry:
+                        self.done.add(entry["path"])
+
+    def record(self, entries: Iterable[Dict]) -> None:
+        """Durably append entries; failed files (with 'error') are retried on resume."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def find_pdfs(root: str) -> List[str]:
+    """PDF paths under root, relative to it, in a stable order."""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(".pdf"):
+                found.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return sorted(found)
+
+
+def _format_eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class Ingestor:
+    """Runs the rasterize -> OCR/parse/score -> batched save pipeline."""
+
+    def __init__(self, root: str, job: Dict, checkpoint: Checkpoint, args: argparse.Namespace):
+        from backend.services.cv_processor import CVProcessor
+
+        self.root = root
+        self.job = job
+        self.checkpoint = checkpoint
+        self.args = args
+        self.ocr_limiter = RateLimiter(args.ocr_rate)
+        self.processor = CVProcessor()
+        self.processor.model = RateLimitedModel(self.processor.model, RateLimiter(args.llm_rate))
+        self.batch: List[Tuple[str, Dict, Dict, List[UsageRecord]]] = []
+        self.finished = 0
+        self.failed = 0
+
+    def analyze(
+        self, rel_path: str, page_images: Optional[List[Tuple[int, str]]]
+    ) -> Tuple[Dict, Dict, List[UsageRecord]]:
+        """
+        OCR, parse and score one file (runs in the I/O thread pool), with its API usage.
+
+        page_images is None for a file already analyzed; it is only
+        rasterized here if its stored analysis cannot be reused.
+        """
+        from backend.models.usage import save_usage
+
+        def run_ocr() -> str:
+            images = page_images
+            if images is None:
+                images, skipped = rasterize(os.path.join(self.root, rel_path))
+                record_skipped(skipped)
+            return ocr.ocr_page_images(images, GOOGLE_VISION_API_KEY, vision_limiter=self.ocr_limiter)
+
+        # Queued behind interactive uploads for the shared OCR/LLM capacity
+        with workload(BULK, self.job["id"]), metering() as meter:
+            try:
+                prepared = self.processor.prepare_cv(os.path.join(self.root, rel_path), ocr_fn=run_ocr)
+                result = self.processor.evaluate(prepared, self.job)
+            except Exception:
+                save_usage(meter.records(), self.job["id"])
+                raise
+            return prepared, result, meter.records()
+
+    def run(self, pending: List[str]) -> None:
+        total = len(pending)
+        queue = iter(pending)
+        started = time.monotonic()
+        raster_futures: Dict = {}
+        io_futures: Dict = {}
+
+        def progress(rel_path: str, outcome: str) -> None:
+            done = self.finished + self.failed
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0.0
+            eta = _format_eta((total - done) / rate) if rate else "?"
+            print(f"[{done}/{total}] {rate:.2f} CV/s  ETA {eta}  {outcome:<8} {rel_path}", flush=True)
+
+        with ProcessPoolExecutor(max_workers=self.args.workers) as raster_pool, \
+                ThreadPoolExecutor(max_workers=self.args.concurrency) as io_pool:
+
+            def fill() -> None:
+                # Bound in-flight work so rendered pages never pile up in memory
+                while (len(raster_futures) < self.args.workers * 2
+                       and len(io_futures) < self.args.concurrency * 2):
+                    rel_path = next(queue, None)
+                    if rel_path is None:
+                        return
+                    if self._known(rel_path):
+                        # prepare_cv reuses the stored analysis: nothing to render
+                        io_futures[io_pool.submit(self.analyze, rel_path, None)] = rel_path
+                        continue
+                    future = raster_pool.submit(rasterize, os.path.join(self.root, rel_path))
+                    raster_futures[future] = rel_path
+
+            fill()
+            while raster_futures or io_futures:
+                done, _ = wait(set(raster_futures) | set(io_futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in raster_futures:
+                        rel_path = raster_futures.pop(future)
+                        try:
+                            page_images, skipped = future.result()
+                        except Exception as exc:
+                            self._fail(rel_path, exc)
+                            progress(rel_path, "failed")
+                            continue
+                        record_skipped(skipped)
+                        io_futures[io_pool.submit(self.analyze, rel_path, page_images)] = rel_path
+                    else:
+                        rel_path = io_futures.pop(future)
+                        try:
+                            prepared, result, usage = future.result()
+                        except Exception as exc:
+                            self._fail(rel_path, exc)
+                            progress(rel_path, "failed")
+                            continue
+                        self.batch.append((rel_path, prepared, result, usage))
+                        if len(self.batch) >= self.args.batch_size:
+                            self.flush()
+                        progress(rel_path, result["status"])
+                fill()
+            self.flush()
+
+        elapsed = time.monotonic() - started
+        print(
+            f"Done: {self.finished} ingested, {self.failed} failed in {_format_eta(elapsed)}"
+            f" ({self.finished / elapsed if elapsed else 0:.2f} CV/s)",
+            flush=True,
+        )
+
+    def flush(self) -> None:
+        """Save the pending batch and its API usage in one transaction, then checkpoint it."""
+        if not self.batch:
+            return
+        from backend.models.usage import insert_usage
+
+        def save_usage(cursor, analysis_ids: List[int]) -> None:
+            new_ids = iter(analysis_ids)
+            for _, _, result, usage in self.batch:
+                analysis_id = result["analysis_id"] if result["analysis_id"] is not None else next(new_ids)
+                insert_usage(cursor, usage, self.job["id"], analysis_id)
+
+        new = [result for _, _, result, _ in self.batch if result["analysis_id"] is None]
+        analysis_ids = self.processor.save_analyses(
+            [(prepared, self.job["id"], self.job["description"], result)
+             for _, prepared, result, _ in self.batch if result["analysis_id"] is None],
+            after_insert=save_usage,
+        )
+        for result, analysis_id in zip(new, analysis_ids):
+            result["analysis_id"] = analysis_id
+
+        self.checkpoint.record(
+            {
+                "path": rel_path,
+                "analysis_id": result["analysis_id"],
+                "status": result["status"],
+                "total_score": result["total_score"],
+            }
+            for rel_path, _, result, _ in self.batch
+        )
+        self.finished += len(self.batch)
+        self.batch = []
+
+    def _known(self, rel_path: str) -> bool:
+        """Whether the very same file was analyzed before (checked by hash, before rendering)."""
+        from backend.services.dedup_service import DedupService
+
+        if not self.processor.dedup:
+            return False
+        try:
+            file_hash = DedupService.file_hash(os.path.join(self.root, rel_path))
+        except OSError:
+            return False  # Reported by rasterize
+        return self.processor.dedup.find_exact(file_hash) is not None
+
+    def _fail(self, rel_path: str, exc: Exception) -> None:
+        logger.error("Failed to ingest %s: %s", rel_path, exc)
+        self.checkpoint.record([{"path": rel_path, "error": str(exc)}])
+        self.failed += 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory of PDF CVs for a job.")
+    parser.add_argument("directory", help="Directory searched recursively for PDF files")
+    parser.add_argument("--job-id", type=int, required=True, help="Job to score the CVs against")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="Rasterizing processes")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY, help="Files in OCR/LLM calls at once")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="Analyses per transaction")
+    parser.add_argument("--ocr-rate", type=float, default=INGEST_OCR_RATE, help="Vision calls per second (0 = unlimited)")
+    parser.add_argument("--llm-rate", type=float, default=INGEST_LLM_RATE, help="Gemini calls per second (0 = unlimited)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: .ingest_job<ID>.jsonl in the directory)")
+    args = parser.parse_args()
+
+    ensure_dirs()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+        handlers=[logging.FileHandler(LOG_FILE)],
+    )
+
+    from backend.models.database import get_job_by_id, init_db
+
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+    init_db()
+    job = get_job_by_id(args.job_id)
+    if not job:
+        print(f"Job {args.job_id} not found", file=sys.stderr)
+        return 2
+
+    checkpoint = Checkpoint(args.checkpoint or os.path.join(args.directory, f".ingest_job{args.job_id}.jsonl"))
+    all_pdfs = find_pdfs(args.directory)
+    pending = [path for path in all_pdfs if path not in checkpoint.done]
+    print(
+        f"Job {job['id']} ({job['title']}): {len(all_pdfs)} PDFs, "
+        f"{len(all_pdfs) - len(pending)} already done, {len(pending)} to ingest",
+        flush=True,
+    )
+    if not pending:
+        return 0
+
+    from backend.models.writer import shutdown_writer
+
+    ingestor = Ingestor(args.directory, job, checkpoint, args)
+    try:
+        ingestor.run(pending)
+    except KeyboardInterrupt:
+        ingestor.flush()
+        print("Interrupted; re-run the same command to resume.", file=sys.stderr)
+        return 130
+    finally:
+        shutdown_writer()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Usage metering for billed API calls (Gemini tokens, Vision pages).
+
+Call sites report usage with record(); it is added to process-wide
+counters and, inside a metering() block, collected for that unit of
+work. Callers persist the collected records against the analysis and
+job they belong to. The meter lives in a context variable, so executor
+threads started through scheduler.bind() report into the same meter.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional
+
+import metrics
+from scheduler import current_workload
+
+
+class UsageRecord(NamedTuple):
+    service: str  # 'gemini', 'vision' or 'tesseract'
+    operation: str  # e.g. 'parse', 'score:Skills', 'ocr_page'
+    model: Optional[str]
+    job_id: Optional[int]  # Job whose work made the call, if known at call time
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    units: int  # Billed units other than tokens (Vision: one per page image)
+
+
+class UsageMeter:
+    """Thread-safe collection of the usage records of one unit of work."""
+
+    def __init__(self):
+        self._records: List[UsageRecord] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: UsageRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> List[UsageRecord]:
+        with self._lock:
+            return list(self._records)
+
+
+_meter: contextvars.ContextVar = contextvars.ContextVar("usage_meter", default=None)
+_operation: contextvars.ContextVar = contextvars.ContextVar("usage_operation", default="other")
+
+
+@contextmanager
+def metering() -> Iterator[UsageMeter]:
+    """Collect the usage recorded by the enclosed calls into a new meter."""
+    meter = UsageMeter()
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+@contextmanager
+def operation(name: str) -> Iterator[None]:
+    """Label the usage recorded by the enclosed calls (e.g. 'parse')."""
+    token = _operation.set(name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+def record(
+    service: str,
+    operation_name: Optional[str] = None,
+    model: Optional[str] = None,
+    calls: int = 1,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    units: int = 0,
+) -> None:
+    """Report the usage of one API call, labelled by operation() unless operation_name is given."""
+    metrics.increment(f"usage_{service}_calls", calls)
+    if input_tokens or output_tokens:
+        metrics.increment(f"usage_{service}_input_tokens", input_tokens)
+        metrics.increment(f"usage_{service}_output_tokens", output_tokens)
+    if units:
+        metrics.increment(f"usage_{service}_units", units)
+    meter = _meter.get()
+    if meter is not None:
+        meter.add(UsageRecord(
+            service,
+            operation_name or _operation.get(),
+            model,
+            current_workload().job_id,
+            calls,
+            input_tokens,
+            output_tokens,
+            units,
+        ))
+
+
+class MeteredModel:
+    """Wrap a Gemini model so every generate_content call reports its token usage."""
+
+    def __init__(self, model, model_name: str):
+        self._model = model
+        self._model_name = model_name
+
+    def generate_content(self, *args, **kwargs):
+        try:
+            response = self._model.generate_content(*args, **kwargs)
+        except Exception:
+            record("gemini", model=self._model_name)
+            raise
+        usage = getattr(response, "usage_metadata", None)
+        record(
+            "gemini",
+            model=self._model_name,
+            input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        )
+        return response
@@ -0,0 +1,40 @@
+"""In-process counters and latency percentiles for operational metrics."""
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+
+# Recent observations per name; percentiles cover the last _WINDOW values
+_WINDOW = 1000
+_observations: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=_WINDOW))
+
+
+def increment(name: str, value: float = 1) -> None:
+    """Add to a named counter."""
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float) -> None:
+    """Record one observation (e.g. a wait time in seconds) for percentile reporting."""
+    with _lock:
+        _observations[name].append(value)
+        _counters[f"{name}_count"] += 1
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def snapshot() -> Dict[str, float]:
+    """Current value of every counter, plus p50/p95/max of recent observations."""
+    with _lock:
+        values = dict(_counters)
+        observed = {name: sorted(window) for name, window in _observations.items() if window}
+    for name, ordered in observed.items():
+        values[f"{name}_p50"] = _percentile(ordered, 0.5)
+        values[f"{name}_p95"] = _percentile(ordered, 0.95)
+        values[f"{name}_max"] = ordered[-1]
+    return values
@@ -1,12 +1,33 @@
 """OCR functions for extracting text from PDF files."""
 import base64
 import logging
+import multiprocessing
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-from typing import List
+from typing import Container, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 import fitz  # PyMuPDF
 import requests
-from PIL import Image, ImageOps
+from PIL import Image
+
+from config import (
+    OCR_BACKEND,
+    OCR_BLANK_INK_RATIO,
+    OCR_GRAPHIC_MIDTONE_RATIO,
+    OCR_LOCAL_MIN_CONFIDENCE,
+    OCR_MIN_TEXT_CHARS,
+    OCR_PRESCREEN_DPI,
+    OCR_SKIP_LOW_CONTENT_PAGES,
+    OCR_SPARSE_INK_RATIO,
+    OCR_TESSERACT_LANG,
+    OCR_TESSERACT_WORKERS,
+)
+import metering
+import metrics
+from scheduler import ocr_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +41,8 @@ def encode_image_to_base64(image: Image.Image, max_dim: int = 2000, quality: int
     return base64.b64encode(buffered.getvalue()).decode("utf-8")
 
 
-def ocr_image_base64(img_b64: str, api_key: str) -> str:
-    """OCR a base64-encoded image using Google Vision API."""
+def vision_annotate(img_b64: str, api_key: str) -> Dict:
+    """Run Google Vision document text detection on a base64-encoded image."""
     url = f"https://vision.googleapis.com/v1/images:annotate?key={api_key}"
     payload = {
         "requests": [
@@ -31,28 +52,372 @@ def ocr_image_base64(img_b64: str, api_key: str) -> str:
     resp = requests.post(url, json=payload, timeout=30)
     resp.raise_for_status()
     data = resp.json()
-    return data["responses"][0].get("fullTextAnnotation", {}).get("text", "") or ""
+    return data["responses"][0].get("fullTextAnnotation", {}) or {}
 
 
-def ocr_pdf(file_bytes: bytes, api_key: str) -> str:
-    """OCR PDF to text using Google Vision API."""
-    try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-    except Exception as exc:
-        logger.error("Could not open PDF for OCR: %s", exc)
-        return ""
+def ocr_image_base64(img_b64: str, api_key: str) -> str:
+    """OCR a base64-encoded image using Google Vision API."""
+    return vision_annotate(img_b64, api_key).get("text", "") or ""
+
+
+class OCRResult(NamedTuple):
+    """Text read from one page, with the engine's mean confidence (0-1) if it reports one."""
+    text: str
+    confidence: Optional[float]
+    backend: str
+
+
+class OCRBackend(ABC):
+    """An engine that reads the text of one page image."""
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the engine can be used in this environment."""
+        return True
+
+    @abstractmethod
+    def recognize(self, img_b64: str) -> OCRResult:
+        """Read a base64-encoded JPEG page image."""
+
+
+class VisionBackend(OCRBackend):
+    """Google Vision API; one HTTPS request per page."""
+
+    name = "vision"
+
+    def __init__(self, api_key: Optional[str], limiter=None):
+        self.api_key = api_key
+        self.limiter = limiter  # Optional RateLimiter acquired before each call
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def recognize(self, img_b64: str) -> OCRResult:
+        with ocr_scheduler.slot():
+            if self.limiter:
+                self.limiter.acquire()
+            annotation = vision_annotate(img_b64, self.api_key)
+        metering.record(self.name, "ocr_page", units=1)
+        confidences = [page["confidence"] for page in annotation.get("pages", []) if "confidence" in page]
+        confidence = sum(confidences) / len(confidences) if confidences else None
+        return OCRResult(annotation.get("text", "") or "", confidence, self.name)
+
+
+def _tesseract_recognize(img_b64: str, lang: str) -> Tuple[str, Optional[float]]:
+    """Run Tesseract on one page image (in a worker process); returns text and mean word confidence."""
+    import pytesseract
+
+    image = Image.open(BytesIO(base64.b64decode(img_b64)))
+    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+    lines: Dict[tuple, List[str]] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        confidence = float(data["conf"][i])
+        if not word.strip() or confidence < 0:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        confidences.append(confidence / 100)
+    text = "\n".join(" ".join(words) for words in lines.values())
+    return text, (sum(confidences) / len(confidences) if confidences else None)
+
+
+class TesseractBackend(OCRBackend):
+    """
+    Local Tesseract OCR (needs pytesseract and the tesseract binary).
+
+    Recognition is CPU-bound, so pages run in a process pool shared by
+    all callers in this process instead of on the calling thread. Workers
+    are spawned, not forked, since the server process is multithreaded.
+    """
+
+    name = "tesseract"
+
+    def __init__(self, lang: str = OCR_TESSERACT_LANG, workers: int = OCR_TESSERACT_WORKERS):
+        self.lang = lang
+        self.workers = workers
+        self._available: Optional[bool] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        if self._available is None:
+            try:
+                import pytesseract
+            except ImportError:
+                self._available = False
+            else:
+                self._available = shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+        return self._available
+
+    def recognize(self, img_b64: str) -> OCRResult:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        text, confidence = self._pool.submit(_tesseract_recognize, img_b64, self.lang).result()
+        metering.record(self.name, "ocr_page", units=1)  # Not billed; counted for comparison with Vision
+        return OCRResult(text, confidence, self.name)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later recognize() starts a new pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_tesseract = TesseractBackend()
+
 
-    markdown_parts: List[str] = []
+def shutdown_ocr_pool() -> None:
+    """Stop the Tesseract worker processes (called on app shutdown)."""
+    _tesseract.shutdown()
+
+# OCR backend policies; each lists the engines tried in order
+OCR_POLICIES = {
+    "vision": ("vision",),
+    "tesseract": ("tesseract",),
+    "local-first": ("tesseract", "vision"),
+}
+
+
+class PageRouter:
+    """
+    Choose the OCR engine for each page according to a policy.
+
+    Under 'local-first' a page is read by Tesseract and sent to Vision
+    only when Tesseract's mean word confidence is below min_confidence
+    (or it read nothing); if Vision is unavailable or fails, the local
+    text is kept. A page Tesseract fails on goes to Vision as well.
+    Engines that are not available are skipped.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        policy: str = OCR_BACKEND,
+        vision_limiter=None,
+        min_confidence: float = OCR_LOCAL_MIN_CONFIDENCE,
+    ):
+        if policy not in OCR_POLICIES:
+            raise ValueError(f"Unknown OCR backend policy: {policy}")
+        backends = {"vision": VisionBackend(api_key, vision_limiter), "tesseract": _tesseract}
+        self.backends = [backends[name] for name in OCR_POLICIES[policy] if backends[name].available()]
+        self.min_confidence = min_confidence
+
+    def available(self) -> bool:
+        """Whether any engine of the policy can be used."""
+        return bool(self.backends)
+
+    def recognize(self, img_b64: str) -> OCRResult:
+        if not self.backends:
+            raise ValueError("No OCR backend is available")
+        result: Optional[OCRResult] = None
+        for position, backend in enumerate(self.backends):
+            if result is not None:
+                if result.text.strip() and (result.confidence is None or result.confidence >= self.min_confidence):
+                    break
+            if position:
+                metrics.increment(f"ocr_fallbacks_{backend.name}")
+            try:
+                result = backend.recognize(img_b64)
+            except Exception as exc:
+                metrics.increment(f"ocr_errors_{backend.name}")
+                if position == len(self.backends) - 1 and result is None:
+                    raise
+                if result is not None:
+                    logger.warning("%s OCR fallback failed, keeping %s text: %s", backend.name, result.backend, exc)
+                    break
+                logger.warning("%s OCR failed, trying the next engine: %s", backend.name, exc)
+        metrics.increment(f"ocr_pages_{result.backend}")
+        return result
+
+
+def ocr_available(api_key: Optional[str], policy: str = OCR_BACKEND) -> bool:
+    """Whether the configured OCR policy has a usable engine."""
+    return PageRouter(api_key, policy).available()
+
+
+def open_pdf(source: Union[bytes, str]) -> fitz.Document:
+    """Open a PDF from bytes or from a file path (read lazily from disk)."""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source, filetype="pdf")
+
+
+def count_pdf_pages(source: Union[bytes, str]) -> int:
+    """Number of pages in a PDF."""
+    with open_pdf(source) as doc:
+        return len(doc)
+
+
+def render_page(page: fitz.Page, dpi: int = 300, max_dim: int = 2000) -> Image.Image:
+    """
+    Render a page to an RGB image no larger than max_dim.
+    
+    Rendering straight at the target size avoids holding a full 300 DPI
+    bitmap (and a PNG copy of it) only to downscale it afterwards.
+    """
+    zoom = min(dpi / 72, max_dim / max(page.rect.width, page.rect.height))
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def page_stats(page: fitz.Page) -> Dict[str, float]:
+    """
+    Cheap content statistics for a page from a low-resolution grayscale render.
+    
+    Returns the share of non-white pixels ('ink'), the share of mid-tone
+    pixels ('midtone'), the grayscale standard deviation, and the length
+    of the page's own text layer and its number of image objects.
+    """
+    zoom = OCR_PRESCREEN_DPI / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    hist = Image.frombytes("L", (pix.width, pix.height), pix.samples).histogram()
+    n = float(sum(hist)) or 1.0
+    mean = sum(i * c for i, c in enumerate(hist)) / n
+    variance = sum(c * (i - mean) ** 2 for i, c in enumerate(hist)) / n
+    return {
+        "ink": sum(hist[:230]) / n,
+        "midtone": sum(hist[40:200]) / n,
+        "stddev": variance ** 0.5,
+        "text_chars": len(page.get_text("text").strip()),
+        "images": len(page.get_images(full=False)),
+    }
+
+
+def classify_page(page: fitz.Page) -> str:
+    """
+    Decide whether a page is worth sending to OCR.
+    
+    Returns:
+        'text' to OCR the page, 'blank' for an empty page, or 'graphic'
+        for a page holding only a picture (portrait, logo, decoration)
+    """
+    stats = page_stats(page)
+    if stats["text_chars"] >= OCR_MIN_TEXT_CHARS:
+        return "text"
+    if stats["ink"] < OCR_BLANK_INK_RATIO:
+        return "blank"
+    if stats["text_chars"] == 0 and stats["images"]:
+        # Scanned CV pages are image-only too, so only skip pictures that are
+        # either tiny (a logo) or photographic (mostly mid-tones, not ink on paper)
+        if stats["ink"] < OCR_SPARSE_INK_RATIO or stats["midtone"] > OCR_GRAPHIC_MIDTONE_RATIO:
+            return "graphic"
+    return "text"
+
+
+def iter_page_images(
+    doc: fitz.Document,
+    skip: Container[int] = (),
+    skipped: Optional[Dict[str, int]] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page index, base64 JPEG) for each page worth OCRing.
+    
+    Blank and picture-only pages are skipped and counted in metrics, or
+    in skipped (by kind) if given, e.g. in a worker process whose
+    metrics would be lost. The page indexes in skip are not rendered.
+    """
     for idx in range(len(doc)):
+        if idx in skip:
+            continue
         page = doc.load_page(idx)
-        pix = page.get_pixmap(matrix=fitz.Matrix(300 / 72, 300 / 72), alpha=False)
-        image = Image.open(BytesIO(pix.tobytes("png"))).convert("RGB")
-        image = ImageOps.exif_transpose(image)
+        if OCR_SKIP_LOW_CONTENT_PAGES:
+            kind = classify_page(page)
+            if kind != "text":
+                logger.info("Skipping OCR for %s page %s", kind, idx)
+                if skipped is None:
+                    metrics.increment(f"ocr_pages_skipped_{kind}")
+                else:
+                    skipped[kind] = skipped.get(kind, 0) + 1
+                continue
+        yield idx, encode_image_to_base64(render_page(page))
+
+
+def ocr_page_images(
+    page_images: Iterable[Tuple[int, str]],
+    api_key: Optional[str],
+    vision_limiter=None,
+) -> str:
+    """
+    OCR encoded page images one by one and join their text.
+    
+    Each page goes to the engine chosen by the OCR_BACKEND policy;
+    vision_limiter, if given, is acquired before every Vision API call.
+    Raises RuntimeError at the first page that cannot be read, so partial
+    text is never parsed as if it were the whole CV.
+    """
+    return join_pages(recognize_pages(page_images, api_key, vision_limiter))
+
+
+def join_pages(results: Iterable[Tuple[int, Optional[str], Optional[Exception]]]) -> str:
+    """Join the text of recognize_pages() results, raising on the first failed page."""
+    texts = []
+    for idx, text, error in results:
+        if error is not None:
+            raise RuntimeError(f"OCR failed for page {idx + 1}: {error}") from error
+        texts.append(text)
+    return "\n".join(texts)
+
 
-        img_b64 = encode_image_to_base64(image)
+def recognize_pages(
+    page_images: Iterable[Tuple[int, str]],
+    api_key: Optional[str],
+    vision_limiter=None,
+) -> Iterator[Tuple[int, Optional[str], Optional[Exception]]]:
+    """
+    OCR encoded page images one by one, yielding (page index, text, error).
+    
+    A page that fails yields its exception instead of text, and the
+    remaining pages are still read.
+    """
+    router = PageRouter(api_key, vision_limiter=vision_limiter)
+    for idx, img_b64 in page_images:
+        metrics.increment("ocr_pages_sent")
         try:
-            text = ocr_image_base64(img_b64, api_key)
-            markdown_parts.append(text)
+            text, error = router.recognize(img_b64).text, None
         except Exception as exc:
             logger.warning("OCR error for page %s: %s", idx, exc)
-    return "\n".join(markdown_parts)
+            text, error = None, exc
+        yield idx, text, error
+
+
+def ocr_pdf(source: Union[bytes, str], api_key: Optional[str]) -> str:
+    """
+    OCR PDF to text with the configured backend (Google Vision API by default).
+    
+    Pages are rendered, encoded and sent one at a time, and each page's
+    buffers are released before the next, so peak memory does not grow
+    with page count. Pass a file path to avoid loading the PDF into memory.
+    Blank and picture-only pages are skipped without an API call. Raises
+    RuntimeError if a page cannot be read (see ocr_page_images).
+    """
+    try:
+        doc = open_pdf(source)
+    except Exception as exc:
+        logger.error("Could not open PDF for OCR: %s", exc)
+        return ""
+
+    with doc:
+        return join_pages(recognize_pages(iter_page_images(doc), api_key))
+
+
+def ocr_pdf_pages(
+    source: Union[bytes, str],
+    api_key: Optional[str],
+    skip: Container[int] = (),
+) -> Iterator[Tuple[int, Optional[str], Optional[Exception]]]:
+    """
+    OCR PDF pages one by one, yielding (page index, text, error) per page.
+    
+    Unlike ocr_pdf, which stops at the first failed page, every page is
+    tried and failures are reported per page. The pages in skip (e.g.
+    already read by an earlier attempt) are not rendered or sent. Raises
+    if the PDF cannot be opened.
+    """
+    with open_pdf(source) as doc:
+        yield from recognize_pages(iter_page_images(doc, skip), api_key)
@@ -1,19 +1,56 @@
-"""Application entry point."""
+"""Application entry point.
+
+Usage:
+    python run.py                 # Development: one process, auto-reload
+    python run.py --production    # Several workers, no reloader
+"""
 import sys
 import os
 
 # Add project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import argparse
+
 import uvicorn
-from backend.app import create_app
 
-if __name__ == '__main__':
-    app = create_app()
+from config import DB_READY_ENV, SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Smart CV server.")
+    parser.add_argument("--production", action="store_true", help="Run several workers without the reloader")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Worker processes in production mode")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)  # 8000 avoids macOS ControlCenter on 5000
+    args = parser.parse_args()
+    
+    if not args.production:
+        uvicorn.run(
+            "backend.app:create_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            reload=True  # Auto-reload on code changes
+        )
+        return
+    
+    # Create and migrate the schema once here, not concurrently in every worker
+    from backend.models.database import init_db
+    from utils import ensure_dirs
+    
+    ensure_dirs()
+    init_db()
+    os.environ[DB_READY_ENV] = "1"
     uvicorn.run(
         "backend.app:create_app",
         factory=True,
-        host='0.0.0.0',
-        port=8000,  # Changed from 5000 to avoid conflict with macOS ControlCenter
-        reload=True  # Auto-reload on code changes
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=False,
     )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Fair scheduling of OCR and LLM calls across priority classes and jobs.
+
+Each Vision and Gemini call takes a slot from a FairScheduler, which
+allows a fixed number of concurrent calls. Waiting calls are served
+interactive class first, then bulk. Within a class they are served by
+fair queuing over job ids, so one job's backlog cannot hold up the
+others. A call's class and job come from the current workload context.
+That context is set where work enters, in routes and ingest, and
+executor threads inherit it through bind().
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import LLM_MAX_CONCURRENCY, OCR_MAX_CONCURRENCY
+import metrics
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITY_CLASSES = (INTERACTIVE, BULK)  # Highest priority first
+
+
+class Workload(NamedTuple):
+    priority: str
+    job_id: Optional[int]
+
+
+_workload: contextvars.ContextVar = contextvars.ContextVar("workload", default=Workload(INTERACTIVE, None))
+
+
+@contextmanager
+def workload(priority: Optional[str] = None, job_id: Optional[int] = None) -> Iterator[None]:
+    """Run the enclosed calls under a priority class and/or job id (others are inherited)."""
+    current = _workload.get()
+    token = _workload.set(Workload(
+        priority or current.priority,
+        job_id if job_id is not None else current.job_id,
+    ))
+    try:
+        yield
+    finally:
+        _workload.reset(token)
+
+
+def current_workload() -> Workload:
+    """Priority class and job id of the calling code."""
+    return _workload.get()
+
+
+def bind(fn: Callable, job_id: Optional[int] = None) -> Callable:
+    """
+    Wrap fn to run in a copy of the current workload context, optionally for another job.
+
+    Executor threads do not inherit context variables; submit bind(fn)
+    instead of fn, with one bind() call per submitted task.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        def call():
+            with workload(job_id=job_id):
+                return fn(*args, **kwargs)
+        return context.run(call)
+
+    return run
+
+
+class FairScheduler:
+    """
+    Limit concurrent calls, serving waiters by priority class, then fairly across jobs.
+
+    Within a class, each call gets a virtual finish time one unit after the
+    later of the class's virtual time and its job's previous finish time.
+    Calls are started in finish-time order (start-time fair queuing with
+    equal job weights), so jobs take turns however many calls each queues.
+    Queue waits are recorded per class in the '<name>_wait_<class>' metric.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = max(capacity, 1)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queues: Dict[str, List[Tuple[float, int, float]]] = {p: [] for p in PRIORITY_CLASSES}
+        self._virtual_time = {p: 0.0 for p in PRIORITY_CLASSES}
+        self._last_finish: Dict[Tuple[str, Optional[int]], float] = {}
+        self._seq = itertools.count()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait for a slot for the current workload and hold it while the block runs."""
+        priority, job_id = _workload.get()
+        started = time.monotonic()
+        with self._cond:
+            flow = (priority, job_id)
+            start = max(self._virtual_time[priority], self._last_finish.get(flow, 0.0))
+            entry = (start + 1.0, next(self._seq), start)
+            self._last_finish[flow] = entry[0]
+            queue = self._queues[priority]
+            heapq.heappush(queue, entry)
+            while self._active >= self.capacity or self._head() is not entry:
+                self._cond.wait()
+            heapq.heappop(queue)
+            self._virtual_time[priority] = max(self._virtual_time[priority], start)
+            self._active += 1
+            self._forget_idle_jobs(priority)
+            # Another waiter may now be at the head with a slot still free
+            self._cond.notify_all()
+        metrics.observe(f"{self.name}_wait_{priority}", time.monotonic() - started)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def call(self, fn: Callable, *args) -> Any:
+        """Call fn(*args) once a slot is granted."""
+        with self.slot():
+            return fn(*args)
+
+    def _head(self) -> Optional[Tuple[float, int, float]]:
+        for priority in PRIORITY_CLASSES:
+            if self._queues[priority]:
+                return self._queues[priority][0]
+        return None
+
+    def _forget_idle_jobs(self, priority: str) -> None:
+        """Drop finish times that can no longer delay a job (keeps the table small)."""
+        if len(self._last_finish) > 1000:
+            now = self._virtual_time[priority]
+            for flow in [f for f, finish in self._last_finish.items() if f[0] == priority and finish <= now]:
+                del self._last_finish[flow]
+
+
+# Shared by every caller in this process: Gemini calls and Google Vision page requests
+llm_scheduler = FairScheduler("llm", LLM_MAX_CONCURRENCY)
+ocr_scheduler = FairScheduler("ocr", OCR_MAX_CONCURRENCY)
@@ -0,0 +1,68 @@
+"""Shared fixtures: every test gets its own database in a temporary directory."""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import types
+
+import pytest
+
+from backend.models import versions
+from backend.models.database import init_db
+from backend.models.writer import shutdown_writer
+from backend.services import prescreen_service
+from backend.services.ranking_service import RankingService
+
+
+def _reset_process_state() -> None:
+    """Forget per-process caches that point at the previous test's database."""
+    shutdown_writer()
+    with versions._cache_lock:
+        versions._cache.clear()
+        versions._pending.clear()
+    versions._epoch = None
+    prescreen_service._index = None
+    RankingService._cache.clear()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """An empty working directory, so the relative DB_PATH points at a new database."""
+    monkeypatch.chdir(tmp_path)
+    _reset_process_state()
+    yield tmp_path
+    _reset_process_state()
+
+
+@pytest.fixture
+def db(workdir):
+    """An initialized, empty database."""
+    init_db()
+    return workdir
+
+
+@pytest.fixture
+def processor(db, monkeypatch):
+    """
+    A CVProcessor whose OCR and LLM steps are replaced by the test.
+
+    The Gemini SDK is stubbed, so any LLM call a test did not replace fails.
+    """
+    from backend.services import cv_processor
+
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = lambda name: None
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    monkeypatch.setattr(cv_processor, "GOOGLE_GENAI_API_KEY", "test-key")
+    return cv_processor.CVProcessor()
+
+
+@pytest.fixture
+def client(db):
+    """API client; the app's startup and shutdown handlers run around the test."""
+    from fastapi.testclient import TestClient
+    from backend.app import create_app
+
+    with TestClient(create_app()) as test_client:
+        yield test_client
@@ -0,0 +1,115 @@
+"""ETag / If-None-Match on polled endpoints and the data version cache behind them."""
+import time
+
+import pytest
+
+from backend.models import versions
+from backend.models.database import create_job, get_db_connection
+from backend.models.versions import bump_job_version, get_jobs_version, get_ranking_version
+from backend.models.writer import get_writer
+
+
+def test_unchanged_job_list_is_not_modified(client):
+    first = client.get("/api/jobs")
+    etag = first.headers["etag"]
+
+    second = client.get("/api/jobs", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert client.get("/api/jobs", headers={"If-None-Match": f'W/"other", {etag}'}).status_code == 304
+    assert client.get("/api/jobs", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_write_changes_the_etag(client):
+    etag = client.get("/api/jobs").headers["etag"]
+    client.post("/api/jobs", json={"title": "Backend", "description": "Python developer"})
+
+    response = client.get("/api/jobs", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [job["title"] for job in response.json()["data"]] == ["Backend"]
+
+
+def test_ranking_etag_is_per_job(client):
+    job_a = create_job("A", "Python developer")
+    job_b = create_job("B", "Java developer")
+    etag_a = client.get("/api/cvs/ranking", params={"job_id": job_a}).headers["etag"]
+    etag_b = client.get("/api/cvs/ranking", params={"job_id": job_b}).headers["etag"]
+    etag_all = client.get("/api/cvs/ranking").headers["etag"]
+
+    bump_job_version(job_a)
+    assert client.get("/api/cvs/ranking", params={"job_id": job_a}).headers["etag"] != etag_a
+    assert client.get("/api/cvs/ranking", params={"job_id": job_b}).headers["etag"] == etag_b
+    assert client.get("/api/cvs/ranking").headers["etag"] != etag_all
+
+
+@pytest.fixture
+def db_reads(db, monkeypatch):
+    """Count the connections versions.py opens to read data_versions."""
+    reads = []
+    connect = versions.get_db_connection
+
+    def counting_connection():
+        reads.append(1)
+        return connect()
+
+    monkeypatch.setattr(versions, "get_db_connection", counting_connection)
+    return reads
+
+
+def test_versions_are_served_from_memory(db_reads):
+    get_jobs_version()
+    get_jobs_version()
+    get_jobs_version()
+    assert len(db_reads) == 1
+
+
+def test_local_writes_invalidate_the_cache(db):
+    before = get_jobs_version()
+    create_job("Backend", "Python developer")
+    assert get_jobs_version() == before + 1
+
+
+def test_other_workers_writes_are_seen_after_the_ttl(db, monkeypatch):
+    monkeypatch.setattr(versions, "VERSION_CACHE_TTL", 0.05)
+    before = get_jobs_version()
+    # Written by another process, which cannot invalidate this one's cache
+    with get_db_connection() as conn:
+        conn.execute("""
+            INSERT INTO data_versions (scope, version) VALUES ('jobs', 1)
+            ON CONFLICT(scope) DO UPDATE SET version = version + 1
+        """)
+        conn.commit()
+    assert get_jobs_version() == before
+    time.sleep(0.06)
+    assert get_jobs_version() == before + 1
+
+
+def test_uncommitted_bump_is_never_cached(db):
+    job_id = create_job("Backend", "Python developer")
+    before = get_ranking_version(job_id)
+    seen = []
+
+    def write(cursor):
+        bump_job_version(job_id, cursor=cursor)
+        # Read through another connection while the bump is not committed yet
+        seen.append(get_ranking_version(job_id))
+
+    get_writer().submit(write).result()
+    assert seen == [before]
+    assert get_ranking_version(job_id) == before + 1
+
+
+def test_rolled_back_bump_keeps_the_version(db):
+    job_id = create_job("Backend", "Python developer")
+    before = get_ranking_version(job_id)
+
+    def failing_write(cursor):
+        bump_job_version(job_id, cursor=cursor)
+        raise ValueError("write failed")
+
+    with pytest.raises(ValueError):
+        get_writer().submit(failing_write).result()
+    assert get_ranking_version(job_id) == before
+    assert not versions._pending
@@ -0,0 +1,146 @@
+"""Duplicate and near-duplicate CV detection (file hash, MinHash/LSH, contacts)."""
+import random
+
+import pytest
+
+from config import SCORING_CATEGORIES
+from backend.models.database import create_job, get_db_connection, get_job_by_id
+from backend.services.dedup_service import DedupService
+
+_WORDS = ["python", "django", "kubernetes", "team", "lead", "built", "api", "data", "cloud", "design",
+          "migrated", "services", "tested", "release", "mentored", "engineers", "scaled", "platform"]
+
+
+def _cv_text(email: str, seed: int, words: int = 200) -> str:
+    rng = random.Random(seed)
+    body = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return f"Ada Lovelace {email} {body}"
+
+
+class Pipeline:
+    """Runs prepare/evaluate/save like an upload, counting the OCR, parse and scoring calls."""
+
+    def __init__(self, processor, monkeypatch, tmp_path):
+        self.processor = processor
+        self.tmp_path = tmp_path
+        self.calls = {"ocr": 0, "parse": 0, "score": 0}
+        monkeypatch.setattr(processor, "extract_text", self._extract_text)
+        monkeypatch.setattr(processor, "parse_text", self._parse_text)
+        monkeypatch.setattr(processor, "score_info", self._score_info)
+
+    def upload(self, filename: str, text: str, job_id: int) -> dict:
+        path = self.tmp_path / filename
+        path.write_text(text, encoding="utf-8")
+        prepared = self.processor.prepare_cv(str(path))
+        result = self.processor.evaluate(prepared, get_job_by_id(job_id))
+        if result["analysis_id"] is None:
+            job = get_job_by_id(job_id)
+            result["analysis_id"] = self.processor.save_analyses(
+                [(prepared, job_id, job["description"], result)]
+            )[0]
+        return {"match": prepared["match"], **result}
+
+    def _extract_text(self, pdf_path, ocr_fn=None, file_hash=None):
+        self.calls["ocr"] += 1
+        with open(pdf_path, encoding="utf-8") as f:
+            return f.read()
+
+    def _parse_text(self, cv_text):
+        self.calls["parse"] += 1
+        words = cv_text.split()
+        return {"name": " ".join(words[:2]), "email": words[2], "skills": ["Python"]}
+
+    def _score_info(self, info, jd_text, scoring_mode=None, weights=None, run=None):
+        self.calls["score"] += 1
+        return {
+            "score_dict": {category: 50 for category in SCORING_CATEGORIES},
+            "reason_dict": {category: "" for category in SCORING_CATEGORIES},
+            "scored_by": {},
+            "total_score": 50.0,
+        }
+
+
+@pytest.fixture
+def pipeline(processor, monkeypatch, tmp_path):
+    return Pipeline(processor, monkeypatch, tmp_path)
+
+
+@pytest.fixture
+def job_id(db):
+    return create_job("Backend", "Python developer")
+
+
+def _duplicate_of(analysis_id: int):
+    with get_db_connection() as conn:
+        return conn.execute("SELECT duplicate_of FROM analyses WHERE id = ?", (analysis_id,)).fetchone()[0]
+
+
+def test_similarity_follows_text_overlap():
+    text = _cv_text("ada@example.com", seed=1)
+    edited = text.replace(text.split()[-1], "golang", 1)
+    signature = DedupService.minhash(text)
+    assert DedupService.similarity(signature, DedupService.minhash(text)) == 1.0
+    assert DedupService.similarity(signature, DedupService.minhash(edited)) >= 0.9
+    assert DedupService.similarity(signature, DedupService.minhash(_cv_text("x@y.org", seed=2))) < 0.3
+
+
+def test_contacts_are_normalized():
+    keys = DedupService.extract_contacts("Mail Ada@Example.com or call +44 (0)20 7946-0958")
+    assert keys == ["email:ada@example.com", "phone:079460958"]
+
+
+def test_signature_round_trips_through_storage():
+    signature = DedupService.minhash("senior python engineer")
+    assert DedupService.unpack_signature(DedupService.pack_signature(signature)) == signature
+
+
+def test_exact_copy_skips_ocr_and_parse(pipeline, job_id):
+    text = _cv_text("ada@example.com", seed=1)
+    first = pipeline.upload("a.pdf", text, job_id)
+    second = pipeline.upload("copy.pdf", text, create_job("Data", "Data engineer"))
+
+    assert second["match"]["kind"] == "exact"
+    assert pipeline.calls == {"ocr": 1, "parse": 1, "score": 2}
+    assert _duplicate_of(second["analysis_id"]) == first["analysis_id"]
+
+
+def test_same_candidate_for_same_job_reuses_stored_result(pipeline, job_id):
+    text = _cv_text("ada@example.com", seed=1)
+    first = pipeline.upload("a.pdf", text, job_id)
+    second = pipeline.upload("copy.pdf", text, job_id)
+
+    assert second["analysis_id"] == first["analysis_id"]
+    assert pipeline.calls["score"] == 1
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] == 1
+
+
+def test_near_duplicate_reuses_parse(pipeline, job_id):
+    text = _cv_text("ada@example.com", seed=1)
+    first = pipeline.upload("a.pdf", text, job_id)
+    second = pipeline.upload("edited.pdf", text + " golang", create_job("Data", "Data engineer"))
+
+    assert second["match"]["kind"] == "near"
+    assert second["match"]["confident"]
+    assert pipeline.calls["ocr"] == 2
+    assert pipeline.calls["parse"] == 1
+    assert _duplicate_of(second["analysis_id"]) == first["analysis_id"]
+
+
+def test_contact_match_is_linked_but_parsed_again(pipeline, job_id):
+    first = pipeline.upload("a.pdf", _cv_text("ada@example.com", seed=1), job_id)
+    second = pipeline.upload("rewritten.pdf", _cv_text("ada@example.com", seed=2), job_id)
+
+    assert second["match"]["kind"] == "contact"
+    assert not second["match"]["confident"]
+    assert pipeline.calls["parse"] == 2
+    assert second["analysis_id"] != first["analysis_id"]
+    assert _duplicate_of(second["analysis_id"]) == first["analysis_id"]
+
+
+def test_unrelated_cv_has_no_match(pipeline, job_id):
+    pipeline.upload("a.pdf", _cv_text("ada@example.com", seed=1), job_id)
+    other = pipeline.upload("b.pdf", _cv_text("grace@example.com", seed=2), job_id)
+
+    assert other["match"] is None
+    assert _duplicate_of(other["analysis_id"]) is None
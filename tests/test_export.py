@@ -0,0 +1,115 @@
+"""Streaming CSV, NDJSON and Parquet exports of the ranking."""
+import csv
+import io
+import json
+
+import pytest
+
+from config import SCORING_CATEGORIES
+from backend.models.database import create_job, decode_cv_data, encode_cv_data, get_db_connection
+from backend.services.export_service import COLUMNS, ExportService
+
+CHUNK_SIZE = 2
+
+
+@pytest.fixture
+def analyses(db, monkeypatch):
+    """Five scored analyses of one job and one of another; exports fetch CHUNK_SIZE rows at a time."""
+    iter_rows = ExportService.iter_rows
+    monkeypatch.setattr(
+        ExportService, "iter_rows", staticmethod(lambda job_id=None: iter_rows(job_id, chunk_size=CHUNK_SIZE))
+    )
+    backend = create_job("Backend", "Python developer")
+    other = create_job("Other", "Java developer")
+    with get_db_connection() as conn:
+        for i, (job_id, score) in enumerate([(backend, 72.5), (backend, 90.0), (backend, 40.0),
+                                             (backend, 65.0), (backend, 81.0), (other, 99.0)]):
+            payload = {
+                "info": {"name": f"Candidate {i}", "skills": ["Python", "SQL"], "education": "BSc, École polytechnique"},
+                "scores": {category: int(score) - n for n, category in enumerate(SCORING_CATEGORIES)},
+            }
+            conn.execute(
+                "INSERT INTO analyses (job_id, name, email, score, status, cv_data) VALUES (?, ?, ?, ?, 'scored', ?)",
+                (job_id, f"Candidate {i}", f"c{i}@example.com", score, encode_cv_data(payload)),
+            )
+        conn.commit()
+    return {"backend": backend, "other": other}
+
+
+def _stored(job_id: int) -> list:
+    """(id, score, per-category scores) of a job's analyses, best first."""
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            "SELECT id, score, cv_data FROM analyses WHERE job_id = ? ORDER BY score DESC, id DESC", (job_id,)
+        ).fetchall()
+    return [
+        (analysis_id, score, [decode_cv_data(cv_data)["scores"][c] for c in SCORING_CATEGORIES])
+        for analysis_id, score, cv_data in rows
+    ]
+
+
+def _exported(rows: list) -> list:
+    return [
+        (int(row["id"]), float(row["score"]), [int(row[f"score_{c.lower()}"]) for c in SCORING_CATEGORIES])
+        for row in rows
+    ]
+
+
+def test_csv_streams_chunk_by_chunk(analyses):
+    chunks = list(ExportService.stream("csv", analyses["backend"]))
+    assert len(chunks) == 3  # 5 rows, 2 per chunk; the header goes with the first
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert list(rows[0]) == COLUMNS
+    assert _exported(rows) == _stored(analyses["backend"])
+    assert json.loads(rows[0]["skills"]) == ["Python", "SQL"]
+    assert rows[0]["education"] == "BSc, École polytechnique"
+
+
+def test_ndjson_streams_chunk_by_chunk(analyses):
+    chunks = list(ExportService.stream("ndjson"))
+    assert len(chunks) == 3  # 6 rows of both jobs
+
+    lines = [json.loads(line) for chunk in chunks for line in chunk.decode("utf-8").splitlines()]
+    assert [len(chunk.decode("utf-8").splitlines()) for chunk in chunks] == [2, 2, 2]
+    assert lines[0]["job_title"] == "Other"
+    assert _exported(lines) == sorted(
+        _stored(analyses["backend"]) + _stored(analyses["other"]), key=lambda row: (-row[1], -row[0])
+    )
+
+
+def test_stream_is_lazy(analyses, monkeypatch):
+    fetched = []
+    iter_rows = ExportService.iter_rows
+
+    def counting_rows(job_id=None):
+        for rows in iter_rows(job_id):
+            fetched.append(len(rows))
+            yield rows
+
+    monkeypatch.setattr(ExportService, "iter_rows", staticmethod(counting_rows))
+    stream = ExportService.stream("ndjson", analyses["backend"])
+    next(stream)
+    assert fetched == [CHUNK_SIZE]
+
+
+def test_parquet_matches_the_stored_scores(analyses):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    table = pq.read_table(io.BytesIO(b"".join(ExportService.stream("parquet", analyses["backend"]))))
+    assert table.column_names == COLUMNS
+    assert _exported(table.to_pylist()) == _stored(analyses["backend"])
+    assert pq.ParquetFile(io.BytesIO(b"".join(ExportService.stream("parquet")))).num_row_groups == 3
+
+
+def test_unknown_format_is_rejected(analyses):
+    with pytest.raises(ValueError):
+        ExportService.stream("xlsx")
+
+
+def test_export_endpoint(client, analyses):
+    response = client.get("/api/cvs/export", params={"format": "csv", "job_id": analyses["other"]})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == f'attachment; filename="ranking_job_{analyses["other"]}.csv"'
+    assert [row["name"] for row in csv.DictReader(io.StringIO(response.text))] == ["Candidate 5"]
+    assert client.get("/api/cvs/export", params={"format": "xlsx"}).status_code == 400
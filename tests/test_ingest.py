@@ -0,0 +1,130 @@
+"""Bulk ingestion: batched saves with their usage, and resuming from the checkpoint."""
+import os
+import random
+import sys
+
+import fitz
+import pytest
+
+import ingest
+from config import SCORING_CATEGORIES
+from backend.models.database import create_job, get_db_connection
+from backend.services.cv_processor import CVProcessor
+from metering import record
+
+FILES = ["a.pdf", "b.pdf", "nested/c.pdf", "nested/d.pdf"]
+_WORDS = ["python", "django", "kubernetes", "team", "lead", "built", "api", "data", "cloud", "design",
+          "migrated", "services", "tested", "release", "mentored", "engineers", "scaled", "platform"]
+
+
+class Stages:
+    """OCR, parse and scoring stand-ins that record which files were parsed."""
+
+    def __init__(self, root: str, monkeypatch):
+        self.root = root
+        self.parsed = []
+        self.interrupt_at = None
+        monkeypatch.setattr(CVProcessor, "extract_text", self._extract_text)
+        monkeypatch.setattr(CVProcessor, "parse_text", self._parse_text)
+        monkeypatch.setattr(CVProcessor, "score_info", self._score_info)
+
+    def _extract_text(self, pdf_path, ocr_fn=None, file_hash=None):
+        rel_path = os.path.relpath(pdf_path, self.root).replace(os.sep, "/")
+        rng = random.Random(rel_path)
+        return f"{rel_path} " + " ".join(rng.choice(_WORDS) for _ in range(200))
+
+    def _parse_text(self, cv_text):
+        rel_path = cv_text.split()[0]
+        if rel_path == self.interrupt_at:
+            raise KeyboardInterrupt
+        self.parsed.append(rel_path)
+        record("gemini", "parse", input_tokens=100)
+        return {"name": rel_path, "skills": ["Python"]}
+
+    def _score_info(self, info, jd_text, scoring_mode=None, weights=None, run=None):
+        return {
+            "score_dict": {category: 60 for category in SCORING_CATEGORIES},
+            "reason_dict": {category: "" for category in SCORING_CATEGORIES},
+            "scored_by": {},
+            "total_score": 60.0,
+        }
+
+
+@pytest.fixture
+def cv_dir(tmp_path):
+    root = tmp_path / "cvs"
+    for rel_path in FILES:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), f"{rel_path}: senior Python engineer, Django and PostgreSQL.")
+        doc.save(path)
+    return str(root)
+
+
+@pytest.fixture
+def stages(processor, cv_dir, monkeypatch):
+    return Stages(cv_dir, monkeypatch)
+
+
+@pytest.fixture
+def ingest_main(db, cv_dir, monkeypatch):
+    """Run `python ingest.py <cv_dir> --job-id <job>` one file at a time."""
+    job_id = create_job("Backend", "Python developer")
+
+    def run() -> int:
+        monkeypatch.setattr(sys, "argv", [
+            "ingest.py", cv_dir, "--job-id", str(job_id),
+            "--workers", "1", "--concurrency", "1", "--batch-size", "1",
+        ])
+        return ingest.main()
+    return run
+
+
+def _done(cv_dir: str) -> set:
+    # The default checkpoint file of the test's job, the first in its database
+    return ingest.Checkpoint(os.path.join(cv_dir, ".ingest_job1.jsonl")).done
+
+
+def _analyses() -> dict:
+    with get_db_connection() as conn:
+        return dict(conn.execute("SELECT name, id FROM analyses").fetchall())
+
+
+def test_checkpoint_ignores_failed_and_torn_entries(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = ingest.Checkpoint(str(path))
+    checkpoint.record([{"path": "a.pdf", "analysis_id": 1}, {"path": "b.pdf", "error": "bad PDF"}])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"path": "c.p')
+
+    assert ingest.Checkpoint(str(path)).done == {"a.pdf"}
+
+
+def test_interrupted_run_resumes_without_redoing_finished_files(stages, ingest_main, cv_dir):
+    stages.interrupt_at = "nested/c.pdf"
+    assert ingest_main() == 130
+    done = _done(cv_dir)
+    assert done and "nested/c.pdf" not in done
+    assert done <= set(stages.parsed)
+    assert set(_analyses()) == done
+
+    stages.interrupt_at = None
+    stages.parsed.clear()
+    assert ingest_main() == 0
+
+    assert sorted(stages.parsed) == sorted(set(FILES) - done)
+    assert sorted(_analyses()) == sorted(FILES)
+    assert _done(cv_dir) == set(FILES)
+    # Nothing left to do
+    stages.parsed.clear()
+    assert ingest_main() == 0
+    assert stages.parsed == []
+
+
+def test_batch_usage_is_saved_with_its_analyses(stages, ingest_main):
+    assert ingest_main() == 0
+
+    with get_db_connection() as conn:
+        usage = dict(conn.execute("SELECT analysis_id, input_tokens FROM api_usage WHERE operation = 'parse'"))
+    assert usage == {analysis_id: 100 for analysis_id in _analyses().values()}
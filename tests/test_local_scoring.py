@@ -0,0 +1,121 @@
+"""Local Languages/Awards scorers and the confidence-tiered LLM fallback."""
+from datetime import datetime
+
+import pytest
+
+from config import SCORING_CATEGORIES
+from backend.services import cv_processor
+from backend.services.local_scoring_service import LocalScoringService, candidate_languages, required_languages
+
+JD = "Senior Python engineer building machine learning platforms. Fluent English required; basic German."
+
+
+def test_required_languages_take_the_level_of_their_clause():
+    assert required_languages(JD) == {"English": 0.9, "German": 0.35}
+    assert required_languages("Spanish is a plus. IELTS 6.5 or better in English.") == {
+        "Spanish": 0.6, "English": 0.75,
+    }
+    assert required_languages("Native-level Deutsch or Français") == {"German": 1.0, "French": 1.0}
+
+
+def test_lowercase_polish_is_not_a_language():
+    assert required_languages("We polish every release.") == {}
+    assert required_languages("Polish speakers welcome.") == {"Polish": 0.6}
+
+
+def test_candidate_languages_keep_unknown_entries():
+    known, unknown = candidate_languages(["English (C1)", "Mandarin - native", "Klingon"])
+    assert known == {"English": 0.9, "Chinese": 1.0}
+    assert unknown == ["Klingon"]
+    assert candidate_languages("English, Spanish")[0] == {"English": 0.75, "Spanish": 0.75}
+
+
+def test_languages_are_matched_by_level():
+    full = LocalScoringService.score_languages(JD, ["English (native)", "German B1", "French"])
+    assert full["score"] == 100
+    assert full["confidence"] == 0.9
+
+    # English 0.6 of the 0.9 asked for, German missing
+    partial = LocalScoringService.score_languages(JD, ["English - intermediate"])
+    assert partial["score"] == 33
+    assert "**German**: missing" in partial["reason"]
+
+
+@pytest.mark.parametrize("languages, confidence", [
+    (["English (native)", "Klingon"], 0.5),  # May be a required language we cannot read
+    ([], 0.75),
+])
+def test_unreadable_or_missing_languages_lower_the_confidence(languages, confidence):
+    assert LocalScoringService.score_languages(JD, languages)["confidence"] == confidence
+
+
+def test_jd_without_language_requirement_is_low_confidence():
+    result = LocalScoringService.score_languages("Python engineer", ["English", "German"])
+    assert result["score"] == 70
+    assert result["confidence"] == 0.4
+
+
+def test_awards_count_relevant_and_recent_items():
+    this_year = datetime.utcnow().year
+    result = LocalScoringService.score_awards(
+        JD, [f"Kaggle machine learning gold medal {this_year}", "Chess champion 2010"], "",
+    )
+    assert result["score"] == 30 + 10 + 5
+    assert result["confidence"] == 0.8
+    assert result["reason"].startswith("1 of 2")
+
+
+def test_awards_sharing_one_jd_term_are_ambiguous():
+    assert LocalScoringService.score_awards(JD, ["Python meetup speaker"])["confidence"] == 0.5
+    assert LocalScoringService.score_awards(JD, "", "") == {
+        "score": 0, "reason": "No awards or publications listed.", "confidence": 0.9,
+    }
+
+
+def test_unknown_category_has_no_local_scorer():
+    with pytest.raises(ValueError):
+        LocalScoringService.score("Skills", JD, {})
+
+
+INFO = {
+    "name": "Ada Lovelace",
+    "languages": ["English (native)", "German (B1)"],
+    "awards": ["Python meetup speaker"],  # Ambiguous: goes to the LLM
+}
+
+
+@pytest.fixture
+def llm_calls(processor, monkeypatch):
+    calls = []
+
+    def compute_score(jd_text, text, category):
+        calls.append(category)
+        return {"score": 40, "reason": "LLM"}
+
+    monkeypatch.setattr(processor, "_compute_score", compute_score)
+    return calls
+
+
+def test_tiered_scoring_keeps_confident_local_scores(processor, llm_calls):
+    result = processor.score_info(INFO, JD, "tiered")
+
+    assert sorted(llm_calls) == sorted(set(SCORING_CATEGORIES) - {"Languages"})
+    assert result["scored_by"]["Languages"] == "local"
+    assert result["scored_by"]["Awards"] == "llm"
+    assert result["score_dict"]["Languages"] == 100
+    assert result["score_dict"]["Awards"] == 40
+
+
+def test_confidence_threshold_sends_local_scores_to_the_llm(processor, llm_calls, monkeypatch):
+    monkeypatch.setattr(cv_processor, "TIERED_MIN_CONFIDENCE", 0.95)
+    result = processor.score_info(INFO, JD, "tiered")
+
+    assert sorted(llm_calls) == sorted(SCORING_CATEGORIES)
+    assert set(result["scored_by"].values()) == {"llm"}
+
+
+def test_llm_mode_never_scores_locally(processor, llm_calls):
+    result = processor.score_info(INFO, JD, "llm")
+
+    assert sorted(llm_calls) == sorted(SCORING_CATEGORIES)
+    assert set(result["scored_by"].values()) == {"llm"}
@@ -0,0 +1,130 @@
+"""Foreign key cascades, orphan cleanup and scheduled database maintenance."""
+import os
+import sqlite3
+
+import pytest
+
+from config import DB_PATH
+from backend.models.database import create_job, delete_job, encode_cv_data, get_db_connection, index_analysis
+from backend.models.maintenance import count_orphans
+from backend.models.versions import get_ranking_version
+from backend.services.maintenance_service import MaintenanceService
+
+
+def _add_analysis(conn, job_id: int, name: str, payload_bytes: int = 0) -> int:
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO analyses (job_id, name, cv_data) VALUES (?, ?, ?)",
+        (job_id, name, encode_cv_data({"info": {"name": name}, "notes": os.urandom(payload_bytes).hex()})),
+    )
+    analysis_id = cursor.lastrowid
+    index_analysis(cursor, analysis_id, job_id, name, {"skills": ["Python"]})
+    cursor.execute("INSERT INTO dedup_keys (key, analysis_id) VALUES (?, ?)", (f"email:{name}", analysis_id))
+    cursor.execute(
+        "INSERT INTO job_descriptions (job_id, description, description_hash) VALUES (?, 'JD', ?)",
+        (job_id, name),
+    )
+    return analysis_id
+
+
+def _count(conn, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_deleting_a_job_cascades(db):
+    job_id = create_job("Backend", "Python developer")
+    with get_db_connection() as conn:
+        _add_analysis(conn, job_id, "ada")
+        conn.commit()
+
+    delete_job(job_id)
+    with get_db_connection() as conn:
+        for table in ("analyses", "dedup_keys", "job_descriptions", "analyses_fts"):
+            assert _count(conn, table) == 0, table
+
+
+@pytest.fixture
+def orphans(db, tmp_path):
+    """Rows left by a job deleted while foreign keys were not enforced."""
+    kept = create_job("Kept", "Python developer")
+    gone = create_job("Gone", "Python developer")
+    pdf_copy = tmp_path / "run.pdf"
+    pdf_copy.write_bytes(b"%PDF")
+    conn = sqlite3.connect(DB_PATH)  # foreign_keys is off by default
+    ada = _add_analysis(conn, kept, "ada")
+    orphan = _add_analysis(conn, gone, "bob")
+    conn.execute("UPDATE analyses SET duplicate_of = ? WHERE id = ?", (orphan, ada))
+    conn.execute(
+        "INSERT INTO pipeline_runs (id, job_id, jd_text, pdf_path, stage, created_at, updated_at)"
+        " VALUES ('run', ?, 'JD', ?, 'ocr', '', '')",
+        (gone, str(pdf_copy)),
+    )
+    conn.execute("INSERT INTO pipeline_checkpoints (run_id, stage, item, status) VALUES ('run', 'ocr', '0', 'done')")
+    conn.execute("DELETE FROM jobs WHERE id = ?", (gone,))
+    conn.commit()
+    conn.close()
+    return {"kept": kept, "gone": gone, "ada": ada, "pdf_copy": pdf_copy}
+
+
+def test_orphans_are_counted(orphans):
+    with get_db_connection() as conn:
+        assert count_orphans(conn.cursor()) == {
+            "analyses": 1,
+            "dedup_keys": 0,
+            "job_descriptions": 1,
+            "pipeline_runs": 1,
+            "pipeline_checkpoints": 0,
+        }
+
+
+def test_maintenance_removes_orphans_and_their_files(orphans):
+    version = get_ranking_version(orphans["gone"])
+    result = MaintenanceService.run()
+
+    assert result["orphans_removed"]["analyses"] == 1
+    assert result["orphans_removed"]["pipeline_runs"] == 1
+    assert result["orphans_removed"]["duplicate_links"] == 1
+    assert not orphans["pdf_copy"].exists()
+    assert get_ranking_version(orphans["gone"]) > version
+    with get_db_connection() as conn:
+        assert set(count_orphans(conn.cursor()).values()) == {0}
+        assert conn.execute("SELECT id, duplicate_of FROM analyses").fetchall() == [(orphans["ada"], None)]
+        assert _count(conn, "dedup_keys") == 1
+        assert _count(conn, "analyses_fts") == 1
+        assert _count(conn, "pipeline_checkpoints") == 0
+
+
+def test_maintenance_releases_free_pages(db):
+    job_id = create_job("Backend", "Python developer")
+    with get_db_connection() as conn:
+        for i in range(200):
+            _add_analysis(conn, job_id, f"candidate-{i}", payload_bytes=2000)
+        conn.commit()
+    delete_job(job_id)
+    assert MaintenanceService.stats()["free_pages"] > 0
+
+    result = MaintenanceService.run()
+    stats = MaintenanceService.stats()
+    assert result["pages_released"] > 0
+    assert stats["free_pages"] == 0
+    assert stats["auto_vacuum"] == "incremental"
+    assert stats["foreign_keys"] is True
+
+
+def test_scheduled_maintenance_runs_once_per_interval(db):
+    assert MaintenanceService.run(scheduled=True) is not None
+    # Another worker polling within the interval
+    assert MaintenanceService.run(scheduled=True) is None
+    # Explicit runs are never skipped
+    assert MaintenanceService.run() is not None
+
+
+def test_admin_endpoints(client, orphans):
+    stats = client.get("/api/admin/db").json()["data"]
+    assert stats["orphans"]["analyses"] == 1
+    assert stats["last_maintenance"] is None
+
+    client.post("/api/admin/db/maintenance")
+    stats = client.get("/api/admin/db").json()["data"]
+    assert stats["orphans"]["analyses"] == 0
+    assert stats["last_maintenance"]["result"]["orphans_removed"]["analyses"] == 1
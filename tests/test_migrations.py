@@ -0,0 +1,111 @@
+"""Schema migrations of databases written by earlier versions (PRAGMA user_version)."""
+import json
+import os
+import sqlite3
+
+import pytest
+
+from config import DB_PATH, SCORING_CATEGORIES
+from backend.models.database import decode_cv_data, init_db
+from backend.services.search_service import SearchService
+
+SCORES = {category: 10 * (i + 1) for i, category in enumerate(SCORING_CATEGORIES)}
+
+
+def _create_legacy_db() -> None:
+    """A version 0 database: JD text and plain JSON cv_data on every analysis, no foreign keys."""
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executescript("""
+            CREATE TABLE jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE analyses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER NOT NULL,
+                name TEXT,
+                email TEXT,
+                phone TEXT,
+                score REAL,
+                jd_text TEXT,
+                cv_data TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+            );
+        """)
+        conn.execute("INSERT INTO jobs (id, title, description) VALUES (1, 'Backend', 'Python developer')")
+        rows = [
+            # (id, job_id, name, jd_text, payload)
+            (1, 1, "Ada", "Python developer",
+             {"info": {"name": "Ada", "skills": ["Python", "Kubernetes"]}, "scores": SCORES}),
+            (2, 1, "Bob", None,
+             {"info": {"name": "Bob", "skills": ["Go"]}, "jd": "Python developer", "scores": {"Skills": 50}}),
+            # Left behind by a job deleted while foreign keys were not enforced
+            (3, 99, "Orphan", "Old job", {"info": {"name": "Orphan"}}),
+        ]
+        conn.executemany(
+            "INSERT INTO analyses (id, job_id, name, score, jd_text, cv_data) VALUES (?, ?, ?, 50, ?, ?)",
+            [(i, job, name, jd, json.dumps(payload)) for i, job, name, jd, payload in rows],
+        )
+
+
+@pytest.fixture
+def legacy_db(workdir):
+    _create_legacy_db()
+    init_db()
+    conn = sqlite3.connect(DB_PATH)
+    yield conn
+    conn.close()
+
+
+def test_legacy_database_is_migrated_to_current_version(legacy_db):
+    assert legacy_db.execute("PRAGMA user_version").fetchone()[0] == 3
+    # Converted by the VACUUM after the migration
+    assert legacy_db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_jd_text_moves_to_a_shared_versioned_row(legacy_db):
+    rows = legacy_db.execute("SELECT id, jd_id, jd_text, cv_data FROM analyses ORDER BY id").fetchall()
+    assert [row[0] for row in rows] == [1, 2]
+    assert rows[0][1] == rows[1][1] is not None
+    assert all(row[2] is None for row in rows)
+    assert legacy_db.execute("SELECT job_id, description FROM job_descriptions").fetchall() == [
+        (1, "Python developer")
+    ]
+    payload = decode_cv_data(rows[1][3])
+    assert isinstance(rows[1][3], bytes)
+    assert "jd" not in payload
+    assert payload["info"]["name"] == "Bob"
+
+
+def test_category_scores_are_backfilled_when_complete(legacy_db):
+    columns = ", ".join(f"score_{category.lower()}" for category in SCORING_CATEGORIES)
+    rows = legacy_db.execute(f"SELECT {columns} FROM analyses ORDER BY id").fetchall()
+    assert list(rows[0]) == [SCORES[category] for category in SCORING_CATEGORIES]
+    assert all(value is None for value in rows[1])
+
+
+def test_orphans_are_removed_before_migrating(legacy_db):
+    assert legacy_db.execute("SELECT COUNT(*) FROM analyses WHERE job_id = 99").fetchone()[0] == 0
+
+
+def test_search_index_is_built_from_migrated_rows(legacy_db):
+    assert [row["id"] for row in SearchService.search("kubernetes")] == [1]
+
+
+def test_search_index_accepts_inserts_from_any_connection(legacy_db):
+    # No SQL function is needed to index rows, so plain connections can write analyses
+    legacy_db.execute("INSERT INTO analyses (job_id, name, cv_data) VALUES (1, 'Cy', x'00')")
+    legacy_db.execute("DELETE FROM analyses WHERE name = 'Cy'")
+    legacy_db.commit()
+
+
+def test_init_db_is_idempotent(legacy_db):
+    before = legacy_db.execute("SELECT id, jd_id, score FROM analyses ORDER BY id").fetchall()
+    init_db()
+    assert legacy_db.execute("SELECT id, jd_id, score FROM analyses ORDER BY id").fetchall() == before
+    assert legacy_db.execute("SELECT COUNT(*) FROM job_descriptions").fetchone()[0] == 1
@@ -0,0 +1,107 @@
+"""One upload scored against several jobs through /api/cvs/process-multi."""
+import fitz
+import pytest
+
+from config import SCORING_CATEGORIES
+from backend.models.database import create_job, get_db_connection
+from backend.services.cv_processor import CVProcessor
+
+
+class Stages:
+    """OCR, parse and per-category scoring stand-ins that count their calls."""
+
+    def __init__(self, monkeypatch):
+        self.calls = {"ocr": 0, "parse": 0}
+        self.scored = []
+        # The route creates its own processor, so the class is patched
+        monkeypatch.setattr(CVProcessor, "extract_text", self._extract_text)
+        monkeypatch.setattr(CVProcessor, "parse_text", self._parse_text)
+        monkeypatch.setattr(CVProcessor, "_compute_score", self._compute_score)
+
+    def _extract_text(self, pdf_path, ocr_fn=None, file_hash=None):
+        self.calls["ocr"] += 1
+        return "Ada Lovelace ada@example.com senior Python engineer, Django, PostgreSQL"
+
+    def _parse_text(self, cv_text):
+        self.calls["parse"] += 1
+        return {"name": "Ada Lovelace", "email": "ada@example.com", "skills": ["Python", "Django"]}
+
+    def _compute_score(self, jd_text, text, category):
+        self.scored.append((jd_text, category))
+        return {"score": 80 if "Python" in jd_text else 30, "reason": f"{category} reason"}
+
+
+@pytest.fixture
+def stages(processor, monkeypatch):
+    return Stages(monkeypatch)
+
+
+@pytest.fixture
+def jobs(db):
+    return {
+        "backend": create_job("Backend", "Python developer"),
+        "frontend": create_job("Frontend", "React developer"),
+        "data": create_job("Data", "Spark engineer"),
+    }
+
+
+@pytest.fixture
+def pdf():
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Ada Lovelace, senior Python engineer")
+    return doc.tobytes()
+
+
+def _upload(client, pdf: bytes, job_ids: str):
+    return client.post(
+        "/api/cvs/process-multi",
+        files={"file": ("cv.pdf", pdf, "application/pdf")},
+        data={"job_ids": job_ids},
+    )
+
+
+def test_one_upload_is_scored_against_each_job(client, stages, jobs, pdf):
+    response = _upload(client, pdf, f"{jobs['backend']},{jobs['frontend']}")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["candidate_info"]["name"] == "Ada Lovelace"
+    assert stages.calls == {"ocr": 1, "parse": 1}
+    assert len(stages.scored) == 2 * len(SCORING_CATEGORIES)
+
+    results = {item["job_title"]: item for item in data["results"]}
+    assert list(results) == ["Backend", "Frontend"]
+    assert results["Backend"]["job_id"] == jobs["backend"]
+    assert results["Backend"]["total_score"] == 80.0
+    assert results["Frontend"]["total_score"] == 30.0
+    assert results["Backend"]["reasons"]["Skills"] == "Skills reason"
+    assert results["Backend"]["analysis_id"] != results["Frontend"]["analysis_id"]
+
+    with get_db_connection() as conn:
+        stored = dict(conn.execute("SELECT job_id, score FROM analyses").fetchall())
+    assert stored == {jobs["backend"]: 80.0, jobs["frontend"]: 30.0}
+    ranking = client.get("/api/cvs/ranking", params={"job_id": jobs["backend"]}).json()["data"]
+    assert [(item["id"], item["score"]) for item in ranking] == [(results["Backend"]["analysis_id"], 80.0)]
+
+
+def test_all_scores_against_every_job(client, stages, jobs, pdf):
+    response = _upload(client, pdf, "all")
+
+    assert {item["job_id"] for item in response.json()["data"]["results"]} == set(jobs.values())
+    assert stages.calls == {"ocr": 1, "parse": 1}
+
+
+def test_reupload_reuses_the_stored_analyses(client, stages, jobs, pdf):
+    first = _upload(client, pdf, str(jobs["backend"])).json()["data"]["results"][0]
+    stages.scored.clear()
+
+    second = _upload(client, pdf, f"{jobs['backend']},{jobs['data']}").json()["data"]["results"]
+    assert second[0]["analysis_id"] == first["analysis_id"]
+    assert {jd_text for jd_text, _ in stages.scored} == {"Spark engineer"}
+    assert stages.calls["ocr"] == 1
+
+
+@pytest.mark.parametrize("job_ids, status_code", [("1,x", 400), (" , ", 400), ("999", 404)])
+def test_bad_job_ids_are_rejected(client, stages, jobs, pdf, job_ids, status_code):
+    assert _upload(client, pdf, job_ids).status_code == status_code
+    assert stages.calls["ocr"] == 0
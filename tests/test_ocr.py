@@ -0,0 +1,154 @@
+"""OCR engine routing and skipping pages not worth OCRing."""
+import io
+import random
+
+import fitz
+import pytest
+from PIL import Image, ImageDraw
+
+import metrics
+from ocr import OCRResult, PageRouter, classify_page, iter_page_images
+
+
+class FakeBackend:
+    """An OCR engine that returns a fixed result or raises."""
+
+    def __init__(self, name: str, text: str = "", confidence=None, error: Exception = None):
+        self.name = name
+        self.result = OCRResult(text, confidence, name)
+        self.error = error
+        self.calls = 0
+
+    def available(self) -> bool:
+        return True
+
+    def recognize(self, img_b64: str) -> OCRResult:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _router(*backends) -> PageRouter:
+    router = PageRouter(None, "local-first", min_confidence=0.6)
+    router.backends = list(backends)
+    return router
+
+
+def _count(name: str) -> int:
+    return metrics.snapshot().get(name, 0)
+
+
+def test_confident_local_text_is_kept():
+    local = FakeBackend("tesseract", "Python developer", 0.9)
+    remote = FakeBackend("vision", "unused")
+
+    assert _router(local, remote).recognize("img").backend == "tesseract"
+    assert remote.calls == 0
+
+
+def test_unsure_local_text_falls_back():
+    local = FakeBackend("tesseract", "Pyth0n devel0per", 0.3)
+    remote = FakeBackend("vision", "Python developer")
+
+    assert _router(local, remote).recognize("img").text == "Python developer"
+
+
+def test_failing_local_engine_falls_back():
+    errors = _count("ocr_errors_tesseract")
+    local = FakeBackend("tesseract", error=RuntimeError("pool broken"))
+    remote = FakeBackend("vision", "Python developer")
+
+    result = _router(local, remote).recognize("img")
+    assert result == OCRResult("Python developer", None, "vision")
+    assert _count("ocr_errors_tesseract") == errors + 1
+
+
+def test_failing_fallback_keeps_local_text():
+    local = FakeBackend("tesseract", "Pyth0n devel0per", 0.3)
+    remote = FakeBackend("vision", error=RuntimeError("quota exceeded"))
+
+    assert _router(local, remote).recognize("img").text == "Pyth0n devel0per"
+
+
+def test_page_fails_when_every_engine_fails():
+    local = FakeBackend("tesseract", error=RuntimeError("pool broken"))
+    remote = FakeBackend("vision", error=RuntimeError("quota exceeded"))
+
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        _router(local, remote).recognize("img")
+
+
+def _png(image: Image.Image) -> bytes:
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _photo() -> bytes:
+    rng = random.Random(0)
+    image = Image.new("L", (200, 280))
+    image.putdata([rng.randint(90, 170) for _ in range(200 * 280)])
+    return _png(image)
+
+
+def _scan() -> bytes:
+    """A scanned page: dark word-shaped blocks on white."""
+    image = Image.new("L", (600, 840), 255)
+    draw = ImageDraw.Draw(image)
+    rng = random.Random(0)
+    for top in range(60, 780, 24):
+        left = 60
+        while left < 520:
+            width = rng.randint(20, 70)
+            draw.rectangle((left, top, min(left + width, 540), top + 10), fill=0)
+            left += width + 12
+    return _png(image)
+
+
+def _add_page(doc: fitz.Document, kind: str) -> None:
+    page = doc.new_page()
+    if kind == "text":
+        page.insert_text((72, 72), "Senior Python engineer, Django and PostgreSQL.")
+    elif kind == "photo":
+        page.insert_image(page.rect, stream=_photo())
+    elif kind == "logo":
+        page.insert_image(fitz.Rect(20, 20, 60, 60), stream=_png(Image.new("L", (40, 40), 0)))
+    elif kind == "scan":
+        page.insert_image(page.rect, stream=_scan())
+
+
+@pytest.mark.parametrize("kind, expected", [
+    ("text", "text"),
+    ("blank", "blank"),
+    ("photo", "graphic"),
+    ("logo", "graphic"),
+    ("scan", "text"),  # Image-only too, but ink on paper: still OCR'd
+])
+def test_classify_page(kind, expected):
+    doc = fitz.open()
+    _add_page(doc, kind)
+    assert classify_page(doc.load_page(0)) == expected
+
+
+@pytest.fixture
+def mixed_doc():
+    doc = fitz.open()
+    for kind in ("text", "blank", "photo", "scan", "logo"):
+        _add_page(doc, kind)
+    return doc
+
+
+def test_only_text_pages_are_rendered(mixed_doc):
+    skipped = {}
+    assert [idx for idx, _ in iter_page_images(mixed_doc, skipped=skipped)] == [0, 3]
+    assert skipped == {"blank": 1, "graphic": 2}
+
+
+def test_skipped_pages_are_counted_in_metrics(mixed_doc):
+    blank, graphic = _count("ocr_pages_skipped_blank"), _count("ocr_pages_skipped_graphic")
+    pages = list(iter_page_images(mixed_doc, skip={0}))
+
+    assert [idx for idx, _ in pages] == [3]
+    assert _count("ocr_pages_skipped_blank") == blank + 1
+    assert _count("ocr_pages_skipped_graphic") == graphic + 2
@@ -0,0 +1,107 @@
+"""Lexical (BM25) prescreening of CVs against job descriptions."""
+import pytest
+
+from backend.models import versions
+from backend.models.database import create_job, delete_job, encode_cv_data, get_db_connection, get_job_by_id
+from backend.services.prescreen_service import LexicalIndex, PrescreenService, get_lexical_index
+
+JD = "Senior Python developer with Django and PostgreSQL"
+CVS = {
+    1: {"name": "Ada", "skills": ["Python", "Django", "PostgreSQL"]},
+    2: {"name": "Bob", "skills": ["Python", "Flask"]},
+    3: {"name": "Cy", "skills": ["Java", "Spring"]},
+}
+
+
+@pytest.fixture
+def index(db):
+    job_id = create_job("Backend", JD)
+    with get_db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO analyses (id, job_id, name, cv_data) VALUES (?, ?, ?, ?)",
+            [(i, job_id, info["name"], encode_cv_data({"info": info})) for i, info in CVS.items()],
+        )
+        conn.commit()
+    index = LexicalIndex()
+    index.ensure_loaded()
+    return index
+
+
+def test_best_matching_cv_scores_one(index):
+    scores = index.score_all(JD)
+    assert scores[1] == 1.0
+    assert 0.0 < scores[2] < scores[1]
+    assert scores[3] == 0.0
+
+
+def test_relevance_does_not_depend_on_jd_length(index):
+    padded = JD + " We offer a friendly team, remote work, a yearly budget for conferences" * 10
+    assert index.score_all(padded) == pytest.approx(index.score_all(JD))
+
+
+def test_unindexed_cv_is_scored_on_the_same_scale(index):
+    assert index.score_info(CVS[2], JD) == pytest.approx(index.score_all(JD)[2])
+    # Better than every stored CV: it becomes the reference
+    assert index.score_info({"skills": ["Python", "Django", "PostgreSQL", "senior", "developer"]}, JD) == 1.0
+    assert index.score_info({}, JD) == 0.0
+
+
+def test_empty_index_scores_any_match_as_best(db):
+    index = LexicalIndex()
+    assert index.score_all(JD) == {}
+    assert index.score_info(CVS[2], JD) == 1.0
+
+
+def test_scores_can_be_limited_to_one_job(index):
+    other_job = create_job("Other", JD)
+    index.add(4, other_job, CVS[1])
+    assert set(index.score_all(JD, job_id=other_job)) == {4}
+    assert set(index.score_all(JD)) == {1, 2, 3, 4}
+
+
+def test_deleted_jobs_leave_the_index(index):
+    job_id = create_job("Temporary", JD)
+    index.add(4, job_id, CVS[1])
+    index.remove_job(job_id)
+    assert 4 not in index.score_all(JD)
+
+
+def test_writes_of_other_workers_are_picked_up(db, monkeypatch):
+    index = get_lexical_index()
+    job_id = create_job("Backend", JD)
+    assert index.score_all(JD) == {}
+
+    # Another worker saves an analysis and bumps the shared versions
+    with get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO analyses (id, job_id, name, cv_data) VALUES (7, ?, 'Ada', ?)",
+            (job_id, encode_cv_data({"info": CVS[1]})),
+        )
+        conn.execute("UPDATE data_versions SET version = version + 1")
+        conn.commit()
+    monkeypatch.setattr(versions, "VERSION_CACHE_TTL", 0)
+    assert index.score_all(JD) == {7: 1.0}
+
+    delete_job(job_id)
+    assert index.score_all(JD) == {}
+
+
+@pytest.mark.parametrize("mode, expected", [("off", "scored"), ("skip", "skipped"), ("defer", "deferred")])
+def test_prescreen_mode_applies_below_threshold(index, mode, expected):
+    job = get_job_by_id(create_job("Backend", JD, prescreen_mode=mode, prescreen_threshold=0.5))
+    assert PrescreenService.evaluate(CVS[3], job)["status"] == expected
+    assert PrescreenService.evaluate(CVS[1], job)["status"] == "scored"
+
+
+def test_shortlist_orders_by_relevance(index):
+    job = get_job_by_id(1)
+    shortlist = PrescreenService.shortlist(job, limit=2)
+    assert [item["analysis_id"] for item in shortlist] == [1, 2]
+
+
+@pytest.mark.parametrize("threshold", [-0.1, 1.5])
+def test_threshold_outside_unit_range_is_rejected(client, threshold):
+    response = client.post("/api/jobs", json={
+        "title": "Backend", "description": JD, "prescreen_mode": "skip", "prescreen_threshold": threshold,
+    })
+    assert response.status_code == 400
@@ -0,0 +1,152 @@
+"""Checkpointed CV processing runs and resuming them from the failed stage."""
+import os
+
+import fitz
+import pytest
+
+import ocr
+from config import SCORING_CATEGORIES
+from backend.models.database import create_job, get_db_connection
+from backend.models.runs import PipelineError, get_run
+
+PAGES = 3
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = fitz.open()
+    for number in range(PAGES):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {number + 1}: senior Python engineer, Django, PostgreSQL. " * 3)
+    path = tmp_path / "cv.pdf"
+    doc.save(path)
+    return str(path)
+
+
+class Stages:
+    """OCR, parse and scoring stand-ins that record their calls and fail on demand."""
+
+    def __init__(self, processor, monkeypatch):
+        self.ocr_pages = []
+        self.failing_pages = set()
+        self.parses = 0
+        self.scores = 0
+        self.fail_scoring = False
+        monkeypatch.setattr(ocr, "ocr_available", lambda api_key: True)
+        monkeypatch.setattr(ocr, "recognize_pages", self._recognize_pages)
+        monkeypatch.setattr(processor, "parse_text", self._parse_text)
+        monkeypatch.setattr(processor, "score_info", self._score_info)
+
+    def _recognize_pages(self, page_images, api_key, vision_limiter=None):
+        for idx, _ in page_images:
+            self.ocr_pages.append(idx)
+            if idx in self.failing_pages:
+                yield idx, None, RuntimeError("Vision timeout")
+            else:
+                yield idx, f"text of page {idx + 1}", None
+
+    def _parse_text(self, cv_text):
+        self.parses += 1
+        assert cv_text == "\n".join(f"text of page {idx + 1}" for idx in range(PAGES))
+        return {"name": "Ada Lovelace", "skills": ["Python"]}
+
+    def _score_info(self, info, jd_text, scoring_mode=None, weights=None, run=None):
+        self.scores += 1
+        if self.fail_scoring:
+            raise RuntimeError("Gemini unavailable")
+        return {
+            "score_dict": {category: 70 for category in SCORING_CATEGORIES},
+            "reason_dict": {category: "" for category in SCORING_CATEGORIES},
+            "scored_by": {},
+            "total_score": 70.0,
+        }
+
+
+@pytest.fixture
+def stages(processor, monkeypatch):
+    return Stages(processor, monkeypatch)
+
+
+@pytest.fixture
+def job_id(db):
+    return create_job("Backend", "Python developer")
+
+
+def _fail(processor, pdf_path, job_id) -> PipelineError:
+    with pytest.raises(PipelineError) as error:
+        processor.process_cv(pdf_path, job_id, "Python developer")
+    return error.value
+
+
+def test_failed_ocr_pages_are_retried_alone(processor, stages, pdf_path, job_id):
+    stages.failing_pages = {1}
+    error = _fail(processor, pdf_path, job_id)
+
+    assert error.stage == "ocr"
+    run = get_run(error.run_id)
+    assert run["status"] == "failed"
+    assert run["stages"]["ocr"] == {"done": 2, "failed": {"1": "Vision timeout"}}
+    assert stages.parses == 0
+
+    stages.failing_pages = set()
+    stages.ocr_pages.clear()
+    result = processor.resume_run(error.run_id)
+
+    assert stages.ocr_pages == [1]
+    assert stages.parses == 1
+    assert result["total_score"] == 70.0
+    run = get_run(error.run_id)
+    assert run["status"] == "completed"
+    assert run["analysis_id"] == result["analysis_id"]
+    assert run["stages"] == {}
+
+
+def test_failed_scoring_resumes_without_ocr_or_parse(processor, stages, pdf_path, job_id):
+    stages.fail_scoring = True
+    error = _fail(processor, pdf_path, job_id)
+    assert error.stage == "score"
+
+    stages.fail_scoring = False
+    stages.ocr_pages.clear()
+    processor.resume_run(error.run_id)
+
+    assert stages.ocr_pages == []
+    assert stages.parses == 1
+    assert stages.scores == 2
+
+
+def test_completed_run_drops_its_pdf_copy(processor, stages, pdf_path, job_id):
+    stages.fail_scoring = True
+    error = _fail(processor, pdf_path, job_id)
+    copy = get_run(error.run_id)["pdf_path"]
+    assert os.path.exists(copy)
+
+    stages.fail_scoring = False
+    processor.resume_run(error.run_id)
+    assert not os.path.exists(copy)
+    with pytest.raises(ValueError):
+        processor.resume_run(error.run_id)
+
+
+def test_unknown_run_cannot_be_resumed(processor):
+    with pytest.raises(LookupError):
+        processor.resume_run("missing")
+
+
+def test_deleting_a_run_cascades_to_its_checkpoints(processor, stages, pdf_path, job_id):
+    stages.failing_pages = {0}
+    error = _fail(processor, pdf_path, job_id)
+    with get_db_connection() as conn:
+        conn.execute("DELETE FROM pipeline_runs WHERE id = ?", (error.run_id,))
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM pipeline_checkpoints").fetchone()[0] == 0
+
+
+def test_unreadable_page_fails_ocr_outside_runs(monkeypatch):
+    def recognize_pages(page_images, api_key, vision_limiter=None):
+        yield 0, "first page", None
+        yield 1, None, RuntimeError("Vision timeout")
+
+    monkeypatch.setattr(ocr, "recognize_pages", recognize_pages)
+    with pytest.raises(RuntimeError, match="page 2"):
+        ocr.ocr_page_images([(0, "img"), (1, "img")], "key")
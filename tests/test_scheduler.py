@@ -0,0 +1,112 @@
+"""FairScheduler: priority classes first, then fair queuing across jobs."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scheduler import BULK, INTERACTIVE, FairScheduler, bind, current_workload, workload
+
+
+class Harness:
+    """Queues calls behind a held slot in a known order, then records the order they run in."""
+
+    def __init__(self, capacity: int = 1):
+        self.scheduler = FairScheduler("test", capacity)
+        self.order = []
+        self.threads = []
+        self._release = threading.Event()
+        self._queued = 0
+        self._hold()
+
+    def queue(self, priority: str, job_id: int, label: str) -> None:
+        def run():
+            with workload(priority, job_id), self.scheduler.slot():
+                self.order.append(label)
+
+        self._start(run)
+
+    def run_all(self) -> list:
+        self._release.set()
+        for thread in self.threads:
+            thread.join(5)
+        return self.order
+
+    def _hold(self) -> None:
+        def hold():
+            with workload(INTERACTIVE, 0), self.scheduler.slot():
+                self._release.wait(5)
+
+        self._start(hold, queued=False)
+        self._wait_for(lambda: self.scheduler._active == self.scheduler.capacity)
+
+    def _start(self, target, queued: bool = True) -> None:
+        thread = threading.Thread(target=target)
+        thread.start()
+        self.threads.append(thread)
+        if queued:
+            self._queued += 1
+            self._wait_for(lambda: sum(map(len, self.scheduler._queues.values())) == self._queued)
+
+    @staticmethod
+    def _wait_for(condition) -> None:
+        deadline = time.monotonic() + 5
+        while not condition():
+            assert time.monotonic() < deadline, "call was not queued"
+            time.sleep(0.001)
+
+
+def test_jobs_take_turns_within_a_class():
+    harness = Harness()
+    for i in range(4):
+        harness.queue(BULK, 1, f"job1-{i}")
+    harness.queue(BULK, 2, "job2-0")
+    harness.queue(BULK, 2, "job2-1")
+
+    assert harness.run_all() == ["job1-0", "job2-0", "job1-1", "job2-1", "job1-2", "job1-3"]
+
+
+def test_interactive_calls_are_served_before_bulk():
+    harness = Harness()
+    harness.queue(BULK, 1, "bulk-0")
+    harness.queue(BULK, 1, "bulk-1")
+    harness.queue(INTERACTIVE, 2, "interactive")
+
+    assert harness.run_all() == ["interactive", "bulk-0", "bulk-1"]
+
+
+def test_job_arriving_late_is_not_starved():
+    harness = Harness()
+    for i in range(10):
+        harness.queue(BULK, 1, f"job1-{i}")
+    harness.queue(BULK, 2, "job2")
+
+    assert harness.run_all().index("job2") <= 1
+
+
+@pytest.mark.parametrize("capacity", [1, 3])
+def test_capacity_bounds_concurrent_calls(capacity):
+    scheduler = FairScheduler("test", capacity)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def call():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.005)
+        with lock:
+            active.pop()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for future in [pool.submit(scheduler.call, call) for _ in range(24)]:
+            future.result()
+    assert max(peak) == capacity
+
+
+def test_bind_carries_the_workload_into_executor_threads():
+    with ThreadPoolExecutor(max_workers=1) as pool, workload(BULK, 5):
+        assert pool.submit(current_workload).result() == (INTERACTIVE, None)
+        assert pool.submit(bind(current_workload)).result() == (BULK, 5)
+        assert pool.submit(bind(current_workload, job_id=6)).result() == (BULK, 6)
@@ -0,0 +1,83 @@
+"""Full-text candidate search: query quoting, BM25 ranking and filters."""
+import pytest
+
+from backend.models.database import create_job, encode_cv_data, get_db_connection, index_analysis
+from backend.services.search_service import SearchService
+
+
+@pytest.mark.parametrize("text, query", [
+    ("Kubernetes Go", '"Kubernetes" "Go"'),
+    ("C++  C#", '"C++" "C#"'),
+    ('say "hi', '"say" """hi"'),
+    ("python OR java", '"python" "OR" "java"'),
+    ("skills:rust NEAR(a b)", '"skills:rust" "NEAR(a" "b)"'),
+    ("+ - *", ""),
+    ("", ""),
+])
+def test_build_query_quotes_every_term(text, query):
+    assert SearchService.build_query(text) == query
+
+
+@pytest.fixture
+def candidates(db):
+    """Analyses of two jobs, indexed like uploads are."""
+    backend = create_job("Backend", "Rust developer")
+    other = create_job("Other", "Anything")
+    rows = [
+        (backend, "Ada Lovelace", {"skills": ["Python", "Rust"], "experience": "Built compilers"}),
+        (backend, "Grace Hopper", {"skills": ["COBOL"], "education": "Rust Belt University"}),
+        (backend, "José Rust", {"skills": ["Go"]}),
+        (backend, "Alan Turing", {"skills": ["C++", "Python"], "languages": ["English"]}),
+        (other, "Edsger Dijkstra", {"skills": ["Rust", "Python"]}),
+    ]
+    ids = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for job_id, name, info in rows:
+            cursor.execute(
+                "INSERT INTO analyses (job_id, name, score, cv_data) VALUES (?, ?, 50, ?)",
+                (job_id, name, encode_cv_data({"info": info})),
+            )
+            ids[name] = cursor.lastrowid
+            index_analysis(cursor, cursor.lastrowid, job_id, name, info)
+        conn.commit()
+    return {"backend": backend, "other": other, "ids": ids}
+
+
+def _names(results) -> list:
+    return [result["name"] for result in results]
+
+
+def test_name_matches_rank_above_skills_above_education(candidates):
+    results = SearchService.search("rust", job_id=candidates["backend"])
+
+    assert _names(results) == ["José Rust", "Ada Lovelace", "Grace Hopper"]
+    assert results[0]["rank"] <= results[1]["rank"] <= results[2]["rank"]
+    assert results[0]["job_title"] == "Backend"
+    assert "<mark>" in results[1]["snippet"]
+
+
+def test_all_terms_must_match(candidates):
+    assert _names(SearchService.search("python rust", job_id=candidates["backend"])) == ["Ada Lovelace"]
+
+
+def test_job_filter_and_limit(candidates):
+    assert set(_names(SearchService.search("python"))) == {"Ada Lovelace", "Alan Turing", "Edsger Dijkstra"}
+    assert _names(SearchService.search("python", job_id=candidates["other"])) == ["Edsger Dijkstra"]
+    assert len(SearchService.search("python", limit=2)) == 2
+
+
+def test_symbols_and_diacritics(candidates):
+    assert _names(SearchService.search("C++")) == ["Alan Turing"]
+    assert _names(SearchService.search("jose")) == ["José Rust"]
+
+
+@pytest.mark.parametrize("text", ['python OR "', "NEAR(", "skills:", "* AND", "+"])
+def test_fts_syntax_in_user_input_is_harmless(candidates, text):
+    SearchService.search(text)  # No sqlite3.OperationalError
+
+
+def test_search_endpoint(client, candidates):
+    response = client.get("/api/cvs/search", params={"q": "rust", "job_id": candidates["other"]})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["data"]] == [candidates["ids"]["Edsger Dijkstra"]]
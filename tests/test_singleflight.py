@@ -0,0 +1,88 @@
+"""SingleFlight: concurrent identical calls run once and share the outcome."""
+import threading
+import time
+
+import pytest
+
+import metrics
+from utils import SingleFlight
+
+CALLERS = 5
+
+
+class Call:
+    """A slow call that stays in flight until released."""
+
+    def __init__(self, result=None, error: Exception = None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.runs += 1
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _run_concurrently(flight: SingleFlight, key: str, call: Call) -> list:
+    """Call flight.do from CALLERS threads at once and return each one's result or exception."""
+    outcomes = [None] * CALLERS
+
+    def caller(i):
+        try:
+            outcomes[i] = flight.do(key, call)
+        except Exception as exc:
+            outcomes[i] = exc
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    # Release the leader once every other caller has joined its call
+    deadline = time.monotonic() + 5
+    while metrics.snapshot().get(f"{flight.name}_coalesced", 0) < CALLERS - 1:
+        assert time.monotonic() < deadline, "callers did not join the call"
+        time.sleep(0.001)
+    call.release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test_flight_shared")
+    result = {"score": 80}
+    call = Call(result=result)
+
+    outcomes = _run_concurrently(flight, "key", call)
+    assert call.runs == 1
+    assert all(outcome is result for outcome in outcomes)
+    assert not flight._calls
+
+
+def test_exception_reaches_every_caller_and_releases_the_key():
+    flight = SingleFlight("test_flight_error")
+    error = RuntimeError("Gemini unavailable")
+    call = Call(error=error)
+
+    outcomes = _run_concurrently(flight, "key", call)
+    assert call.runs == 1
+    assert all(outcome is error for outcome in outcomes)
+    assert not flight._calls
+
+    # The failure is not remembered: the next call runs again
+    retry = Call(result="ok")
+    retry.release.set()
+    assert flight.do("key", retry) == "ok"
+    assert retry.runs == 1
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test_flight_keys")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flight.do("a", int, "not a number")
+    assert flight.do("a", lambda: 3) == 3
@@ -0,0 +1,111 @@
+"""Upload size and page-count limits."""
+import asyncio
+import io
+
+import fitz
+import pytest
+from fastapi import HTTPException
+
+from backend.models.database import create_job
+from backend.routes import uploads
+from backend.routes.uploads import spooled_pdf
+
+
+class ChunkedUpload:
+    """An UploadFile stand-in that serves a body in chunks and counts the bytes read."""
+
+    def __init__(self, body: bytes, filename: str = "cv.pdf"):
+        self.filename = filename
+        self._body = io.BytesIO(body)
+        self.bytes_read = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self._body.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def _spool(upload) -> str:
+    """Run spooled_pdf on an upload and return the temporary path it yielded."""
+    async def spool():
+        async with spooled_pdf(upload) as path:
+            with open(path, "rb") as f:
+                assert f.read(4) == b"%PDF"
+            return path
+    return asyncio.run(spool())
+
+
+def _pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number + 1}")
+    return doc.tobytes()
+
+
+@pytest.fixture
+def small_limits(monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 64 * 1024)
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 16 * 1024)
+    monkeypatch.setattr(uploads, "MAX_PDF_PAGES", 2)
+
+
+def test_pdf_within_limits_is_spooled_and_removed(small_limits):
+    path = _spool(ChunkedUpload(_pdf(2)))
+    assert not uploads.os.path.exists(path)
+
+
+def test_oversized_upload_stops_reading_at_the_limit(small_limits):
+    upload = ChunkedUpload(b"%PDF" + b"\0" * (1024 * 1024))
+    with pytest.raises(HTTPException) as error:
+        _spool(upload)
+
+    assert error.value.status_code == 413
+    assert upload.bytes_read <= 64 * 1024 + 16 * 1024
+
+
+def test_page_limit_is_enforced(small_limits):
+    with pytest.raises(HTTPException) as error:
+        _spool(ChunkedUpload(_pdf(3)))
+    assert error.value.status_code == 422
+    assert "3 pages" in error.value.detail
+
+
+@pytest.mark.parametrize("filename, body", [
+    ("cv.docx", b"%PDF"),
+    ("cv.pdf", b"PK\x03\x04 a zip file"),
+    ("cv.pdf", b""),
+    ("cv.pdf", b"%PDF-1.7 truncated"),
+])
+def test_invalid_uploads_are_rejected(small_limits, filename, body):
+    with pytest.raises(HTTPException) as error:
+        _spool(ChunkedUpload(body, filename))
+    assert error.value.status_code == 400
+
+
+def test_large_content_length_is_rejected_before_the_body_is_read(client, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 64 * 1024)
+    sent = []
+
+    def body():
+        for _ in range(64):
+            sent.append(1)
+            yield b"\0" * 16 * 1024
+
+    response = client.post(
+        "/api/cvs/process",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=x", "Content-Length": str(1024 * 1024)},
+    )
+    assert response.status_code == 413
+    assert len(sent) < 64
+
+
+def test_route_rejects_pdfs_over_the_page_limit(client, small_limits):
+    job_id = create_job("Backend", "Python developer")
+    response = client.post(
+        "/api/cvs/process",
+        files={"file": ("cv.pdf", _pdf(3), "application/pdf")},
+        data={"job_id": str(job_id)},
+    )
+    assert response.status_code == 422
+    assert "maximum 2" in response.json()["detail"]
@@ -0,0 +1,144 @@
+"""Usage metering and the per-job, per-day and per-analysis aggregates."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import metering
+from config import SCORING_CATEGORIES
+from backend.models.database import create_job, get_db_connection
+from backend.models.usage import save_usage, usage_by_day, usage_by_job, usage_for_analysis
+from metering import UsageRecord, metering as meter_usage, operation, record
+from scheduler import bind
+
+
+class FakeResponse:
+    class usage_metadata:
+        prompt_token_count = 120
+        candidates_token_count = 30
+
+
+class FakeModel:
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+    def generate_content(self, prompt):
+        if self.error is not None:
+            raise self.error
+        return FakeResponse()
+
+
+def _record(job_id=None, service="gemini", operation_name="parse", input_tokens=0, output_tokens=0, units=0):
+    return UsageRecord(service, operation_name, None, job_id, 1, input_tokens, output_tokens, units)
+
+
+def test_usage_is_collected_only_inside_metering():
+    record("gemini", "parse")
+    with meter_usage() as meter:
+        with operation("score:Skills"):
+            record("gemini", input_tokens=10, output_tokens=2)
+        record("vision", "ocr_page", units=3)
+
+    assert meter.records() == [
+        UsageRecord("gemini", "score:Skills", None, None, 1, 10, 2, 0),
+        UsageRecord("vision", "ocr_page", None, None, 1, 0, 0, 3),
+    ]
+
+
+def test_bound_executor_threads_report_into_the_meter_with_their_job():
+    with meter_usage() as meter, ThreadPoolExecutor(max_workers=2) as pool:
+        pool.submit(bind(record, job_id=7), "gemini", "score:Skills").result()
+        pool.submit(record, "gemini", "score:Skills").result()  # Not bound: lost
+
+    assert [r.job_id for r in meter.records()] == [7]
+
+
+def test_metered_model_reports_tokens_and_failed_calls():
+    with meter_usage() as meter:
+        metering.MeteredModel(FakeModel(), "gemini-test").generate_content("prompt")
+        with pytest.raises(RuntimeError):
+            metering.MeteredModel(FakeModel(RuntimeError("quota")), "gemini-test").generate_content("prompt")
+
+    first, failed = meter.records()
+    assert (first.model, first.input_tokens, first.output_tokens) == ("gemini-test", 120, 30)
+    assert (failed.calls, failed.input_tokens) == (1, 0)
+
+
+@pytest.fixture
+def jobs(db):
+    return create_job("Backend", "Python developer"), create_job("Data", "SQL analyst")
+
+
+def _add_analysis(job_id: int) -> int:
+    with get_db_connection() as conn:
+        cursor = conn.execute("INSERT INTO analyses (job_id, name, cv_data) VALUES (?, 'ada', '{}')", (job_id,))
+        conn.commit()
+        return cursor.lastrowid
+
+
+def test_save_usage_keeps_the_job_a_record_names(jobs):
+    backend, data = jobs
+    save_usage([_record(), _record(job_id=data)], job_id=backend, analysis_id=1, run_id="run")
+
+    with get_db_connection() as conn:
+        rows = conn.execute("SELECT job_id, analysis_id, run_id FROM api_usage ORDER BY id").fetchall()
+    assert rows == [(backend, 1, "run"), (data, 1, "run")]
+
+
+def test_usage_aggregates(jobs):
+    backend, data = jobs
+    first, second = _add_analysis(backend), _add_analysis(backend)
+    save_usage([_record(input_tokens=100, output_tokens=10), _record(operation_name="score:Skills", input_tokens=50)],
+               backend, first)
+    save_usage([_record(input_tokens=80), _record(service="vision", operation_name="ocr_page", units=2)],
+               backend, second)
+    save_usage([_record(input_tokens=7)], data)
+
+    by_job = {(row["job_id"], row["service"]): row for row in usage_by_job()}
+    assert by_job[(backend, "gemini")]["input_tokens"] == 230
+    assert by_job[(backend, "gemini")]["calls"] == 3
+    assert by_job[(backend, "gemini")]["analyses"] == 2
+    assert by_job[(backend, "gemini")]["job_title"] == "Backend"
+    assert by_job[(backend, "vision")]["units"] == 2
+    assert by_job[(data, "gemini")]["analyses"] == 0
+
+    assert [(row["operation"], row["input_tokens"]) for row in usage_for_analysis(first)] == [
+        ("parse", 100), ("score:Skills", 50),
+    ]
+
+    daily = usage_by_day(job_id=backend)
+    assert {row["operation"] for row in daily} == {"parse", "score:Skills", "ocr_page"}
+    assert sum(row["calls"] for row in daily) == 4
+    assert usage_by_day(since="2999-01-01") == []
+
+
+def test_multi_job_upload_bills_every_record_to_an_analysis(processor, jobs, monkeypatch, tmp_path):
+    def extract_text(pdf_path, ocr_fn=None, file_hash=None):
+        record("vision", "ocr_page", units=2)
+        return "Ada Lovelace ada@example.com Python developer"
+
+    def parse_text(cv_text):
+        record("gemini", "parse", input_tokens=100)
+        return {"name": "Ada Lovelace", "skills": ["Python"]}
+
+    def compute_score(jd_text, text, category):
+        record("gemini", f"score:{category}", input_tokens=10)
+        return {"score": 60, "reason": ""}
+
+    monkeypatch.setattr(processor, "extract_text", extract_text)
+    monkeypatch.setattr(processor, "parse_text", parse_text)
+    monkeypatch.setattr(processor, "_compute_score", compute_score)
+    pdf_path = tmp_path / "cv.pdf"
+    pdf_path.write_bytes(b"%PDF ada")
+    backend, data = jobs
+
+    result = processor.process_cv_multi(str(pdf_path), [{"id": job, "title": "", "description": "JD"} for job in jobs])
+    analysis_ids = {item["job_id"]: item["analysis_id"] for item in result["results"]}
+
+    with get_db_connection() as conn:
+        unattributed = conn.execute(
+            "SELECT COUNT(*) FROM api_usage WHERE analysis_id IS NULL OR job_id IS NULL"
+        ).fetchone()[0]
+    assert unattributed == 0
+    scoring = {f"score:{category}" for category in SCORING_CATEGORIES}
+    assert {row["operation"] for row in usage_for_analysis(analysis_ids[backend])} == scoring | {"ocr_page", "parse"}
+    assert {row["operation"] for row in usage_for_analysis(analysis_ids[data])} == scoring
@@ -0,0 +1,108 @@
+"""Per-job category weights and re-ranking of stored analyses in SQL."""
+import math
+
+import pytest
+from fastapi import HTTPException
+
+from config import SCORING_CATEGORIES
+from backend.models.database import create_job, get_db_connection, weighted_total
+from backend.models.versions import get_ranking_version
+from backend.routes.jobs import _validate_weights
+
+
+def _scores(**overrides) -> dict:
+    return {category: overrides.get(category, 0) for category in SCORING_CATEGORIES}
+
+
+def _save(processor, job_id: int, name: str, scores: dict) -> int:
+    prepared = {
+        "info": {"name": name},
+        "fingerprint": {"file_hash": name, "signature": None, "contacts": []},
+        "match": None,
+    }
+    result = {"score_dict": scores, "reason_dict": {}, "total_score": weighted_total(scores, None)}
+    return processor.save_analyses([(prepared, job_id, "Python developer", result)])[0]
+
+
+def _save_unscored(processor, job_id: int, name: str) -> int:
+    prepared = {
+        "info": {"name": name},
+        "fingerprint": {"file_hash": name, "signature": None, "contacts": []},
+        "match": None,
+    }
+    result = {"score_dict": {}, "reason_dict": {}, "total_score": None, "status": "deferred"}
+    return processor.save_analyses([(prepared, job_id, "Python developer", result)])[0]
+
+
+def _stored_scores(job_id: int) -> dict:
+    with get_db_connection() as conn:
+        return dict(conn.execute("SELECT name, score FROM analyses WHERE job_id = ?", (job_id,)).fetchall())
+
+
+@pytest.fixture
+def job_id(processor):
+    job_id = create_job("Backend", "Python developer")
+    _save(processor, job_id, "Scholar", _scores(Education=100))
+    _save(processor, job_id, "Hacker", _scores(Skills=100))
+    _save_unscored(processor, job_id, "Deferred")
+    return job_id
+
+
+def test_weighted_total_is_a_weighted_average():
+    scores = _scores(Education=100, Skills=50)
+    assert weighted_total(scores, None) == 30
+    assert weighted_total(scores, {"Skills": 3, "Education": 1}) == 62.5
+
+
+def test_setting_weights_rescores_stored_analyses(client, job_id):
+    response = client.put(f"/api/jobs/{job_id}/weights", json={"category_weights": {"Skills": 3, "Education": 1}})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["rescored"] == 2
+    assert _stored_scores(job_id) == {"Scholar": 25.0, "Hacker": 75.0, "Deferred": None}
+    ranking = client.get("/api/cvs/ranking", params={"job_id": job_id}).json()["data"]
+    assert [row["name"] for row in ranking] == ["Hacker", "Scholar", "Deferred"]
+
+
+def test_empty_weights_restore_equal_weights(client, job_id):
+    client.put(f"/api/jobs/{job_id}/weights", json={"category_weights": {"Skills": 1}})
+    client.put(f"/api/jobs/{job_id}/weights", json={"category_weights": {}})
+
+    assert _stored_scores(job_id) == {"Scholar": 20.0, "Hacker": 20.0, "Deferred": None}
+    assert client.get(f"/api/jobs/{job_id}").json()["data"]["category_weights"] is None
+
+
+def test_new_analyses_use_the_current_weights(client, processor, job_id):
+    client.put(f"/api/jobs/{job_id}/weights", json={"category_weights": {"Skills": 1}})
+    _save(processor, job_id, "Newcomer", _scores(Skills=80))
+
+    assert _stored_scores(job_id)["Newcomer"] == 80.0
+
+
+def test_reweighting_invalidates_the_ranking(client, job_id):
+    before = get_ranking_version(job_id)
+    client.put(f"/api/jobs/{job_id}/weights", json={"category_weights": {"Skills": 1}})
+    assert get_ranking_version(job_id) > before
+
+
+@pytest.mark.parametrize("weights", [
+    {"Charisma": 1},
+    {"Skills": -1},
+    {"Skills": 0, "Education": 0},
+])
+def test_invalid_weights_are_rejected(client, job_id, weights):
+    response = client.put(f"/api/jobs/{job_id}/weights", json={"category_weights": weights})
+    assert response.status_code == 400
+    assert _stored_scores(job_id) == {"Scholar": 20.0, "Hacker": 20.0, "Deferred": None}
+
+
+@pytest.mark.parametrize("weight", [math.nan, math.inf])
+def test_non_finite_weights_are_rejected(weight):
+    with pytest.raises(HTTPException) as error:
+        _validate_weights({"Skills": weight})
+    assert error.value.status_code == 400
+
+
+def test_weights_for_unknown_job_are_not_found(client):
+    response = client.put("/api/jobs/999/weights", json={"category_weights": {"Skills": 1}})
+    assert response.status_code == 404
@@ -0,0 +1,90 @@
+"""The single database writer: batched commits with a savepoint per write."""
+import sqlite3
+import threading
+
+import pytest
+
+import metrics
+from backend.models.database import get_db_connection
+from backend.models.writer import BatchWriter
+
+
+@pytest.fixture
+def writer(db):
+    writer = BatchWriter(max_batch=10, max_delay=0.2)
+    yield writer
+    writer.close()
+
+
+def _insert_job(title: str):
+    def write(cursor):
+        cursor.execute("INSERT INTO jobs (title, description) VALUES (?, 'JD')", (title,))
+        return cursor.lastrowid
+    return write
+
+
+def _titles():
+    with get_db_connection() as conn:
+        return [row[0] for row in conn.execute("SELECT title FROM jobs ORDER BY id")]
+
+
+def test_failed_write_rolls_back_only_itself(writer):
+    def failing(cursor):
+        cursor.execute("INSERT INTO jobs (title, description) VALUES ('B', 'JD')")
+        raise ValueError("bad row")
+
+    first = writer.submit(_insert_job("A"))
+    second = writer.submit(failing)
+    third = writer.submit(_insert_job("C"))
+
+    assert isinstance(first.result(), int)
+    with pytest.raises(ValueError):
+        second.result()
+    assert isinstance(third.result(), int)
+    assert _titles() == ["A", "C"]
+
+
+def test_constraint_violation_fails_only_its_write(writer):
+    def duplicate_key(cursor):
+        cursor.execute("INSERT INTO jobs (id, title, description) VALUES (1, 'Again', 'JD')")
+
+    writer.submit(_insert_job("A")).result()
+    failed = writer.submit(duplicate_key)
+    other = writer.submit(_insert_job("B"))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        failed.result()
+    other.result()
+    assert _titles() == ["A", "B"]
+
+
+def test_concurrent_writes_share_one_commit(writer):
+    before = metrics.snapshot().get("db_write_batches", 0)
+    start = threading.Barrier(5)
+    futures = []
+
+    def submit(title):
+        start.wait()
+        futures.append(writer.submit(_insert_job(title)))
+
+    threads = [threading.Thread(target=submit, args=(str(i),)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result()
+
+    assert metrics.snapshot()["db_write_batches"] - before == 1
+    assert sorted(_titles()) == ["0", "1", "2", "3", "4"]
+
+
+def test_close_commits_queued_writes(db):
+    writer = BatchWriter(max_batch=10, max_delay=0.5)
+    future = writer.submit(_insert_job("A"))
+    writer.close()
+
+    assert future.done()
+    assert _titles() == ["A"]
+    with pytest.raises(RuntimeError):
+        writer.submit(_insert_job("B"))
@@ -1,8 +1,16 @@
 """Utility functions for Smart CV application."""
+import hashlib
 import logging
 import os
 import re
 import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,6 +20,80 @@ def ensure_dirs() -> None:
     os.makedirs("data", exist_ok=True)
 
 
+class RateLimiter:
+    """Thread-safe token bucket limiting calls to `rate` per second."""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls.
+    
+    While a call for a key is running, other callers with the same key
+    wait for it and receive the same result (or exception) instead of
+    repeating the work. Nothing is cached once the call finishes. Shared
+    results must not be mutated by callers.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name  # Coalesced calls are counted in the '<name>_coalesced' metric
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs), or join the in-flight call with the same key."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            metrics.increment(f"{self.name}_coalesced")
+            return future.result()
+        
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def content_key(*parts: str) -> str:
+    """Stable hash of text parts, for keying coalesced calls."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
 def clean_output(text: str) -> str:
     """Clean output from LLM."""
     if not text: